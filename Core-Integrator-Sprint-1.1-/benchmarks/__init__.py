@@ -0,0 +1,4 @@
+"""Benchmarks for the Core Integrator.
+
+Run from the project root, e.g. ``python -m benchmarks.memory_read_latency``.
+"""
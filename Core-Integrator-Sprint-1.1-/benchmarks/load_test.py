@@ -0,0 +1,296 @@
+"""Throughput and latency of the HTTP API against stub dependencies.
+
+Starts in-process stand-ins for CreatorCore, Noopur and the video service
+(`benchmarks.stub_services`), points the application at them through the
+environment, and drives ``main.app`` in process (ASGI, with its lifespan)
+with a weighted mix of ``/core``, ``/feedback`` and ``/get-history`` requests
+at each concurrency level. Reports requests per second and p50/p95/p99
+latency per endpoint.
+
+Requests are spread over ``--clients`` simulated client addresses, each with
+at most ``--users-per-client`` user ids, so the per-IP/per-user rate limiter
+and enumeration guard see ordinary traffic; any 429s still show up in the
+status counts. INFO logging is switched off unless ``--with-logs`` is given.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 2000 --mix default \\
+        --creatorcore-latency-ms 20 --noopur-latency-ms 10 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlencode
+
+from benchmarks.stub_services import StubService, creatorcore_stub, noopur_stub, video_stub
+
+# Endpoint weights per traffic mix
+MIXES: Dict[str, Dict[str, float]] = {
+    "default": {"/core": 0.6, "/feedback": 0.2, "/get-history": 0.2},
+    "read_heavy": {"/core": 0.2, "/feedback": 0.1, "/get-history": 0.7},
+    "write_heavy": {"/core": 0.7, "/feedback": 0.25, "/get-history": 0.05},
+    "core_only": {"/core": 1.0},
+}
+
+# /core traffic by (module, intent)
+CORE_MIX: Dict[Tuple[str, str], float] = {
+    ("creator", "generate"): 0.5,
+    ("finance", "analyze"): 0.25,
+    ("education", "generate"): 0.2,
+    ("video", "generate"): 0.05,
+}
+
+_SERVICES = ("creatorcore", "noopur", "video")
+
+
+def _client_address(index: int) -> Tuple[str, int]:
+    return f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}", 40000 + index % 20000
+
+
+class _RequestFactory:
+    """Random requests for one worker: (endpoint label, method, path, query, JSON body, client)"""
+
+    def __init__(self, mix: Dict[str, float], clients: int, users_per_client: int, prompts: int, seed: int):
+        self.random = random.Random(seed)
+        self.endpoints, self.weights = zip(*mix.items())
+        self.core, self.core_weights = zip(*CORE_MIX.items())
+        self.clients = clients
+        self.users_per_client = users_per_client
+        self.prompts = prompts
+
+    def next(self) -> Tuple[str, str, str, str, Any, Tuple[str, int]]:
+        rng = self.random
+        client = rng.randrange(self.clients)
+        user_id = f"bench{client}_{rng.randrange(self.users_per_client)}"
+        endpoint = rng.choices(self.endpoints, self.weights)[0]
+        if endpoint == "/get-history":
+            query = urlencode({"user_id": user_id, "limit": 10})
+            return endpoint, "GET", endpoint, query, None, _client_address(client)
+        if endpoint == "/feedback":
+            body = {
+                "generation_id": rng.randint(1, 1_000_000),
+                "command": rng.choice(["+2", "+1", "-1", "-2"]),
+                "user_id": user_id,
+                "comment": "load test"
+            }
+            return endpoint, "POST", endpoint, "", body, _client_address(client)
+        module, intent = rng.choices(self.core, self.core_weights)[0]
+        topic = f"bench topic {rng.randrange(self.prompts)}"
+        data = {"topic": topic, "prompt": topic, "goal": "engage", "type": "story"}
+        if module == "video":
+            data = {"text": f"Narration about {topic}", "topic": topic, "duration": 30}
+        body = {"module": module, "intent": intent, "user_id": user_id, "data": data}
+        return endpoint, "POST", endpoint, "", body, _client_address(client)
+
+
+async def _asgi_request(app, method: str, path: str, query: str, body: Any,
+                        client: Tuple[str, int]) -> int:
+    """Send one request straight to the ASGI app; returns the response status"""
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    headers = [(b"host", b"bench"), (b"content-length", str(len(payload)).encode())]
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": headers, "client": client, "server": ("bench", 80)
+    }
+    sent, done = False, asyncio.Event()
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        # Only disconnect once the response is complete, as a real client would
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        done.set()
+    return status
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    return round(samples[min(len(samples) - 1, int(len(samples) * fraction))], 2)
+
+
+def _summarize(samples: List[float], statuses: Dict[int, int], elapsed: float) -> Dict[str, Any]:
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(samples), 2),
+        "p50_ms": _percentile(samples, 0.50),
+        "p95_ms": _percentile(samples, 0.95),
+        "p99_ms": _percentile(samples, 0.99),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+async def _run_level(app, concurrency: int, requests: int, factories: List[_RequestFactory]) -> Dict[str, Any]:
+    samples: Dict[str, List[float]] = {}
+    statuses: Dict[str, Dict[int, int]] = {}
+    remaining = requests
+
+    async def worker(factory: _RequestFactory):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            endpoint, method, path, query, body, client = factory.next()
+            start = time.perf_counter()
+            status = await _asgi_request(app, method, path, query, body, client)
+            samples.setdefault(endpoint, []).append((time.perf_counter() - start) * 1000)
+            codes = statuses.setdefault(endpoint, {})
+            codes[status] = codes.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(factories[i]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    overall = [ms for endpoint_samples in samples.values() for ms in endpoint_samples]
+    overall_statuses: Dict[int, int] = {}
+    for codes in statuses.values():
+        for code, count in codes.items():
+            overall_statuses[code] = overall_statuses.get(code, 0) + count
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(requests / elapsed, 1),
+        "overall": _summarize(overall, overall_statuses, elapsed),
+        "endpoints": {endpoint: _summarize(samples[endpoint], statuses[endpoint], elapsed) for endpoint in sorted(samples)},
+    }
+
+
+def _start_stubs(behaviour: Dict[str, Dict[str, float]], seed: int) -> Dict[str, StubService]:
+    factories = {"creatorcore": creatorcore_stub, "noopur": noopur_stub, "video": video_stub}
+    return {name: factories[name](seed=seed, **behaviour[name]).start() for name in _SERVICES}
+
+
+def _configure_environment(stubs: Dict[str, StubService], use_noopur: bool) -> str:
+    """Point the application at the stubs and a scratch database; must run before `main` is imported"""
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_load_"), "context.db")
+    os.environ.update({
+        "DB_PATH": db_path,
+        "CREATORCORE_BASE_URL": stubs["creatorcore"].url,
+        "NOOPUR_BASE_URL": stubs["noopur"].url,
+        "VIDEO_SERVICE_URL": stubs["video"].url,
+        "INTEGRATOR_USE_NOOPUR": "true" if use_noopur else "false",
+        "SSPL_ENABLED": "false",
+        "USE_MONGODB": "false",
+    })
+    os.environ.setdefault("NOOPUR_API_KEY", "bench")
+    return db_path
+
+
+async def _drive(levels: List[int], requests: int, warmup: int, mix: Dict[str, float], clients: int,
+                 users_per_client: int, prompts: int, seed: int, stubs: Dict[str, StubService]) -> List[Dict[str, Any]]:
+    import main
+
+    app = main.app
+    results = []
+    async with app.router.lifespan_context(app):
+        factories = [
+            _RequestFactory(mix, clients, users_per_client, prompts, seed + i) for i in range(max(levels))
+        ]
+        if warmup:
+            await _run_level(app, min(levels), warmup, factories)
+        for concurrency in levels:
+            for stub in stubs.values():
+                stub.take_stats()
+            level = await _run_level(app, concurrency, requests, factories)
+            level["upstream"] = {name: stub.take_stats() for name, stub in stubs.items()}
+            results.append(level)
+    return results
+
+
+def run(concurrency: List[int], requests: int, mix: str = "default", behaviour: Dict[str, Dict[str, float]] = None,
+        clients: int = 2000, users_per_client: int = 3, prompts: int = 200, warmup: int = 50,
+        use_noopur: bool = True, with_logs: bool = False, seed: int = 1) -> Dict[str, Any]:
+    behaviour = behaviour or {name: {} for name in _SERVICES}
+    stubs = _start_stubs(behaviour, seed)
+    if not with_logs:
+        logging.disable(logging.INFO)
+    try:
+        db_path = _configure_environment(stubs, use_noopur)
+        levels = asyncio.run(_drive(
+            concurrency, requests, warmup, MIXES[mix], clients, users_per_client, prompts, seed, stubs
+        ))
+    finally:
+        logging.disable(logging.NOTSET)
+        for stub in stubs.values():
+            stub.close()
+    return {
+        "config": {
+            "mix": mix, "mix_weights": MIXES[mix],
+            "core_mix": {f"{module}.{intent}": weight for (module, intent), weight in CORE_MIX.items()},
+            "requests_per_level": requests, "warmup": warmup, "clients": clients,
+            "users_per_client": users_per_client, "prompts": prompts, "use_noopur": use_noopur,
+            "stubs": behaviour, "db_path": db_path, "seed": seed,
+        },
+        "levels": levels,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=50, help="Unrecorded requests before the first level")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--clients", type=int, default=2000, help="Simulated client addresses")
+    parser.add_argument("--users-per-client", type=int, default=3)
+    parser.add_argument("--prompts", type=int, default=200, help="Distinct creator prompts (repeats hit the generation cache)")
+    for service in _SERVICES:
+        parser.add_argument(f"--{service}-latency-ms", type=float, default=5.0)
+        parser.add_argument(f"--{service}-jitter-ms", type=float, default=5.0)
+        parser.add_argument(f"--{service}-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-noopur", action="store_true", help="Run with INTEGRATOR_USE_NOOPUR=false")
+    parser.add_argument("--with-logs", action="store_true", help="Keep INFO request logging on")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    behaviour = {
+        service: {
+            "latency_ms": getattr(args, f"{service}_latency_ms"),
+            "jitter_ms": getattr(args, f"{service}_jitter_ms"),
+            "error_rate": getattr(args, f"{service}_error_rate"),
+        }
+        for service in _SERVICES
+    }
+    results = run(
+        [int(level) for level in args.concurrency.split(",")], args.requests, args.mix, behaviour,
+        args.clients, args.users_per_client, args.prompts, args.warmup, not args.no_noopur, args.with_logs, args.seed
+    )
+    print(f"{'conc':>5}  {'endpoint':<13}{'count':>7}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+    for level in results["levels"]:
+        rows = list(level["endpoints"].items()) + [("all", level["overall"])]
+        for endpoint, row in rows:
+            statuses = " ".join(f"{code}:{count}" for code, count in row["statuses"].items())
+            print(f"{level['concurrency']:>5}  {endpoint:<13}{row['count']:>7}{row['rps']:>9}"
+                  f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}  {statuses}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Memory layer microbenchmarks across backends, user counts, payload sizes and thread mixes.
+
+Measures `store_interaction`, `get_context`, `get_user_history` (one page of
+10) and `get_generation` one call at a time, then runs reader and writer
+threads together (readers call `get_context`, writers `store_interaction`).
+
+Backends:
+    sqlite               ContextMemory, synchronous writes
+    sqlite_write_behind  ContextMemory with the write-behind group committer
+    sqlite_cached        SQLiteAdapter behind CachedMemoryAdapter (CONTEXT_CACHE_* settings)
+    mongodb              MongoDBAdapter on an in-process mongomock client (needs ``mongomock``)
+
+Each run seeds ``users`` users with one small interaction per module, then
+gives ``--hot-users`` of them interactions whose ``related_context`` is about
+``payload_kb`` KB; every measured call targets the hot users. Retention and
+cache sizes come from the usual environment variables (e.g.
+``MEMORY_RETENTION_PER_MODULE``, ``CONTEXT_CACHE_MAX_USERS``), so they can be
+sized by re-running with different values. mongomock scans instead of using
+indexes, so larger user counts are skipped for it (``--mongodb-max-users``)
+and its numbers reflect adapter overhead rather than a MongoDB server.
+
+The MongoDB leg needs the benchmark extras; without them it is reported as
+skipped:
+    pip install -r benchmarks/requirements.txt
+
+Usage:
+    python -m benchmarks.memory_microbench --users 1,1000,100000 --payload-kb 0,10,100 \\
+        --readers 1,4 --writers 0,1 --output memory.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.db.cached_adapter import CachedMemoryAdapter
+from src.db.memory import ContextMemory
+from src.db.memory_adapter import SQLiteAdapter
+from src.db.mongodb_adapter import MongoDBAdapter
+from config.config import (
+    CONTEXT_CACHE_DEPTH, CONTEXT_CACHE_MAX_USERS, CONTEXT_CACHE_TTL_S, MEMORY_RETENTION_PER_MODULE
+)
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+BACKENDS = ("sqlite", "sqlite_write_behind", "sqlite_cached", "mongodb")
+_MODULES = ("finance", "education", "creator")
+_SEED_BATCH = 1000
+
+
+def _open(backend: str) -> Any:
+    if backend == "mongodb":
+        if mongomock is None:
+            raise RuntimeError("mongomock not installed (pip install -r benchmarks/requirements.txt); "
+                               "cannot benchmark the MongoDB adapter")
+        return MongoDBAdapter(database_name="bench", client=mongomock.MongoClient())
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_memory_"), "context.db")
+    if backend == "sqlite":
+        return ContextMemory(db_path, write_behind=False)
+    if backend == "sqlite_write_behind":
+        return ContextMemory(db_path, write_behind=True)
+    if backend == "sqlite_cached":
+        return CachedMemoryAdapter(
+            SQLiteAdapter(db_path), depth=CONTEXT_CACHE_DEPTH, max_users=CONTEXT_CACHE_MAX_USERS, ttl_s=CONTEXT_CACHE_TTL_S
+        )
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def _method(memory: Any, name: str) -> Optional[Callable]:
+    """`name` on the store or the first adapter it wraps that has it (e.g. `get_generation`, `flush`, `close`)"""
+    backend = getattr(memory, "backend", None)
+    for candidate in (memory, backend, getattr(backend, "_mem", None)):
+        method = getattr(candidate, name, None) if candidate is not None else None
+        if method is not None:
+            return method
+    return None
+
+
+def _related_context(payload_kb: int) -> List[Dict[str, Any]]:
+    """About `payload_kb` KB of related context, as Noopur returns it"""
+    if payload_kb <= 0:
+        return []
+    text = "x" * 1000
+    return [{"id": i, "text": text, "score": 1} for i in range(payload_kb)]
+
+
+def _interaction(user_id: str, module: str, generation_id: str,
+                 related_context: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    request = {"module": module, "intent": "generate", "user_id": user_id, "data": {"topic": "bench"}}
+    response = {
+        "status": "success",
+        "message": "",
+        "result": {"generation_id": generation_id, "related_context": related_context}
+    }
+    return user_id, request, response
+
+
+def _flush(memory: Any) -> None:
+    flush = _method(memory, "flush")
+    if flush:
+        flush()
+
+
+def _seed(memory: Any, users: int, hot_users: int, payload_kb: int) -> List[str]:
+    """Small interactions for every user plus payload-sized ones for the hot users; returns their generation ids"""
+    batch = []
+    for u in range(users):
+        for module in _MODULES:
+            batch.append(_interaction(f"user{u}", module, f"seed{u}_{module}", []))
+        if len(batch) >= _SEED_BATCH:
+            memory.store_interactions(batch)
+            batch = []
+    if batch:
+        memory.store_interactions(batch)
+
+    related_context = _related_context(payload_kb)
+    generation_ids = [f"hot{u}" for u in range(hot_users)]
+    memory.store_interactions([
+        _interaction(f"user{u}", "creator", generation_ids[u], related_context) for u in range(hot_users)
+    ])
+    _flush(memory)
+    return generation_ids
+
+
+def _stats(samples: List[float], elapsed: float) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "ops_per_s": round(len(samples) / elapsed, 1) if elapsed else None,
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 1),
+    }
+
+
+def _measure(fn: Callable[[int], Any], iterations: int) -> Dict[str, float]:
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return _stats(samples, time.perf_counter() - started)
+
+
+def _concurrent(memory: Any, readers: int, writers: int, iterations: int, hot_users: int,
+                related_context: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """`readers` get_context threads and `writers` store_interaction threads, `iterations` calls each"""
+    barrier = threading.Barrier(readers + writers + 1)
+    reads: List[List[float]] = [[] for _ in range(readers)]
+    writes: List[List[float]] = [[] for _ in range(writers)]
+    # Per-side finish times, so each side's ops/s covers only the time it was running
+    finished: Dict[str, float] = {}
+    lock = threading.Lock()
+
+    def done(side: str) -> None:
+        now = time.perf_counter()
+        with lock:
+            finished[side] = max(finished.get(side, now), now)
+
+    def reader(samples: List[float], seed: int):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(iterations):
+            user_id = f"user{rng.randrange(hot_users)}"
+            start = time.perf_counter()
+            memory.get_context(user_id)
+            samples.append((time.perf_counter() - start) * 1_000_000)
+        done("read")
+
+    def writer(samples: List[float], seed: int):
+        rng = random.Random(seed)
+        barrier.wait()
+        for i in range(iterations):
+            user_id = f"user{rng.randrange(hot_users)}"
+            interaction = _interaction(user_id, "creator", f"conc{seed}_{i}", related_context)
+            start = time.perf_counter()
+            memory.store_interaction(*interaction)
+            samples.append((time.perf_counter() - start) * 1_000_000)
+        done("write")
+
+    threads = [threading.Thread(target=reader, args=(reads[i], i)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(writes[i], 1000 + i)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    _flush(memory)
+
+    result: Dict[str, Any] = {"readers": readers, "writers": writers, "elapsed_s": round(elapsed, 3)}
+    if readers:
+        result["get_context"] = _stats([s for samples in reads for s in samples], finished["read"] - started)
+    if writers:
+        result["store_interaction"] = _stats([s for samples in writes for s in samples], finished["write"] - started)
+    return result
+
+
+def run_case(backend: str, users: int, payload_kb: int, iterations: int, hot_users: int,
+             thread_mixes: List[Tuple[int, int]]) -> Dict[str, Any]:
+    """Seed a fresh store and measure every call, then every reader/writer mix"""
+    hot_users = max(1, min(hot_users, users))
+    memory = _open(backend)
+    try:
+        seed_started = time.perf_counter()
+        generation_ids = _seed(memory, users, hot_users, payload_kb)
+        seed_s = time.perf_counter() - seed_started
+        related_context = _related_context(payload_kb)
+        get_generation = _method(memory, "get_generation")
+        rng = random.Random(users)
+        targets = [rng.randrange(hot_users) for _ in range(iterations)]
+
+        calls = {
+            "store_interaction": _measure(lambda i: memory.store_interaction(
+                *_interaction(f"user{targets[i]}", "creator", f"bench{i}", related_context)), iterations),
+        }
+        _flush(memory)
+        calls["get_context"] = _measure(lambda i: memory.get_context(f"user{targets[i]}"), iterations)
+        calls["get_user_history"] = _measure(
+            lambda i: memory.get_user_history(f"user{targets[i]}", 10), iterations
+        )
+        calls["get_generation"] = _measure(
+            lambda i: get_generation(generation_ids[targets[i]]), iterations
+        ) if get_generation else None
+
+        concurrent = [
+            _concurrent(memory, readers, writers, iterations, hot_users, related_context)
+            for readers, writers in thread_mixes if readers + writers
+        ]
+    finally:
+        _method(memory, "close")()
+    return {
+        "backend": backend, "users": users, "hot_users": hot_users, "payload_kb": payload_kb,
+        "seed_s": round(seed_s, 3), "calls": calls, "concurrent": concurrent
+    }
+
+
+def run(backends: List[str], users: List[int], payload_kb: List[int], iterations: int, hot_users: int,
+        readers: List[int], writers: List[int], mongodb_max_users: int = 10000) -> Dict[str, Any]:
+    thread_mixes = [(r, w) for r in readers for w in writers]
+    cases = []
+    for backend in backends:
+        for user_count in users:
+            for kb in payload_kb:
+                if backend == "mongodb" and (mongomock is None or user_count > mongodb_max_users):
+                    reason = ("mongomock not installed: pip install -r benchmarks/requirements.txt"
+                              if mongomock is None else f"users > {mongodb_max_users}")
+                    cases.append({"backend": backend, "users": user_count, "payload_kb": kb, "skipped": reason})
+                    continue
+                cases.append(run_case(backend, user_count, kb, iterations, hot_users, thread_mixes))
+    return {
+        "config": {
+            "iterations": iterations, "hot_users": hot_users, "thread_mixes": thread_mixes,
+            "retention_per_module": MEMORY_RETENTION_PER_MODULE,
+            "context_cache": {"depth": CONTEXT_CACHE_DEPTH, "max_users": CONTEXT_CACHE_MAX_USERS, "ttl_s": CONTEXT_CACHE_TTL_S},
+        },
+        "cases": cases,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default=",".join(BACKENDS), help=f"Comma-separated, from {', '.join(BACKENDS)}")
+    parser.add_argument("--users", type=_int_list, default=[1, 1000, 100000])
+    parser.add_argument("--payload-kb", type=_int_list, default=[0, 10, 100], help="related_context size per interaction")
+    parser.add_argument("--hot-users", type=int, default=100, help="Users the measured calls are spread over")
+    parser.add_argument("--iterations", type=int, default=1000, help="Calls per measurement (and per thread)")
+    parser.add_argument("--readers", type=_int_list, default=[1, 4])
+    parser.add_argument("--writers", type=_int_list, default=[0, 1])
+    parser.add_argument("--mongodb-max-users", type=int, default=10000)
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    backends = [backend for backend in args.backends.split(",") if backend]
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"unknown backend: {backend}")
+    results = run(backends, args.users, args.payload_kb, args.iterations, args.hot_users,
+                  args.readers, args.writers, args.mongodb_max_users)
+
+    print(f"{'backend':<21}{'users':>7}{'KB':>5}  {'call':<26}{'ops/s':>10}{'p50 us':>10}{'p99 us':>10}")
+    for case in results["cases"]:
+        label = f"{case['backend']:<21}{case['users']:>7}{case['payload_kb']:>5}"
+        if "skipped" in case:
+            print(f"{label}  skipped ({case['skipped']})")
+            continue
+        rows = [(call, stats) for call, stats in case["calls"].items()]
+        for mix in case["concurrent"]:
+            for call in ("get_context", "store_interaction"):
+                if call in mix:
+                    rows.append((f"{mix['readers']}r/{mix['writers']}w {call}", mix[call]))
+        for call, stats in rows:
+            if stats is None:
+                print(f"{label}  {call:<26}{'n/a':>10}")
+                continue
+            print(f"{label}  {call:<26}{stats['ops_per_s']:>10}{stats['p50_us']:>10}{stats['p99_us']:>10}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Per-call latency of ContextMemory reads: connection-per-call vs pooled connections.
+
+The "before" reader reproduces the previous access pattern (open a connection
+and re-run the schema DDL on every call); the "after" reader is the current
+ContextMemory with persistent per-thread read connections.
+
+Usage:
+    python -m benchmarks.memory_read_latency --users 100 --iterations 2000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from src.db.memory import ContextMemory
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS interactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        module TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        request_data TEXT NOT NULL,
+        response_data TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS generations (
+        generation_id TEXT PRIMARY KEY,
+        user_id TEXT,
+        interaction_id INTEGER,
+        created_at TEXT,
+        payload TEXT
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_user_module_timestamp
+    ON interactions(user_id, module, timestamp DESC)
+    """,
+]
+
+
+class ConnectPerCallReader:
+    """Reference implementation of the previous read path"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            for ddl in _SCHEMA:
+                conn.execute(ddl)
+            return conn.execute(sql, params).fetchall()
+
+    def get_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT module, timestamp, request_data, response_data FROM interactions "
+            "WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (user_id, limit)
+        )
+        return [{"module": r[0], "timestamp": r[1], "request": json.loads(r[2]), "response": json.loads(r[3])} for r in rows]
+
+    def get_user_history(self, user_id: str) -> List[Dict[str, Any]]:
+        rows = self._query(
+            "SELECT module, timestamp, request_data, response_data FROM interactions "
+            "WHERE user_id = ? ORDER BY timestamp DESC, id DESC",
+            (user_id,)
+        )
+        return [{"module": r[0], "timestamp": r[1], "request": json.loads(r[2]), "response": json.loads(r[3])} for r in rows]
+
+    def get_generation(self, generation_id: str):
+        rows = self._query(
+            "SELECT generation_id, user_id, interaction_id, created_at, payload FROM generations WHERE generation_id = ?",
+            (generation_id,)
+        )
+        return rows[0] if rows else None
+
+
+def _seed(memory: ContextMemory, users: int) -> None:
+    interactions = []
+    for u in range(users):
+        for i, module in enumerate(("finance", "education", "creator")):
+            interactions.append((
+                f"user{u}",
+                {"module": module, "intent": "generate", "user_id": f"user{u}", "data": {"topic": "bench"}},
+                {"status": "success", "message": "", "result": {"generation_id": f"gen{u}_{i}"}}
+            ))
+    memory.store_interactions(interactions)
+
+
+def _measure(fn: Callable[[int], Any], iterations: int) -> Dict[str, float]:
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 1),
+    }
+
+
+def run(users: int, iterations: int) -> Dict[str, Any]:
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_reads_"), "context.db")
+    memory = ContextMemory(db_path, write_behind=False)
+    _seed(memory, users)
+    legacy = ConnectPerCallReader(db_path)
+
+    results: Dict[str, Any] = {"users": users, "iterations": iterations, "calls": {}}
+    for label, reader in (("before", legacy), ("after", memory)):
+        results["calls"][label] = {
+            "get_context": _measure(lambda i: reader.get_context(f"user{i % users}"), iterations),
+            "get_user_history": _measure(lambda i: reader.get_user_history(f"user{i % users}"), iterations),
+            "get_generation": _measure(lambda i: reader.get_generation(f"gen{i % users}_0"), iterations),
+        }
+    memory.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    results = run(args.users, args.iterations)
+    print(f"{'call':<18}{'before p50':>12}{'after p50':>12}{'before p99':>12}{'after p99':>12}  (microseconds)")
+    for call in ("get_context", "get_user_history", "get_generation"):
+        before, after = results["calls"]["before"][call], results["calls"]["after"][call]
+        print(f"{call:<18}{before['p50_us']:>12}{after['p50_us']:>12}{before['p99_us']:>12}{after['p99_us']:>12}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""In-process stand-ins for CreatorCore, Noopur and the video service.
+
+Each stub is a threaded HTTP server on an ephemeral localhost port that
+answers the endpoints the Core Integrator calls with canned JSON, after a
+configurable delay (``latency_ms`` plus up to ``jitter_ms``) and failing a
+configurable fraction of calls (``error_rate``) with HTTP 503.
+
+Usage:
+    stub = creatorcore_stub(latency_ms=20, error_rate=0.01).start()
+    os.environ["CREATORCORE_BASE_URL"] = stub.url
+    ...
+    stub.close()
+"""
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# (path, JSON request body) -> JSON response body
+Route = Callable[[str, Dict[str, Any]], Any]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 refuses connections under benchmark concurrency
+    request_queue_size = 512
+
+
+class StubService:
+    """A stand-in HTTP dependency serving JSON routes with configurable latency and error rate.
+
+    Routes are keyed by ``(method, path)``; a path ending in ``/`` matches
+    every path under it (e.g. ``("GET", "/status/")``).
+    """
+
+    def __init__(self, name: str, routes: Dict[Tuple[str, str], Route], latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.name = name
+        self.routes = dict(routes)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "errors": 0, "not_found": 0}
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubService":
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"stub-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def take_stats(self) -> Dict[str, int]:
+        """Calls served since the last call, then reset the counters"""
+        with self._lock:
+            stats, self._stats = self._stats, {"calls": 0, "errors": 0, "not_found": 0}
+        return stats
+
+    def _route(self, method: str, path: str) -> Optional[Route]:
+        route = self.routes.get((method, path))
+        if route is None:
+            prefixes = [p for (m, p) in self.routes if m == method and p.endswith("/") and path.startswith(p)]
+            if prefixes:
+                route = self.routes[(method, max(prefixes, key=len))]
+        return route
+
+    def _respond(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+            self._stats["calls"] += 1
+        if delay > 0:
+            time.sleep(delay / 1000)
+        route = self._route(method, path)
+        if route is None:
+            with self._lock:
+                self._stats["not_found"] += 1
+            return 404, {"detail": "Not Found"}
+        if failed:
+            with self._lock:
+                self._stats["errors"] += 1
+            return 503, {"detail": f"{self.name} stub: injected error"}
+        return 200, route(path, body)
+
+    def _handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+                status, payload = service._respond(method, self.path.split("?", 1)[0], body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _healthy(path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {"status": "healthy", "timestamp": _now()}
+
+
+def _received(path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {"status": "received", "timestamp": _now()}
+
+
+def creatorcore_stub(**behaviour) -> StubService:
+    """CreatorCore: /generate, /history, /core/feedback, /core/log, /core/context and /system/health"""
+    ids = itertools.count(1)
+
+    def generate(path, body):
+        return {
+            "generation_id": next(ids),
+            "generated_text": f"Generated text for: {body.get('prompt', '')}",
+            "related_context": []
+        }
+
+    def history(path, body):
+        return {"items": [{"id": i, "text": f"Generation {i}", "score": 1, "created_at": _now()} for i in range(1, 6)]}
+
+    return StubService("creatorcore", {
+        ("POST", "/generate"): generate,
+        ("GET", "/history"): history,
+        ("GET", "/history/"): history,
+        ("POST", "/core/feedback"): _received,
+        ("POST", "/core/log"): _received,
+        ("GET", "/core/context"): lambda path, body: [],
+        ("GET", "/system/health"): _healthy,
+    }, **behaviour)
+
+
+def noopur_stub(**behaviour) -> StubService:
+    """Noopur: /generate (related context), /feedback, /history and /system/health"""
+    ids = itertools.count(1)
+
+    def generate(path, body):
+        generation_id = next(ids)
+        return {
+            "generation_id": generation_id,
+            "related_context": [
+                {"id": generation_id - i, "text": f"Related to {body.get('topic') or body.get('prompt')}", "score": 1}
+                for i in range(3)
+            ]
+        }
+
+    def history(path, body):
+        return [{"id": i, "text": f"Generation {i}", "score": 1, "created_at": _now()} for i in range(1, 6)]
+
+    return StubService("noopur", {
+        ("POST", "/generate"): generate,
+        ("POST", "/feedback"): _received,
+        ("GET", "/history"): history,
+        ("GET", "/history/"): history,
+        ("GET", "/system/health"): _healthy,
+    }, **behaviour)
+
+
+def video_stub(**behaviour) -> StubService:
+    """Video service: /generate-video, /status/<id>, /feedback and /health; every video is complete on first poll"""
+    ids = itertools.count(1)
+
+    def generate(path, body):
+        return {"generation_id": f"vid_{next(ids)}", "status": "processing", "duration": body.get("duration", 30)}
+
+    def status(path, body):
+        generation_id = path.rsplit("/", 1)[-1]
+        return {
+            "generation_id": generation_id,
+            "status": "completed",
+            "video_url": f"http://video.invalid/{generation_id}.mp4"
+        }
+
+    return StubService("video", {
+        ("POST", "/generate-video"): generate,
+        ("GET", "/status/"): status,
+        ("POST", "/feedback"): _received,
+        ("GET", "/health"): _healthy,
+    }, **behaviour)
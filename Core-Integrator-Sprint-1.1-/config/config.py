@@ -13,6 +13,16 @@ NOOPUR_BASE_URL = os.getenv("NOOPUR_BASE_URL", "http://localhost:5001")
 # Toggle remote integration; set to "1" or "true" to enable
 INTEGRATOR_USE_NOOPUR = os.getenv("INTEGRATOR_USE_NOOPUR", "false").lower() in ("1", "true", "yes")
 NOOPUR_API_KEY = os.getenv("NOOPUR_API_KEY", "")
+# Connection pool of the shared Noopur HTTP client
+NOOPUR_MAX_CONNECTIONS = int(os.getenv("NOOPUR_MAX_CONNECTIONS", "20"))
+NOOPUR_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("NOOPUR_MAX_KEEPALIVE_CONNECTIONS", "10"))
+NOOPUR_KEEPALIVE_EXPIRY_S = float(os.getenv("NOOPUR_KEEPALIVE_EXPIRY_S", "30"))
+# Durable outbox for interactions forwarded to Noopur (table lives in the context database by default)
+NOOPUR_OUTBOX_DB_PATH = os.getenv("NOOPUR_OUTBOX_DB_PATH", DB_PATH)
+NOOPUR_OUTBOX_BATCH_SIZE = int(os.getenv("NOOPUR_OUTBOX_BATCH_SIZE", "50"))
+NOOPUR_OUTBOX_POLL_INTERVAL_S = float(os.getenv("NOOPUR_OUTBOX_POLL_INTERVAL_S", "1"))
+NOOPUR_OUTBOX_BACKOFF_BASE_S = float(os.getenv("NOOPUR_OUTBOX_BACKOFF_BASE_S", "1"))
+NOOPUR_OUTBOX_BACKOFF_MAX_S = float(os.getenv("NOOPUR_OUTBOX_BACKOFF_MAX_S", "300"))
 # SSPL config
 # Allowed clock drift (seconds) for timestamps
 SSPL_ALLOW_DRIFT_SECONDS = int(os.getenv("SSPL_ALLOW_DRIFT_SECONDS", "300"))
@@ -22,6 +32,9 @@ MONGODB_CONNECTION_STRING = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://lo
 MONGODB_DATABASE_NAME = os.getenv("MONGODB_DATABASE_NAME", "core_integrator")
 USE_MONGODB = os.getenv("USE_MONGODB", "false").lower() in ("1", "true", "yes")
 
+# CreatorCore base URL (BridgeClient / AsyncBridgeClient default)
+CREATORCORE_BASE_URL = os.getenv("CREATORCORE_BASE_URL", "http://localhost:5002")
+
 # Video Service configuration (Text-to-Video)
 VIDEO_SERVICE_URL = os.getenv("VIDEO_SERVICE_URL", "http://localhost:5002")
 VIDEO_SERVICE_TIMEOUT = int(os.getenv("VIDEO_SERVICE_TIMEOUT", "300"))
@@ -29,6 +42,91 @@ VIDEO_SERVICE_TIMEOUT = int(os.getenv("VIDEO_SERVICE_TIMEOUT", "300"))
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# Async runtime: upper bound on threads used to run sync agents/adapters off the event loop
+SYNC_EXECUTOR_MAX_WORKERS = int(os.getenv("SYNC_EXECUTOR_MAX_WORKERS", "32"))
+
+# Context memory write-behind: queue interaction writes and group-commit them on a background thread
+MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+MEMORY_FLUSH_INTERVAL_MS = int(os.getenv("MEMORY_FLUSH_INTERVAL_MS", "50"))
+MEMORY_FLUSH_MAX_BATCH = int(os.getenv("MEMORY_FLUSH_MAX_BATCH", "256"))
+MEMORY_WRITE_QUEUE_SIZE = int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", "10000"))
+
+# Interaction retention: newest N per (user_id, module), trimmed by a background compactor
+MEMORY_RETENTION_PER_MODULE = int(os.getenv("MEMORY_RETENTION_PER_MODULE", "5"))
+MEMORY_COMPACTION_INTERVAL_S = float(os.getenv("MEMORY_COMPACTION_INTERVAL_S", "30"))
+MEMORY_COMPACTION_ROW_THRESHOLD = int(os.getenv("MEMORY_COMPACTION_ROW_THRESHOLD", "1000"))
+
+# Hot per-user context cache in front of the memory adapter
+CONTEXT_CACHE_ENABLED = os.getenv("CONTEXT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CONTEXT_CACHE_DEPTH = int(os.getenv("CONTEXT_CACHE_DEPTH", "5"))
+CONTEXT_CACHE_MAX_USERS = int(os.getenv("CONTEXT_CACHE_MAX_USERS", "10000"))
+CONTEXT_CACHE_TTL_S = float(os.getenv("CONTEXT_CACHE_TTL_S", "30"))
+
+# Batch endpoint (/core/batch)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+
+# CreatorCore bridge: shared async HTTP connection pool
+BRIDGE_MAX_CONNECTIONS = int(os.getenv("BRIDGE_MAX_CONNECTIONS", "20"))
+BRIDGE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("BRIDGE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+BRIDGE_KEEPALIVE_EXPIRY_S = float(os.getenv("BRIDGE_KEEPALIVE_EXPIRY_S", "30"))
+
+# Circuit breakers for external dependencies (CreatorCore, video service, Noopur)
+CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_WINDOW_S = float(os.getenv("CIRCUIT_WINDOW_S", "30"))
+CIRCUIT_OPEN_S = float(os.getenv("CIRCUIT_OPEN_S", "15"))
+CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+
+# Video job system: /core returns a job id, background workers submit to the video service and poll status
+VIDEO_JOBS_ENABLED = os.getenv("VIDEO_JOBS_ENABLED", "true").lower() in ("1", "true", "yes")
+VIDEO_JOBS_DB_PATH = os.getenv("VIDEO_JOBS_DB_PATH", DB_PATH)
+VIDEO_JOB_WORKERS = int(os.getenv("VIDEO_JOB_WORKERS", "4"))
+VIDEO_JOB_MAX_ATTEMPTS = int(os.getenv("VIDEO_JOB_MAX_ATTEMPTS", "3"))
+VIDEO_JOB_TIMEOUT_S = float(os.getenv("VIDEO_JOB_TIMEOUT_S", "1800"))
+VIDEO_POLL_MIN_INTERVAL_S = float(os.getenv("VIDEO_POLL_MIN_INTERVAL_S", "1"))
+VIDEO_POLL_MAX_INTERVAL_S = float(os.getenv("VIDEO_POLL_MAX_INTERVAL_S", "30"))
+# How long a process owns a job it drives; renewed on every step, must outlast a video service call
+VIDEO_JOB_LEASE_S = float(os.getenv("VIDEO_JOB_LEASE_S", "600"))
+
+# Status index for generation ids not tracked by the job table (coalesced checks, background refresh)
+VIDEO_STATUS_SWEEP_INTERVAL_S = float(os.getenv("VIDEO_STATUS_SWEEP_INTERVAL_S", "2"))
+VIDEO_STATUS_IDLE_S = float(os.getenv("VIDEO_STATUS_IDLE_S", "60"))
+VIDEO_STATUS_CACHE_MAX = int(os.getenv("VIDEO_STATUS_CACHE_MAX", "100000"))
+VIDEO_STATUS_CONCURRENCY = int(os.getenv("VIDEO_STATUS_CONCURRENCY", "8"))
+VIDEO_STATUS_MAX_IDS = int(os.getenv("VIDEO_STATUS_MAX_IDS", "100"))
+
+# Video catalog behind list_videos (defaults to a table in DB_PATH)
+VIDEO_CATALOG_DB_PATH = os.getenv("VIDEO_CATALOG_DB_PATH", DB_PATH)
+
+# Content-addressed generation cache shared by all workers (video and creator generations)
+GENERATION_CACHE_ENABLED = os.getenv("GENERATION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+GENERATION_CACHE_DB_PATH = os.getenv("GENERATION_CACHE_DB_PATH", DB_PATH)
+GENERATION_CACHE_TTL_S = float(os.getenv("GENERATION_CACHE_TTL_S", "86400"))
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "10000"))
+
+# Related-context cache for creator prewarming, keyed by (topic, goal, type)
+RELATED_CONTEXT_CACHE_ENABLED = os.getenv("RELATED_CONTEXT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RELATED_CONTEXT_TTL_S = float(os.getenv("RELATED_CONTEXT_TTL_S", "300"))
+RELATED_CONTEXT_STALE_S = float(os.getenv("RELATED_CONTEXT_STALE_S", "600"))
+RELATED_CONTEXT_MAX_KEYS = int(os.getenv("RELATED_CONTEXT_MAX_KEYS", "1000"))
+RELATED_CONTEXT_REFRESH_MIN_HITS = int(os.getenv("RELATED_CONTEXT_REFRESH_MIN_HITS", "3"))
+
+# Speculative prewarming of a user's next creator request (opt-in)
+SPECULATIVE_PREWARM_ENABLED = os.getenv("SPECULATIVE_PREWARM_ENABLED", "false").lower() in ("1", "true", "yes")
+SPECULATIVE_PREWARM_MAX_CONCURRENCY = int(os.getenv("SPECULATIVE_PREWARM_MAX_CONCURRENCY", "2"))
+SPECULATIVE_PREWARM_USER_BUDGET = int(os.getenv("SPECULATIVE_PREWARM_USER_BUDGET", "5"))
+SPECULATIVE_PREWARM_USER_WINDOW_S = float(os.getenv("SPECULATIVE_PREWARM_USER_WINDOW_S", "60"))
+SPECULATIVE_PREWARM_TTL_S = float(os.getenv("SPECULATIVE_PREWARM_TTL_S", "30"))
+
+# Background dependency health monitor behind /system/health
+HEALTH_CHECK_INTERVAL_S = float(os.getenv("HEALTH_CHECK_INTERVAL_S", "10"))
+HEALTH_CHECK_TIMEOUT_S = float(os.getenv("HEALTH_CHECK_TIMEOUT_S", "3"))
+
+# Per-request span timings: Server-Timing response header and a timing log line
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+
 def validate_config() -> None:
     """Validate critical configuration on startup and fail fast if missing."""
     critical_env_vars = []
@@ -1,7 +1,17 @@
-from typing import Dict, Any, List
-from src.utils.noopur_client import NoopurClient
-from config.config import INTEGRATOR_USE_NOOPUR
 import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from src.utils.noopur_client import get_noopur_client
+from src.utils.event_loop import get_background_loop
+from src.utils.executor import run_sync
+from src.utils.related_context import get_related_context_cache
+from src.core.request_context import RequestContext
+from config.config import INTEGRATOR_USE_NOOPUR
+
+# Upper bound on users holding speculatively prefetched context
+_PREFETCHED_MAX_USERS = 10000
 
 
 class CreatorRouter:
@@ -9,63 +19,153 @@ class CreatorRouter:
 
     def __init__(self, memory_adapter=None):
         self.memory = memory_adapter
-        # NoopurClient is the canonical surface for Noopur communication
-        self.noopur = NoopurClient() if INTEGRATOR_USE_NOOPUR else None
-
-    def prewarm_and_prepare(self, request: str, user_id: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Fetch related context and history, attach to input_data."""
-        async def _prepare():
-            try:
-                topic = input_data.get("topic") or input_data.get("data", {}).get("topic")
-                goal = input_data.get("goal") or input_data.get("data", {}).get("goal")
-                gen_type = input_data.get("type") or input_data.get("data", {}).get("type", "story")
-
-                # Get history from external service for better context
-                if self.noopur:
-                    try:
-                        history_resp = await self.noopur.history()
-                        if isinstance(history_resp, list):
-                            # Use recent history as additional context
-                            recent_history = history_resp[:5]  # Last 5 generations
-                            input_data.setdefault("recent_history", recent_history)
-                    except Exception:
-                        pass
-
-                # Generate with enhanced context
-                if self.noopur and topic and goal:
-                    payload = {"topic": topic, "goal": goal, "type": gen_type}
-                    resp = await self.noopur.generate(payload)
-                    related = resp.get("related_context", [])
-                    input_data.setdefault("related_context", related)
-                    
-                    # Store generation metadata to be deterministic at gateway level
-                    if "generated_text" in resp or "generation_id" in resp:
-                        input_data.setdefault("generation_metadata", {
-                            "source": "external",
-                            "can_provide_feedback": True,
-                            "generation_id": resp.get("generation_id")
-                        })
-                    return input_data
-
-                # Fallback: use local memory adapter
-                if self.memory and user_id:
-                    ctx = self.memory.get_context(user_id, limit=3)
-                    input_data.setdefault("related_context", ctx)
-                return input_data
+        # NoopurClient is the canonical surface for Noopur communication; one pooled client per process
+        self.noopur = get_noopur_client() if INTEGRATOR_USE_NOOPUR else None
+        # Related context is shared across users asking about the same topic
+        self.related_cache = get_related_context_cache()
+        # Context fetched speculatively after a user's previous creator request, used once by the next one
+        self._prefetched: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._prefetched_lock = threading.Lock()
 
-            except Exception:
-                # On any error, fallback to local memory
-                if self.memory and user_id:
-                    ctx = self.memory.get_context(user_id, limit=3)
-                    input_data.setdefault("related_context", ctx)
-                return input_data
+    @staticmethod
+    def _generation_params(input_data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], str]:
+        topic = input_data.get("topic") or input_data.get("data", {}).get("topic")
+        goal = input_data.get("goal") or input_data.get("data", {}).get("goal")
+        gen_type = input_data.get("type") or input_data.get("data", {}).get("type", "story")
+        return topic, goal, gen_type
+
+    async def speculate(self, user_id: str, input_data: Dict[str, Any], ttl_s: float) -> None:
+        """Fetch the history and related context the user's next creator request will need; keep them `ttl_s`"""
+        if not self.noopur:
+            return
+        topic, goal, gen_type = self._generation_params(input_data)
+        lookups = {"history": self.noopur.history()}
+        if topic and goal:
+            lookups["generate"] = self._related_generation(topic, goal, gen_type)
+        results = dict(zip(lookups, await asyncio.gather(*lookups.values(), return_exceptions=True)))
+
+        entry: Dict[str, Any] = {"expires_at": time.monotonic() + ttl_s}
+        if isinstance(results.get("history"), list):
+            entry["recent_history"] = results["history"]
+        related = results.get("generate")
+        if isinstance(related, tuple) and isinstance(related[0], dict):
+            entry["related_key"] = (topic, goal, gen_type)
+            entry["related"] = related[0]
+        with self._prefetched_lock:
+            self._prefetched[user_id] = entry
+            self._prefetched.move_to_end(user_id)
+            while len(self._prefetched) > _PREFETCHED_MAX_USERS:
+                self._prefetched.popitem(last=False)
 
+    def _take_prefetched(self, user_id: Optional[str]) -> Dict[str, Any]:
+        if not user_id:
+            return {}
+        with self._prefetched_lock:
+            entry = self._prefetched.pop(user_id, None)
+        if entry is None or entry["expires_at"] < time.monotonic():
+            return {}
+        return entry
+
+    async def _related_generation(self, topic: str, goal: str, gen_type: str) -> Tuple[Dict[str, Any], int]:
+        """Noopur /generate response for (topic, goal, type) and the number of upstream calls it took"""
+        payload = {"topic": topic, "goal": goal, "type": gen_type}
+        if self.related_cache is None:
+            return await self.noopur.generate(payload), 1
+        key = tuple(str(part).strip().lower() for part in (topic, goal, gen_type))
+        return await self.related_cache.get(key, lambda: self.noopur.generate(payload))
+
+    async def _local_context(self, user_id: str, limit: int = 3,
+                             request_context: Optional[RequestContext] = None) -> List[Dict[str, Any]]:
+        """Read context from the local memory adapter without blocking the loop."""
+        if request_context is not None:
+            # Already loaded by the gateway for this request
+            return await request_context.acontext(limit)
+        if hasattr(self.memory, "aget_context"):
+            return await self.memory.aget_context(user_id, limit=limit)
+        return await run_sync(self.memory.get_context, user_id, limit)
+
+    def prewarm_and_prepare(self, request: str, user_id: str, input_data: Dict[str, Any],
+                            request_context: Optional[RequestContext] = None) -> Dict[str, Any]:
+        """Fetch related context and history, attach to input_data.
+
+        With a `request_context`, local context comes from the request's
+        memoized copy instead of another adapter lookup.
+        """
         try:
-            return asyncio.run(_prepare())
+            return get_background_loop().run(self.aprewarm_and_prepare(request, user_id, input_data, request_context))
         except Exception:
             # Ultimate fallback
             if self.memory and user_id:
-                ctx = self.memory.get_context(user_id, limit=3)
+                if request_context is not None:
+                    ctx = request_context.context(limit=3)
+                else:
+                    ctx = self.memory.get_context(user_id, limit=3)
+                input_data.setdefault("related_context", ctx)
+            return input_data
+
+    async def aprewarm_and_prepare(self, request: str, user_id: str, input_data: Dict[str, Any],
+                                   request_context: Optional[RequestContext] = None) -> Dict[str, Any]:
+        """Async variant of `prewarm_and_prepare`, awaited directly on the caller's loop."""
+        try:
+            topic, goal, gen_type = self._generation_params(input_data)
+            # Anything speculatively prefetched for this user replaces the matching lookup
+            prefetched = self._take_prefetched(user_id)
+
+            # History and related-context lookups are independent: run them concurrently
+            lookups = {}
+            if self.noopur:
+                if "recent_history" not in prefetched:
+                    lookups["history"] = self.noopur.history()
+                if topic and goal and prefetched.get("related_key") != (topic, goal, gen_type):
+                    lookups["generate"] = self._related_generation(topic, goal, gen_type)
+            results = dict(zip(lookups, await asyncio.gather(*lookups.values(), return_exceptions=True)))
+            upstream_calls = 1 if "history" in lookups else 0
+            if self.noopur and "related" in prefetched and "generate" not in lookups and topic and goal:
+                results["generate"] = (prefetched["related"], 0)
+
+            history_resp = results.get("history", prefetched.get("recent_history"))
+            if isinstance(history_resp, list):
+                # Use recent history as additional context
+                recent_history = history_resp[:5]  # Last 5 generations
+                input_data.setdefault("recent_history", recent_history)
+
+            resp, calls = results.get("generate"), 0
+            if isinstance(resp, tuple):
+                resp, calls = resp
+                upstream_calls += calls
+            if request_context is not None:
+                request_context.upstream_calls += upstream_calls
+            if isinstance(resp, dict):
+                related = resp.get("related_context", [])
+                input_data.setdefault("related_context", related)
+
+                # Store generation metadata to be deterministic at gateway level; only a generation
+                # made for this request counts, never a cached or prefetched one
+                if calls == 1 and ("generated_text" in resp or "generation_id" in resp):
+                    input_data.setdefault("generation_metadata", {
+                        "source": "external",
+                        "can_provide_feedback": True,
+                        "generation_id": resp.get("generation_id")
+                    })
+                    # The prewarm already generated: CreatorAgent reuses it instead of generating again
+                    if request_context is not None and request_context.prewarm_generation is None:
+                        request_context.prewarm_generation = {
+                            "generation_id": resp.get("generation_id"),
+                            "generated_text": resp.get("generated_text"),
+                            "related_context": related
+                        }
+                return input_data
+
+            # Fallback: use local memory adapter
+            if self.memory and user_id:
+                ctx = await self._local_context(user_id, limit=3, request_context=request_context)
+                input_data.setdefault("related_context", ctx)
+            return input_data
+
+        except Exception:
+            # On any error, fallback to local memory
+            if self.memory and user_id:
+                ctx = await self._local_context(user_id, limit=3, request_context=request_context)
                 input_data.setdefault("related_context", ctx)
             return input_data
 
@@ -73,20 +173,27 @@ class CreatorRouter:
         """Normalize and forward to Noopur feedback endpoint."""
         if not self.noopur:
             return {"status": "disabled"}
-        
-        async def _feedback():
-            # Try multiple payload shapes
-            body = {}
-            if "id" in payload and "feedback" in payload:
-                body = {"id": payload["id"], "feedback": payload["feedback"]}
-            elif "generation_id" in payload and "command" in payload:
-                body = {"generation_id": payload["generation_id"], "command": payload["command"]}
-            else:
-                body = payload
 
-            return await self.noopur.feedback(body)
+        try:
+            return get_background_loop().run(self.aforward_feedback(payload))
+        except Exception:
+            return {"status": "error"}
+
+    async def aforward_feedback(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of `forward_feedback`."""
+        if not self.noopur:
+            return {"status": "disabled"}
+
+        # Try multiple payload shapes
+        body = {}
+        if "id" in payload and "feedback" in payload:
+            body = {"id": payload["id"], "feedback": payload["feedback"]}
+        elif "generation_id" in payload and "command" in payload:
+            body = {"generation_id": payload["generation_id"], "command": payload["command"]}
+        else:
+            body = payload
 
         try:
-            return asyncio.run(_feedback())
+            return await self.noopur.feedback(body)
         except Exception:
             return {"status": "error"}
@@ -1,15 +1,34 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Query
+from fastapi.responses import PlainTextResponse
 from typing import List, Dict, Any, Optional
 import os
 import sqlite3
 import logging
 from pathlib import Path
-from src.core.models import CoreRequest, CoreResponse
+from src.core.models import CoreRequest, CoreResponse, CoreBatchRequest, CoreBatchResponse
 from src.core.feedback_models import FeedbackRequest
 from src.core.gateway import Gateway
-from src.db.memory import ContextMemory
-from config.config import DB_PATH, validate_config, get_config_summary
+from src.db.memory import ContextMemory, close_writers, close_compactors
+from src.db.cached_adapter import CachedMemoryAdapter
+from config.config import (
+    DB_PATH, INTEGRATOR_USE_NOOPUR, HEALTH_CHECK_INTERVAL_S, HEALTH_CHECK_TIMEOUT_S,
+    validate_config, get_config_summary
+)
 from src.utils.security_hardening import security_middleware, validate_user_request, security
+from src.utils.executor import run_sync, shutdown_executor
+from src.utils.noopur_client import get_noopur_client, close_noopur_client
+from src.utils.event_loop import shutdown_background_loop
+from src.utils.bridge_client import close_async_bridge_clients
+from src.utils.video_jobs import close_video_jobs, video_job_stats
+from src.utils.video_status import close_video_status_index, video_status_stats
+from src.db.video_catalog import close_video_catalog
+from src.db.generation_cache import close_generation_cache, generation_cache_stats
+from src.utils.related_context import related_context_stats
+from src.utils.circuit_breaker import breaker_states, breaker_snapshots
+from src.utils.health_monitor import HealthMonitor
+from src.utils.timing import span, server_timing_middleware
+from src.utils.metrics import REGISTRY, metrics_middleware
+from contextlib import asynccontextmanager
 import asyncio
 
 # Validate configuration on startup
@@ -28,27 +47,90 @@ else:
     async def require_sspl():
         return True
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: release shared runtime resources on shutdown."""
+    # Have dependency health cached before the first probe arrives
+    try:
+        await asyncio.wait_for(asyncio.wrap_future(health_monitor.start()), HEALTH_CHECK_TIMEOUT_S + 1)
+    except asyncio.TimeoutError:
+        logging.warning("Initial dependency health check did not finish in time")
+    yield
+    health_monitor.close()
+    # Commit any write-behind interactions before the process exits, then run a final retention pass
+    await run_sync(close_writers)
+    await run_sync(close_compactors)
+    close_adapter = getattr(gateway.memory, "close", None)
+    if close_adapter:
+        await run_sync(close_adapter)
+    # Stop video job workers; unfinished jobs stay in the job table and resume on the next start
+    await run_sync(close_video_jobs)
+    await run_sync(close_video_status_index)
+    await run_sync(close_video_catalog)
+    await run_sync(close_generation_cache)
+    # Close pooled Noopur / CreatorCore connections on the loop that owns them, then stop that loop
+    await run_sync(close_noopur_client)
+    await run_sync(close_async_bridge_clients)
+    await run_sync(shutdown_background_loop)
+    shutdown_executor(wait=False)
+
 app = FastAPI(
     title="Unified Backend Bridge",
     description="Central orchestration layer for Finance, Education, and Creator agents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add security middleware
 app.middleware("http")(security_middleware)
+app.middleware("http")(metrics_middleware)
+# Registered last so it is outermost and its spans cover the security checks too
+app.middleware("http")(server_timing_middleware)
 
 # Initialize gateway and memory
 gateway = Gateway()
 memory = ContextMemory(DB_PATH)
 
+
+def _check_database() -> str:
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("SELECT 1").fetchone()
+    return "up"
+
+
+async def _probe_database() -> str:
+    return await run_sync(_check_database)
+
+
+async def _probe_noopur() -> str:
+    if not INTEGRATOR_USE_NOOPUR:
+        return "disabled"
+    # Shared pooled NoopurClient; hits Noopur's own /system/health
+    return await get_noopur_client().health_check()
+
+
+async def _probe_video_service() -> str:
+    # The video service's /health endpoint, never a real generation
+    health = await run_sync(gateway.video_bridge_client.health_check)
+    return "down" if health.get("status") == "unhealthy" else "up"
+
+
+# Dependencies are probed in the background; /system/health reads the cached results
+health_monitor = HealthMonitor(
+    {"database": _probe_database, "noopur": _probe_noopur, "video_service": _probe_video_service},
+    interval_s=HEALTH_CHECK_INTERVAL_S,
+    timeout_s=HEALTH_CHECK_TIMEOUT_S
+)
+
 @app.post("/core", response_model=CoreResponse)
 async def core_endpoint(request: CoreRequest, http_request: Request, _sspl=Depends(require_sspl)) -> CoreResponse:
     """Main gateway endpoint for processing agent requests"""
     try:
         # Security validation
-        validated_user_id = validate_user_request(request.user_id, http_request)
+        with span("security"):
+            validated_user_id = validate_user_request(request.user_id, http_request)
         
-        response = gateway.process_request(
+        response = await gateway.aprocess_request(
             module=request.module,
             intent=request.intent, 
             user_id=validated_user_id,
@@ -60,30 +142,93 @@ async def core_endpoint(request: CoreRequest, http_request: Request, _sspl=Depen
             raise HTTPException(status_code=500, detail="Processing failed")
         
         # Sanitize response
-        sanitized_response = security.sanitize_response(response)
+        with span("sanitize"):
+            sanitized_response = security.sanitize_response(response)
         sanitized_response.setdefault('message', 'Request processed')
         sanitized_response.setdefault('result', {})
         
-        return CoreResponse(**sanitized_response)
+        with span("response_model"):
+            return CoreResponse(**sanitized_response)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Processing failed")
 
+def _to_core_response(response: Any) -> CoreResponse:
+    """Validate, sanitize and wrap a gateway response into a CoreResponse"""
+    if not isinstance(response, dict) or 'status' not in response:
+        return CoreResponse(status="error", message="Processing failed", result={})
+    with span("sanitize"):
+        sanitized_response = security.sanitize_response(response)
+    sanitized_response.setdefault('message', 'Request processed')
+    sanitized_response.setdefault('result', {})
+    with span("response_model"):
+        return CoreResponse(**sanitized_response)
+
+@app.post("/core/batch", response_model=CoreBatchResponse)
+async def core_batch_endpoint(batch: CoreBatchRequest, http_request: Request, _sspl=Depends(require_sspl)) -> CoreBatchResponse:
+    """Batch gateway endpoint: process many agent requests concurrently.
+
+    Each item goes through the same user checks as /core (format, enumeration
+    detection and rate limits); an item that fails them gets an error result
+    carrying the HTTP status /core would have returned. Results are returned in
+    input order and failures are reported per item instead of failing the batch.
+    """
+    results: List[Optional[CoreResponse]] = [None] * len(batch.requests)
+    pending_index = []
+    pending_items = []
+    for index, item in enumerate(batch.requests):
+        try:
+            with span("security"):
+                validate_user_request(item.user_id, http_request)
+        except HTTPException as e:
+            results[index] = CoreResponse(status="error", message=e.detail, result={"status_code": e.status_code})
+            continue
+        pending_index.append(index)
+        pending_items.append({
+            "module": item.module,
+            "intent": item.intent,
+            "user_id": item.user_id,
+            "data": item.data
+        })
+
+    try:
+        responses = await gateway.aprocess_batch(pending_items, concurrency=batch.concurrency) if pending_items else []
+    except Exception:
+        raise HTTPException(status_code=500, detail="Processing failed")
+
+    for index, response in zip(pending_index, responses):
+        try:
+            results[index] = _to_core_response(response)
+        except Exception:
+            results[index] = CoreResponse(status="error", message="Processing failed", result={})
+
+    return CoreBatchResponse(results=results)
+
 @app.get("/get-history")
-async def get_history(user_id: str, request: Request) -> List[Dict[str, Any]]:
-    """Get full interaction history for a user"""
+async def get_history(user_id: str, request: Request, response: Response,
+                      limit: int = Query(10, ge=1, le=100), cursor: Optional[str] = None,
+                      module: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get a page of interaction history for a user (newest first).
+
+    The cursor for the next page is returned in the `X-Next-Cursor` header,
+    which is absent on the last page.
+    """
     try:
         # Security validation
         validated_user_id = validate_user_request(user_id, request)
         
-        history = memory.get_user_history(validated_user_id)
+        try:
+            history = await run_sync(memory.get_user_history, validated_user_id, limit, cursor, module)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid history cursor")
+        if history.next_cursor:
+            response.headers["X-Next-Cursor"] = history.next_cursor
         
-        # Limit and sanitize history
-        limited_history = history[:10]  # Limit to 10 most recent
+        # Sanitize history
         sanitized_history = []
         
-        for item in limited_history:
+        for item in history:
             sanitized_item = {
                 "module": item.get("module"),
                 "timestamp": item.get("timestamp"),
@@ -104,7 +249,7 @@ async def get_context(user_id: str, request: Request) -> List[Dict[str, Any]]:
         # Security validation
         validated_user_id = validate_user_request(user_id, request)
         
-        context = memory.get_context(validated_user_id)
+        context = await run_sync(memory.get_context, validated_user_id)
         
         # Sanitize context data
         sanitized_context = []
@@ -133,55 +278,29 @@ async def root():
 
 @app.get("/system/health")
 async def system_health():
-    """System health check - binary status with explicit dependency checks"""
+    """System health check - binary status from the background dependency monitor's cache"""
     try:
-        # Check database connectivity
-        database_status = "up"
-        try:
-            with sqlite3.connect(DB_PATH) as conn:
-                conn.execute("SELECT 1").fetchone()
-        except Exception:
-            database_status = "down"
+        # No-op once started by the lifespan; starts probing if the app runs without it
+        health_monitor.start()
+        checks = health_monitor.snapshot()
+        dependencies = {name: check["status"] for name, check in checks.items()}
 
         # Check gateway initialization
-        gateway_status = "up" if gateway is not None else "down"
-
-        # Check external services
-        noopur_status = "disabled"
-        if os.getenv("INTEGRATOR_USE_NOOPUR", "false").lower() in ("1", "true", "yes"):
-            try:
-                # Use NoopurClient for health check
-                from src.utils.noopur_client import NoopurClient
-                noopur_client = NoopurClient()
-                noopur_status = asyncio.run(noopur_client.health_check())
-            except Exception:
-                noopur_status = "down"
-
-        video_service_status = "disabled"
-        try:
-            # Check video service health
-            video_health = gateway.video_bridge_client.generate_video("test")
-            video_service_status = "up" if not video_health.get("fallback_used", True) else "down"
-        except Exception:
-            video_service_status = "down"
+        dependencies["gateway"] = "up" if gateway is not None else "down"
 
-        # Determine overall status
-        dependencies = [database_status, gateway_status]
-        if noopur_status != "disabled":
-            dependencies.append(noopur_status)
-        if video_service_status != "disabled":
-            dependencies.append(video_service_status)
-
-        overall_status = "ok" if all(dep in ["up", "disabled"] for dep in dependencies) else "down"
+        # Determine overall status ("unknown" only before the first probe pass finishes)
+        overall_status = "ok" if all(dep in ["up", "disabled"] for dep in dependencies.values()) else "down"
 
         return {
             "status": overall_status,
             "dependencies": {
-                "database": database_status,
-                "gateway": gateway_status,
-                "noopur": noopur_status,
-                "video_service": video_service_status
+                "database": dependencies["database"],
+                "gateway": dependencies["gateway"],
+                "noopur": dependencies["noopur"],
+                "video_service": dependencies["video_service"]
             },
+            "checks": checks,
+            "circuit_breakers": breaker_states(),
             "timestamp": __import__('datetime').datetime.utcnow().isoformat() + 'Z'
         }
     except Exception as e:
@@ -191,6 +310,11 @@ async def system_health():
             "timestamp": __import__('datetime').datetime.utcnow().isoformat() + 'Z'
         }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/system/diagnostics")
 async def system_diagnostics():
     """System diagnostics - internal details for monitoring"""
@@ -218,16 +342,33 @@ async def system_diagnostics():
             agent_status[name] = "loaded" if agent is not None else "failed"
 
         # Memory adapter info
-        memory_adapter = type(gateway.memory).__name__
+        memory_adapter = type(getattr(gateway.memory, "backend", gateway.memory)).__name__
+        context_cache = gateway.memory.cache_stats() if isinstance(gateway.memory, CachedMemoryAdapter) else None
+        retention_source = gateway.memory if hasattr(gateway.memory, "retention_stats") else memory
+        outbox_stats = getattr(gateway.memory, "outbox_stats", None)
+        noopur_outbox = await run_sync(outbox_stats) if outbox_stats else None
+        pipeline_stats = getattr(gateway.agents.get("creator"), "pipeline_stats", None)
+        creator_pipeline = pipeline_stats() if pipeline_stats else None
 
         return {
             "config": config,
             "database": {
                 "status": db_status,
                 "latency_ms": db_latency,
-                "adapter": memory_adapter
+                "adapter": memory_adapter,
+                "write_behind": memory.writer_stats(),
+                "retention": retention_source.retention_stats(),
+                "context_cache": context_cache,
+                "noopur_outbox": noopur_outbox,
+                "generation_cache": await run_sync(generation_cache_stats)
             },
             "agents": agent_status,
+            "video_jobs": await run_sync(video_job_stats),
+            "video_status": video_status_stats(),
+            "creator_pipeline": creator_pipeline,
+            "related_context_cache": related_context_stats(),
+            "speculative_prewarm": gateway.prewarmer.stats() if gateway.prewarmer else None,
+            "circuit_breakers": breaker_snapshots(),
             "feature_flags": {
                 "sspl_enabled": os.getenv("SSPL_ENABLED", "false").lower() in ("1", "true", "yes"),
                 "noopur_integration": config["noopur_enabled"],
@@ -250,7 +391,7 @@ async def submit_feedback(request: FeedbackRequest, http_request: Request, _sspl
         if user_id != "anonymous":
             user_id = validate_user_request(user_id, http_request)
             
-        response = gateway.process_request(
+        response = await gateway.aprocess_request(
             module="creator",
             intent="feedback",
             user_id=user_id,
@@ -275,7 +416,7 @@ async def get_creator_history(user_id: str, request: Request):
             
         validated_user_id = validate_user_request(user_id, request)
         
-        response = gateway.process_request(
+        response = await gateway.aprocess_request(
             module="creator",
             intent="history",
             user_id=validated_user_id,
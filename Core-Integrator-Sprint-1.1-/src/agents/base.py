@@ -1,11 +1,25 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List
+from ..utils.executor import run_sync
 
 class BaseAgent(ABC):
     """Base class for all agents"""
+
+    # Gateway stages this agent consumes, merged over DEFAULT_CONTEXT_NEEDS in core.request_context
+    # e.g. {"context": 0} when `context` is never read, {"history": True} for CreatorRouter prewarming
+    CONTEXT_NEEDS: Dict[str, Any] = {}
     
     @abstractmethod
     def handle_request(self, intent: str, data: Dict[str, Any], 
                       context: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Handle incoming request with optional context"""
-        pass
\ No newline at end of file
+        pass
+
+    async def ahandle_request(self, intent: str, data: Dict[str, Any],
+                              context: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of `handle_request`.
+
+        Sync agents inherit this default, which runs `handle_request` on the
+        bounded executor. Agents with native async I/O should override it.
+        """
+        return await run_sync(self.handle_request, intent, data, context)
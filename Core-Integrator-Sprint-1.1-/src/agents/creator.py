@@ -1,55 +1,207 @@
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional
 from .base import BaseAgent
 import requests
 from config.config import NOOPUR_BASE_URL
-from src.utils.bridge_client import BridgeClient
+from src.utils.bridge_client import get_bridge_client, get_async_bridge_client
+from src.utils.executor import run_sync
+from src.db.generation_cache import get_generation_cache
 from ..core.feedback_models import CanonicalFeedbackSchema
+from ..core.request_context import current_request_context
 
 class CreatorAgent(BaseAgent):
     """Creator module agent for creative operations"""
+
+    # Context arrives through CreatorRouter (related_context / recent_history), not the `context` argument
+    CONTEXT_NEEDS = {"context": 0, "history": True}
     
     def __init__(self):
         super().__init__()
         # Use BridgeClient as the canonical CreatorCore integration surface
-        self.bridge = BridgeClient()
+        self.bridge = get_bridge_client()
+        # Async path shares one pooled client with the rest of the process
+        self.abridge = get_async_bridge_client()
+        # Content-addressed cache shared by all workers: a repeated prompt reuses its generation
+        self.generations = get_generation_cache()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "upstream_calls": 0, "reused_prewarm": 0, "cache_hits": 0}
     
     def handle_request(self, intent: str, data: Dict[str, Any], 
                       context: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Handle creator-related requests using enhanced data from CreatorRouter"""
         
         if intent == "generate":
-            # Use related_context from CreatorRouter if available
-            related_context = data.get("related_context", [])
-            
-            # Try to call external CreatorCore service via BridgeClient
+            # Call external CreatorCore via BridgeClient only when neither the prewarm nor the cache has a generation
             prompt = data.get("prompt") or data.get("topic", "")
-            if prompt:
-                external_result = self.bridge.generate({"prompt": prompt})
+            external_result, calls = self._reused_generation(data, prompt), 0
+            if external_result is None and prompt:
+                external_result, calls = self.bridge.generate({"prompt": prompt}), 1
+                self._cache_generation(prompt, external_result)
+            return self._generate_response(data, external_result, calls)
+            
+        elif intent == "feedback":
+            # Data is already validated by Gateway using CanonicalFeedbackSchema
+            try:
+                feedback_schema = CanonicalFeedbackSchema(**data)
                 
-                if not external_result.get("error"):
-                    return {
-                        "status": "success",
-                        "message": "Creative content generated via external service",
-                        "result": {
-                            "generation_id": external_result.get("generation_id"),
-                            "generated_text": external_result.get("generated_text"),
-                            "related_context": external_result.get("related_context", related_context),
-                            "recent_history": data.get("recent_history", [])
-                        }
-                    }
+                # Forward to Noopur using canonical schema
+                result = self.bridge.feedback(feedback_schema.to_noopur_format())
+                return self._feedback_response(feedback_schema, result)
+            except Exception as e:
+                return self._feedback_error(e)
             
-            # Fallback: use enhanced data from CreatorRouter
+        elif intent == "history":
+            # Get history from external service with resilient client
+            return self._history_response(data, self.bridge.history())
+            
+        return self._local_response(intent, data)
+
+    async def ahandle_request(self, intent: str, data: Dict[str, Any],
+                              context: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Native async variant: CreatorCore calls go through the pooled AsyncBridgeClient"""
+        if intent == "generate":
+            prompt = data.get("prompt") or data.get("topic", "")
+            external_result, calls = await run_sync(self._reused_generation, data, prompt), 0
+            if external_result is None and prompt:
+                external_result, calls = await self.abridge.generate({"prompt": prompt}), 1
+                await run_sync(self._cache_generation, prompt, external_result)
+            return self._generate_response(data, external_result, calls)
+
+        elif intent == "feedback":
+            try:
+                feedback_schema = CanonicalFeedbackSchema(**data)
+                result = await self.abridge.feedback(feedback_schema.to_noopur_format())
+                return self._feedback_response(feedback_schema, result)
+            except Exception as e:
+                return self._feedback_error(e)
+
+        elif intent == "history":
+            return self._history_response(data, await self.abridge.history())
+
+        return self._local_response(intent, data)
+
+    def _reused_generation(self, data: Dict[str, Any], prompt: str) -> Optional[Dict[str, Any]]:
+        """A generation that already exists for this request: the prewarm's, or a cached one"""
+        request_context = current_request_context()
+        prewarm = request_context.prewarm_generation if request_context is not None else None
+        if prewarm and prewarm.get("generated_text"):
+            self._count("reused_prewarm")
+            return prewarm
+        cached = self.generations.get("creator", self._cache_key(prompt)) if self.generations and prompt else None
+        if cached is not None:
+            self._count("cache_hits")
+        return cached
+
+    def _cache_generation(self, prompt: str, external_result: Dict[str, Any]) -> None:
+        # Only real generations are reused; errors and fallbacks are retried next time
+        if self.generations and external_result.get("success") is not False and not external_result.get("error"):
+            self.generations.put("creator", self._cache_key(prompt), external_result)
+
+    @staticmethod
+    def _cache_key(prompt: str) -> Dict[str, Any]:
+        # Per user: a generation_id is owned by the user it was made for and must not be handed to anyone else
+        request_context = current_request_context()
+        return {"prompt": prompt, "user_id": request_context.user_id if request_context is not None else None}
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def pipeline_stats(self) -> Dict[str, Any]:
+        """Generate requests handled and upstream calls made for them (prewarm lookups included)"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["upstream_calls_per_request"] = (
+            round(stats["upstream_calls"] / stats["requests"], 3) if stats["requests"] else None
+        )
+        return stats
+
+    def _generate_response(self, data: Dict[str, Any], external_result: Optional[Dict[str, Any]],
+                           calls: int = 0) -> Dict[str, Any]:
+        # Upstream round trips for this request: CreatorRouter's prewarm lookups plus our own generate call
+        request_context = current_request_context()
+        upstream_calls = (request_context.upstream_calls if request_context is not None else 0) + calls
+        self._count("requests")
+        self._count("upstream_calls", upstream_calls)
+        # Use related_context from CreatorRouter if available
+        related_context = data.get("related_context", [])
+        if external_result is not None and not external_result.get("error"):
             return {
                 "status": "success",
-                "message": "Creative content generated with context",
+                "message": "Creative content generated via external service",
                 "result": {
-                    "content": f"Generated content for: {data.get('topic', 'unknown topic')}",
-                    "related_context": related_context,
-                    "enhanced_data": data
+                    "generation_id": external_result.get("generation_id"),
+                    "generated_text": external_result.get("generated_text"),
+                    "related_context": external_result.get("related_context", related_context),
+                    "recent_history": data.get("recent_history", []),
+                    "upstream_calls": upstream_calls
                 }
             }
+        
+        # Fallback: use enhanced data from CreatorRouter
+        return {
+            "status": "success",
+            "message": "Creative content generated with context",
+            "result": {
+                "content": f"Generated content for: {data.get('topic', 'unknown topic')}",
+                "related_context": related_context,
+                "enhanced_data": data,
+                "upstream_calls": upstream_calls
+            }
+        }
+
+    @staticmethod
+    def _feedback_response(feedback_schema: CanonicalFeedbackSchema, result: Dict[str, Any]) -> Dict[str, Any]:
+        if not result.get("error"):
+            return {
+                "status": "success",
+                "message": "Feedback forwarded to external service",
+                "result": {
+                    "forwarded": True,
+                    "feedback_data": feedback_schema.to_storage_format(),
+                    "external_response": result
+                }
+            }
+        
+        # Fallback: store locally if forwarding fails
+        return {
+            "status": "success",
+            "message": "Feedback stored locally (external service unavailable)",
+            "result": {
+                "forwarded": False,
+                "feedback_data": feedback_schema.to_storage_format()
+            }
+        }
+
+    @staticmethod
+    def _feedback_error(error: Exception) -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "message": f"Feedback processing failed: {str(error)}",
+            "result": {}
+        }
+
+    @staticmethod
+    def _history_response(data: Dict[str, Any], history_result: Dict[str, Any]) -> Dict[str, Any]:
+        if not history_result.get("error"):
+            return {
+                "status": "success",
+                "message": "History retrieved from external service",
+                "result": {"history": history_result}
+            }
             
-        elif intent == "analyze":
+        # Fallback to local context
+        related_context = data.get("related_context", [])
+        return {
+            "status": "success",
+            "message": "Local history retrieved",
+            "result": {"history": related_context}
+        }
+
+    @staticmethod
+    def _local_response(intent: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Intents answered locally from the context CreatorRouter attached"""
+        if intent == "analyze":
             related_context = data.get("related_context", [])
             return {
                 "status": "success",
@@ -73,61 +225,6 @@ class CreatorAgent(BaseAgent):
                 }
             }
             
-        elif intent == "feedback":
-            # Data is already validated by Gateway using CanonicalFeedbackSchema
-            try:
-                feedback_schema = CanonicalFeedbackSchema(**data)
-                
-                # Forward to Noopur using canonical schema
-                noopur_payload = feedback_schema.to_noopur_format()
-                result = self.bridge.feedback(noopur_payload)
-                
-                if not result.get("error"):
-                    return {
-                        "status": "success",
-                        "message": "Feedback forwarded to external service",
-                        "result": {
-                            "forwarded": True,
-                            "feedback_data": feedback_schema.to_storage_format(),
-                            "external_response": result
-                        }
-                    }
-                
-                # Fallback: store locally if forwarding fails
-                return {
-                    "status": "success",
-                    "message": "Feedback stored locally (external service unavailable)",
-                    "result": {
-                        "forwarded": False,
-                        "feedback_data": feedback_schema.to_storage_format()
-                    }
-                }
-            except Exception as e:
-                return {
-                    "status": "error",
-                    "message": f"Feedback processing failed: {str(e)}",
-                    "result": {}
-                }
-            
-        elif intent == "history":
-            # Get history from external service with resilient client
-            history_result = self.bridge.history()
-            
-            if not history_result.get("error"):
-                return {
-                    "status": "success",
-                    "message": "History retrieved from external service",
-                    "result": {"history": history_result}
-                }
-                
-            # Fallback to local context
-            related_context = data.get("related_context", [])
-            return {
-                "status": "success",
-                "message": "Local history retrieved",
-                "result": {"history": related_context}
-            }
-            
         else:
             return {
                 "status": "error",
@@ -3,6 +3,9 @@ from .base import BaseAgent
 
 class EducationAgent(BaseAgent):
     """Education module agent for educational operations"""
+
+    # Requests are answered from `data` alone
+    CONTEXT_NEEDS = {"context": 0}
     
     def handle_request(self, intent: str, data: Dict[str, Any], 
                       context: List[Dict[str, Any]] = None) -> Dict[str, Any]:
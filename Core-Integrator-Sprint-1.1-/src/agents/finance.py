@@ -3,6 +3,9 @@ from .base import BaseAgent
 
 class FinanceAgent(BaseAgent):
     """Finance module agent for financial operations"""
+
+    # Requests are answered from `data` alone
+    CONTEXT_NEEDS = {"context": 0}
     
     def handle_request(self, intent: str, data: Dict[str, Any], 
                       context: List[Dict[str, Any]] = None) -> Dict[str, Any]:
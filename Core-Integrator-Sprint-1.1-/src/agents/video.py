@@ -1,16 +1,31 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .base import BaseAgent
 from ..utils.logger import setup_logger
 from ..utils.video_bridge_client import VideoBridgeClient
+from ..utils.video_jobs import get_video_jobs, remote_state
+from ..utils.video_status import get_video_status_index
+from ..db.video_catalog import get_video_catalog
+from ..db.video_jobs import FAILED
+from ..db.generation_cache import get_generation_cache, request_digest
+from config.config import VIDEO_JOBS_ENABLED, VIDEO_STATUS_MAX_IDS
 
 
 class VideoAgent(BaseAgent):
     """Agent for text-to-video generation and management"""
+
+    # Video requests never read user context
+    CONTEXT_NEEDS = {"context": 0}
     
     def __init__(self):
         self.logger = setup_logger(__name__)
         # Use VideoBridgeClient for external text-to-video service communication
         self.video_bridge = VideoBridgeClient()
+        # Job manager: generation runs in the background and status is answered from the local job table
+        self.jobs = get_video_jobs() if VIDEO_JOBS_ENABLED else None
+        # Persistent catalog behind list_videos, filled from generate and status results
+        self.catalog = get_video_catalog()
+        # Content-addressed cache shared by all workers: duplicate requests reuse the existing generation
+        self.generations = get_generation_cache()
     
     def handle_request(self, intent: str, data: Dict[str, Any], 
                       context: List[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -45,6 +60,36 @@ class VideoAgent(BaseAgent):
             
             self.logger.info(f"Video generation request: {topic}")
             
+            request = {"text": text, "topic": topic, "style": style, "duration": duration, "language": language}
+            # Identical requests of the same user (from any worker) reuse the existing generation; jobs and
+            # catalog entries belong to one user, so other users get their own
+            key = {**request, "user_id": data.get("user_id")}
+            cached = self.generations.get("video", key) if self.generations else None
+            
+            if self.jobs is not None:
+                job = self.jobs.get(cached["generation_id"]) if cached else None
+                if job is not None and job["state"] != FAILED:
+                    return {
+                        "status": "success",
+                        "message": "Existing video generation reused",
+                        "result": self._job_result(job)
+                    }
+                job = self.jobs.submit(request, user_id=data.get("user_id"))
+                if self.generations:
+                    self.generations.put("video", key, {"generation_id": job["job_id"]})
+                return {
+                    "status": "success",
+                    "message": "Video generation queued",
+                    "result": self._job_result(job)
+                }
+            
+            if cached is not None and "status" in cached:
+                return {
+                    "status": "success",
+                    "message": "Existing video generation reused",
+                    "result": cached
+                }
+            
             # Try to call external video service via VideoBridgeClient
             external_result = self.video_bridge.generate_video(
                 text=text,
@@ -56,19 +101,23 @@ class VideoAgent(BaseAgent):
             
             # Check if external service call was successful
             if external_result.get("success") is not False:
+                result = {
+                    "generation_id": external_result.get("generation_id", self._fallback_id(key)),
+                    "status": external_result.get("status", "processing"),
+                    "video_url": external_result.get("video_url"),
+                    "video_path": external_result.get("video_path"),
+                    "topic": topic,
+                    "style": style,
+                    "duration": external_result.get("duration", duration),
+                    "metadata": external_result.get("metadata", {})
+                }
+                self._catalog_remote(result, data.get("user_id"))
+                if self.generations:
+                    self.generations.put("video", key, result)
                 return {
                     "status": "success",
                     "message": "Video generation started via external service",
-                    "result": {
-                        "generation_id": external_result.get("generation_id", f"vid_{hash(text) % 10000000}"),
-                        "status": external_result.get("status", "processing"),
-                        "video_url": external_result.get("video_url"),
-                        "video_path": external_result.get("video_path"),
-                        "topic": topic,
-                        "style": style,
-                        "duration": external_result.get("duration", duration),
-                        "metadata": external_result.get("metadata", {})
-                    }
+                    "result": result
                 }
             
             # Fallback: return local mock response if external service unavailable
@@ -77,7 +126,7 @@ class VideoAgent(BaseAgent):
                 "status": "success",
                 "message": "Video generation started (fallback mode)",
                 "result": {
-                    "generation_id": f"vid_{hash(text) % 10000000}",
+                    "generation_id": self._fallback_id(key),
                     "status": "processing",
                     "topic": topic,
                     "style": style,
@@ -93,8 +142,30 @@ class VideoAgent(BaseAgent):
             }
     
     def _get_status(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Get video generation status from external service"""
+        """Get video generation status for one generation_id or a list of generation_ids"""
         try:
+            generation_ids = data.get("generation_ids")
+            if generation_ids is not None:
+                if (not isinstance(generation_ids, list) or not generation_ids
+                        or not all(isinstance(gid, str) and gid for gid in generation_ids)):
+                    return {
+                        "status": "error",
+                        "message": "generation_ids must be a non-empty list of strings"
+                    }
+                if len(generation_ids) > VIDEO_STATUS_MAX_IDS:
+                    return {
+                        "status": "error",
+                        "message": f"At most {VIDEO_STATUS_MAX_IDS} generation_ids per request"
+                    }
+                statuses = self._statuses(generation_ids)
+                return {
+                    "status": "success",
+                    "result": {
+                        "statuses": statuses,
+                        "count": len(statuses)
+                    }
+                }
+            
             generation_id = data.get("generation_id")
             if not generation_id:
                 return {
@@ -102,31 +173,9 @@ class VideoAgent(BaseAgent):
                     "message": "generation_id is required"
                 }
             
-            # Try to get status from external video service
-            external_result = self.video_bridge.get_video_status(generation_id)
-            
-            if external_result.get("success") is not False:
-                return {
-                    "status": "success",
-                    "result": {
-                        "generation_id": generation_id,
-                        "status": external_result.get("status", "completed"),
-                        "video_url": external_result.get("video_url", f"/videos/{generation_id}.mp4"),
-                        "video_path": external_result.get("video_path"),
-                        "duration": external_result.get("duration"),
-                        "metadata": external_result.get("metadata", {})
-                    }
-                }
-            
-            # Fallback: return mock completed status
             return {
                 "status": "success",
-                "result": {
-                    "generation_id": generation_id,
-                    "status": "completed",
-                    "video_url": f"/videos/{generation_id}.mp4",
-                    "fallback_used": True
-                }
+                "result": self._statuses([generation_id])[0]
             }
         except Exception as e:
             self.logger.error(f"Status check failed: {e}")
@@ -135,17 +184,106 @@ class VideoAgent(BaseAgent):
                 "message": str(e)
             }
     
+    def _statuses(self, generation_ids: List[str]) -> List[Dict[str, Any]]:
+        """Status results in request order: local jobs from the job table, other ids from the status index"""
+        results: Dict[str, Dict[str, Any]] = {}
+        unknown = []
+        for generation_id in generation_ids:
+            job = self.jobs.get(generation_id) if self.jobs is not None else None
+            if job is not None:
+                results[generation_id] = self._job_result(job)
+            else:
+                unknown.append(generation_id)
+        
+        if unknown:
+            # Ids the job table does not know: ask the external video service through the shared index
+            remote = get_video_status_index().get_many(unknown)
+            for generation_id in unknown:
+                results[generation_id] = self._remote_status_result(generation_id, remote[generation_id])
+                if remote[generation_id].get("success") is not False:
+                    self._refresh_catalog(results[generation_id])
+        return [results[generation_id] for generation_id in generation_ids]
+    
+    @staticmethod
+    def _remote_status_result(generation_id: str, external_result: Dict[str, Any]) -> Dict[str, Any]:
+        if external_result.get("success") is not False:
+            return {
+                "generation_id": generation_id,
+                "status": external_result.get("status", "completed"),
+                "video_url": external_result.get("video_url", f"/videos/{generation_id}.mp4"),
+                "video_path": external_result.get("video_path"),
+                "duration": external_result.get("duration"),
+                "metadata": external_result.get("metadata", {})
+            }
+        
+        # Fallback: return mock completed status
+        return {
+            "generation_id": generation_id,
+            "status": "completed",
+            "video_url": f"/videos/{generation_id}.mp4",
+            "fallback_used": True
+        }
+    
+    @staticmethod
+    def _fallback_id(key: Dict[str, Any]) -> str:
+        """Generation id derived from the request content and user, stable across workers and restarts"""
+        return f"vid_{request_digest('video', key)[:16]}"
+    
+    @staticmethod
+    def _job_result(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Client view of a video job; the job id doubles as the generation_id"""
+        request = job["request"]
+        video = job["result"] or {}
+        result = {
+            "generation_id": job["job_id"],
+            "job_id": job["job_id"],
+            "status": job["state"],
+            "video_url": video.get("video_url"),
+            "video_path": video.get("video_path"),
+            "topic": request.get("topic"),
+            "style": request.get("style"),
+            "duration": video.get("duration") or request.get("duration"),
+            "progress": video.get("progress"),
+            "metadata": video.get("metadata", {}),
+            "service_generation_id": job["generation_id"]
+        }
+        if job["error"]:
+            result["error"] = job["error"]
+        return result
+    
     def _list_videos(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """List generated videos"""
+        """List generated videos, newest first, filtered by topic, style and status"""
         try:
             limit = data.get("limit", 10)
+            if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= 100:
+                return {
+                    "status": "error",
+                    "message": "limit must be an integer between 1 and 100"
+                }
+            
+            filters = {
+                "user_id": data.get("user_id"),
+                "topic": data.get("topic"),
+                "style": data.get("style"),
+                "status": data.get("status")
+            }
+            cursor = data.get("cursor")
+            try:
+                page = self.catalog.list(limit=limit, before_cursor=cursor, **filters)
+            except ValueError:
+                return {
+                    "status": "error",
+                    "message": "Invalid cursor"
+                }
             
             return {
                 "status": "success",
                 "result": {
-                    "videos": [],
-                    "total": 0,
-                    "limit": limit
+                    "videos": list(page),
+                    # Counting is a scan of every matching row: only done for the first page
+                    "total": None if cursor else self.catalog.count(**filters),
+                    "limit": limit,
+                    "next_cursor": page.next_cursor
                 }
             }
         except Exception as e:
@@ -154,3 +292,28 @@ class VideoAgent(BaseAgent):
                 "status": "error",
                 "message": str(e)
             }
+    
+    def _catalog_remote(self, result: Dict[str, Any], user_id: Optional[str]) -> None:
+        """Record a video known only to the external service in the catalog"""
+        try:
+            self.catalog.record(
+                result["generation_id"], remote_state(result.get("status")),
+                user_id=user_id,
+                topic=result.get("topic"),
+                style=result.get("style"),
+                video_url=result.get("video_url"),
+                duration=result.get("duration")
+            )
+        except Exception as e:
+            self.logger.error(f"Video catalog update failed: {e}")
+
+    def _refresh_catalog(self, result: Dict[str, Any]) -> None:
+        """Refresh the catalogued status of a polled video; polling never adds or re-owns catalog rows"""
+        try:
+            self.catalog.refresh(
+                result["generation_id"], remote_state(result.get("status")),
+                video_url=result.get("video_url"),
+                duration=result.get("duration")
+            )
+        except Exception as e:
+            self.logger.error(f"Video catalog update failed: {e}")
@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from ..agents.finance import FinanceAgent
 from ..agents.education import EducationAgent
 from ..agents.creator import CreatorAgent
@@ -6,19 +6,31 @@ from ..agents.video import VideoAgent
 from ..modules.base import BaseModule
 from .module_loader import load_modules
 from .feedback_models import CanonicalFeedbackSchema
+from .request_context import RequestContext, resolve_context_needs
+from .speculative_prewarm import SpeculativePrewarmer
 from ..db.memory import ContextMemory
 from ..db.memory_adapter import SQLiteAdapter, RemoteNoopurAdapter, MONGODB_AVAILABLE
+from ..db.cached_adapter import CachedMemoryAdapter
 from ..utils.logger import setup_logger
-from ..utils.bridge_client import BridgeClient
+from ..utils.bridge_client import get_bridge_client, get_async_bridge_client
 from ..utils.video_bridge_client import VideoBridgeClient
-from config.config import DB_PATH, INTEGRATOR_USE_NOOPUR, USE_MONGODB, MONGODB_CONNECTION_STRING, MONGODB_DATABASE_NAME
+from ..utils.executor import run_sync
+from ..utils.metrics import CORE_IN_FLIGHT, CORE_REQUESTS, CORE_REQUEST_SECONDS
+from config.config import (
+    DB_PATH, INTEGRATOR_USE_NOOPUR, USE_MONGODB, MONGODB_CONNECTION_STRING, MONGODB_DATABASE_NAME, BATCH_MAX_CONCURRENCY,
+    CONTEXT_CACHE_ENABLED, CONTEXT_CACHE_DEPTH, CONTEXT_CACHE_MAX_USERS, CONTEXT_CACHE_TTL_S,
+    SPECULATIVE_PREWARM_ENABLED, SPECULATIVE_PREWARM_MAX_CONCURRENCY, SPECULATIVE_PREWARM_USER_BUDGET,
+    SPECULATIVE_PREWARM_USER_WINDOW_S, SPECULATIVE_PREWARM_TTL_S
+)
 from pydantic import ValidationError
 
 if MONGODB_AVAILABLE:
     from ..db.mongodb_adapter import MongoDBAdapter
 from creator_routing import CreatorRouter
+import asyncio
 import json
 import os
+import time
 
 class Gateway:
     """Central gateway for routing requests to appropriate agents"""
@@ -28,7 +40,9 @@ class Gateway:
         self.logger = setup_logger(__name__)
         
         # Initialize BridgeClient as canonical external service interface
-        self.bridge_client = BridgeClient()
+        self.bridge_client = get_bridge_client()
+        # Pooled async client shared with CreatorAgent for the async request path
+        self.async_bridge_client = get_async_bridge_client()
         
         # Initialize VideoBridgeClient for text-to-video service
         self.video_bridge_client = VideoBridgeClient()
@@ -62,7 +76,23 @@ class Gateway:
             self.memory = RemoteNoopurAdapter()
         else:
             self.memory = SQLiteAdapter(DB_PATH)
+        # Hot context cache in front of whichever adapter was selected
+        if CONTEXT_CACHE_ENABLED:
+            self.memory = CachedMemoryAdapter(
+                self.memory,
+                depth=CONTEXT_CACHE_DEPTH,
+                max_users=CONTEXT_CACHE_MAX_USERS,
+                ttl_s=CONTEXT_CACHE_TTL_S
+            )
         self.creator_router = CreatorRouter(self.memory)
+        # Opt-in: prefetch what a user's next creator request needs right after the current one is stored
+        self.prewarmer = SpeculativePrewarmer(
+            self.creator_router,
+            max_concurrency=SPECULATIVE_PREWARM_MAX_CONCURRENCY,
+            user_budget=SPECULATIVE_PREWARM_USER_BUDGET,
+            user_window_s=SPECULATIVE_PREWARM_USER_WINDOW_S,
+            ttl_s=SPECULATIVE_PREWARM_TTL_S
+        ) if SPECULATIVE_PREWARM_ENABLED else None
         # Validate module contracts for any module-like entries (modules under /modules should subclass BaseModule)
         for name, mod in list(self.agents.items()):
             # If the object exposes `process`, expect it to be a BaseModule
@@ -71,6 +101,10 @@ class Gateway:
                     # replace with an error responder but do not crash
                     self.logger.error(f"Module '{name}' does not implement BaseModule contract. Marking as invalid.")
                     self.agents[name] = None
+        # Per-module pipeline: which of the context / prewarm / store stages each module consumes
+        self.context_needs = {
+            name: self._resolve_context_needs(name, agent) for name, agent in self.agents.items() if agent is not None
+        }
 
     def _load_module_metadata(self, module_name: str) -> Dict[str, Any]:
         """Try to load `modules/<module>/config.json` for metadata (optional)."""
@@ -82,21 +116,50 @@ class Gateway:
         except Exception:
             pass
         return {}
+
+    def _resolve_context_needs(self, name: str, agent: Any) -> Dict[str, Any]:
+        """Declared needs of a module (config.json, then metadata()) or agent (CONTEXT_NEEDS)"""
+        if isinstance(agent, BaseModule):
+            declared = dict(self._load_module_metadata(name).get("context_needs") or {})
+            try:
+                declared.update(agent.metadata().get("context_needs") or {})
+            except Exception:
+                pass
+        else:
+            declared = getattr(agent, "CONTEXT_NEEDS", None)
+        try:
+            return resolve_context_needs(declared)
+        except ValueError as e:
+            self.logger.warning(f"Module '{name}' has invalid context_needs ({e}); running the full pipeline")
+            return resolve_context_needs({"history": name == "creator"})
+
+    def _needs(self, module: str) -> Dict[str, Any]:
+        # Unknown or invalid modules fail in _resolve_agent before any stage would matter
+        return self.context_needs.get(module) or resolve_context_needs(None)
     
     def check_external_service_health(self) -> Dict[str, Any]:
         """Check external service health using BridgeClient"""
         try:
-            health_result = self.bridge_client.health_check()
-            if health_result.get('success') is not False:
-                return {"status": "healthy", "details": health_result}
-            else:
-                return {
-                    "status": "unhealthy", 
-                    "error_type": health_result.get('error_type'),
-                    "details": health_result
-                }
+            return self._external_health(self.bridge_client.health_check())
+        except Exception as e:
+            return {"status": "unreachable", "error": str(e)}
+
+    async def acheck_external_service_health(self) -> Dict[str, Any]:
+        """Async variant of `check_external_service_health` using the pooled AsyncBridgeClient"""
+        try:
+            return self._external_health(await self.async_bridge_client.health_check())
         except Exception as e:
             return {"status": "unreachable", "error": str(e)}
+
+    @staticmethod
+    def _external_health(health_result: Dict[str, Any]) -> Dict[str, Any]:
+        if health_result.get('success') is not False:
+            return {"status": "healthy", "details": health_result}
+        return {
+            "status": "unhealthy", 
+            "error_type": health_result.get('error_type'),
+            "details": health_result
+        }
     
     def validate_feedback(self, data: Dict[str, Any]) -> CanonicalFeedbackSchema:
         """Validate feedback data against canonical schema"""
@@ -106,77 +169,87 @@ class Gateway:
             self.logger.error(f"Feedback validation failed: {e}")
             raise ValueError(f"Invalid feedback schema: {e}")
     
-    def process_request(self, module: str, intent: str, user_id: str, 
-                       data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process incoming request and route to appropriate agent"""
-        
-        # Special validation for feedback requests
+    def _validate_feedback_stage(self, module: str, intent: str, user_id: str,
+                                 data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Validate creator feedback payloads. Returns (data, error_response)."""
         if module == "creator" and intent == "feedback":
             try:
                 validated_feedback = self.validate_feedback(data)
                 data = validated_feedback.dict()
                 self.logger.info(f"Feedback validated successfully for user: {user_id}")
             except ValueError as e:
-                return {
+                return data, {
                     "status": "error",
                     "message": str(e),
                     "result": {}
                 }
-        
-        # Get user context (adapter provides get_context)
-        context = self.memory.get_context(user_id) if user_id else []
-        
-        # Log request
+        return data, None
+
+    def _speculate(self, user_id: str, request_data: Dict[str, Any]) -> None:
+        """Hand a stored creator interaction to the speculative prewarmer (no-op unless enabled)"""
+        if self.prewarmer is not None and self._needs(request_data.get("module"))["history"]:
+            try:
+                self.prewarmer.schedule(user_id, request_data.get("data") or {})
+            except Exception:
+                self.logger.exception("Failed to schedule speculative prewarm")
+
+    def _log_request(self, module: str, intent: str, user_id: str, data: Dict[str, Any]) -> None:
         self.logger.info(
             f"Processing request for module: {module}, intent: {intent}",
             extra={"user_id": user_id, "request_data": {"module": module, "intent": intent, "data": data}}
         )
-        
-        # Special handling for creator flows: pre-warm with context from Noopur/local memory
-        if module == "creator":
-            try:
-                data = self.creator_router.prewarm_and_prepare(request=user_id and data or {}, user_id=user_id, input_data=data)
-            except Exception:
-                # fallback to original data
-                pass
 
-        # Route to agent
+    def _log_response(self, user_id: str, normalized: Dict[str, Any]) -> None:
+        try:
+            self.logger.info(
+                f"Request processed with status: {normalized.get('status')}",
+                extra={"user_id": user_id, "response_data": normalized}
+            )
+        except Exception:
+            pass
+
+    def _module_label(self, module: str) -> str:
+        # Metric label; unknown module names would otherwise create unbounded series
+        return module if module in self.agents else "unknown"
+
+    def _observe(self, request_context: RequestContext, normalized: Dict[str, Any]) -> None:
+        labels = (self._module_label(request_context.module), request_context.intent, normalized.get("status"))
+        CORE_REQUESTS.labels(*labels).inc()
+        CORE_REQUEST_SECONDS.labels(*labels).observe(time.perf_counter() - request_context.started_at)
+
+    def _resolve_agent(self, module: str) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """Look up the agent for `module`. Returns (agent, error_response)."""
         if module not in self.agents:
-            response = {
+            return None, {
                 "status": "error",
                 "message": f"Unknown module: {module}",
                 "result": {}
             }
-        elif self.agents[module] is None:
-            response = {
+        if self.agents[module] is None:
+            return None, {
                 "status": "error",
                 "message": f"Module {module} is invalid or failed to load",
                 "result": {}
             }
-        else:
-            agent = self.agents[module]
-            try:
-                # Check if it's a BaseModule (has process method)
-                if isinstance(agent, BaseModule):
-                    response = agent.process(data, context)
-                # Otherwise it's an agent (has handle_request method)
-                elif hasattr(agent, 'handle_request'):
-                    response = agent.handle_request(intent, data, context)
-                else:
-                    response = {
-                        "status": "error",
-                        "message": f"Module {module} has invalid interface",
-                        "result": {}
-                    }
-            except Exception as e:
-                self.logger.exception(f"Agent processing failed for {module}")
-                response = {
-                    "status": "error",
-                    "message": f"Agent processing failed: {str(e)}",
-                    "result": {}
-                }
-        
-        # Normalize response into standardized CoreResponse shape (do not rely on module to emit full CoreResponse)
+        return self.agents[module], None
+
+    def _invalid_interface(self, module: str) -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "message": f"Module {module} has invalid interface",
+            "result": {}
+        }
+
+    def _agent_failure(self, module: str, e: Exception) -> Dict[str, Any]:
+        self.logger.exception(f"Agent processing failed for {module}")
+        return {
+            "status": "error",
+            "message": f"Agent processing failed: {str(e)}",
+            "result": {}
+        }
+
+    def _normalize_response(self, response: Any) -> Dict[str, Any]:
+        """Normalize response into standardized CoreResponse shape (do not rely on module to emit full CoreResponse)"""
         normalized = {
             'status': 'success',
             'message': '',
@@ -195,22 +268,224 @@ class Gateway:
                 # avoid copying status/message keys into result
                 raw = {k: v for k, v in response.items() if k not in ('status', 'message', 'result')}
                 normalized['result'] = raw
+        return normalized
+
+    def process_request(self, module: str, intent: str, user_id: str, 
+                       data: Dict[str, Any]) -> Dict[str, Any]:
+        """Process incoming request and route to appropriate agent"""
+        request_context = RequestContext(self.memory, module, intent, user_id)
+        in_flight = CORE_IN_FLIGHT.labels(self._module_label(module))
+        in_flight.inc()
+        try:
+            with request_context:
+                normalized = self._process(request_context, data)
+        finally:
+            in_flight.dec()
+        self._observe(request_context, normalized)
+        return normalized
+
+    def _process(self, request_context: RequestContext, data: Dict[str, Any]) -> Dict[str, Any]:
+        """All stages of `process_request`; the caller tracks in-flight and request metrics"""
+        module, intent, user_id = request_context.module, request_context.intent, request_context.user_id
+        needs = self._needs(module)
+        
+        # Special validation for feedback requests
+        with request_context.stage("feedback"):
+            data, error = self._validate_feedback_stage(module, intent, user_id, data)
+        if error:
+            return error
+        
+        # Get user context (loaded once per request; routers reuse it) unless the module never reads it
+        context = request_context.context(needs["context"]) if needs["context"] else []
+        
+        # Log request
+        self._log_request(module, intent, user_id, data)
+        
+        # Video jobs and catalog entries belong to the requesting user
+        if module == "video" and user_id:
+            data = {**data, "user_id": user_id}
+
+        # Special handling for creator flows: pre-warm with context from Noopur/local memory
+        if needs["history"]:
+            try:
+                with request_context.stage("prewarm"):
+                    data = self.creator_router.prewarm_and_prepare(
+                        request=user_id and data or {}, user_id=user_id, input_data=data,
+                        request_context=request_context
+                    )
+            except Exception:
+                # fallback to original data
+                pass
+
+        # Route to agent
+        agent, response = self._resolve_agent(module)
+        if agent is not None:
+            try:
+                with request_context.stage("agent"):
+                    # Check if it's a BaseModule (has process method)
+                    if isinstance(agent, BaseModule):
+                        response = agent.process(data, context)
+                    # Otherwise it's an agent (has handle_request method)
+                    elif hasattr(agent, 'handle_request'):
+                        response = agent.handle_request(intent, data, context)
+                    else:
+                        response = self._invalid_interface(module)
+            except Exception as e:
+                response = self._agent_failure(module, e)
+        
+        with request_context.stage("normalize"):
+            normalized = self._normalize_response(response)
 
         # Store interaction
-        if user_id:
+        if user_id and needs["store"]:
             request_data = {"module": module, "intent": intent, "user_id": user_id, "data": data}
             try:
-                self.memory.store_interaction(user_id, request_data, normalized)
+                with request_context.stage("store"):
+                    self.memory.store_interaction(user_id, request_data, normalized)
             except Exception:
                 self.logger.exception("Failed to store interaction")
+            self._speculate(user_id, request_data)
 
         # Log response
+        self._log_response(user_id, normalized)
+
+        return normalized
+
+    async def _aexecute(self, request_context: RequestContext,
+                        data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Tuple[str, Dict[str, Any], Dict[str, Any]]]]:
+        """Run every async stage except storage.
+
+        Returns (normalized_response, pending_interaction); the interaction is
+        None when nothing should be stored.
+        """
+        module, intent, user_id = request_context.module, request_context.intent, request_context.user_id
+        needs = self._needs(module)
+        with request_context.stage("feedback"):
+            data, error = self._validate_feedback_stage(module, intent, user_id, data)
+        if error:
+            return error, None
+
+        context = await request_context.acontext(needs["context"]) if needs["context"] else []
+
+        self._log_request(module, intent, user_id, data)
+
+        if module == "video" and user_id:
+            data = {**data, "user_id": user_id}
+
+        if needs["history"]:
+            try:
+                with request_context.stage("prewarm"):
+                    data = await self.creator_router.aprewarm_and_prepare(
+                        request=user_id and data or {}, user_id=user_id, input_data=data,
+                        request_context=request_context
+                    )
+            except Exception:
+                # fallback to original data
+                pass
+
+        agent, response = self._resolve_agent(module)
+        if agent is not None:
+            try:
+                with request_context.stage("agent"):
+                    if isinstance(agent, BaseModule):
+                        response = await agent.aprocess(data, context)
+                    elif hasattr(agent, 'ahandle_request'):
+                        response = await agent.ahandle_request(intent, data, context)
+                    elif hasattr(agent, 'handle_request'):
+                        response = await run_sync(agent.handle_request, intent, data, context)
+                    else:
+                        response = self._invalid_interface(module)
+            except Exception as e:
+                response = self._agent_failure(module, e)
+
+        with request_context.stage("normalize"):
+            normalized = self._normalize_response(response)
+
+        interaction = None
+        if user_id and needs["store"]:
+            request_data = {"module": module, "intent": intent, "user_id": user_id, "data": data}
+            interaction = (user_id, request_data, normalized)
+        return normalized, interaction
+
+    async def aprocess_request(self, module: str, intent: str, user_id: str,
+                               data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of `process_request` that never blocks the event loop.
+
+        Memory adapters and agents are awaited through their async interfaces;
+        sync implementations run on the bounded executor.
+        """
+        request_context = RequestContext(self.memory, module, intent, user_id)
+        in_flight = CORE_IN_FLIGHT.labels(self._module_label(module))
+        in_flight.inc()
         try:
-            self.logger.info(
-                f"Request processed with status: {normalized.get('status')}",
-                extra={"user_id": user_id, "response_data": normalized}
-            )
-        except Exception:
-            pass
+            with request_context:
+                normalized, interaction = await self._aexecute(request_context, data)
+
+            if interaction:
+                try:
+                    with request_context.stage("store"):
+                        await self.memory.astore_interaction(*interaction)
+                except Exception:
+                    self.logger.exception("Failed to store interaction")
+                self._speculate(*interaction[:2])
+        finally:
+            in_flight.dec()
+
+        self._observe(request_context, normalized)
+        self._log_response(user_id, normalized)
+
+        return normalized
+
+    async def aprocess_batch(self, requests: List[Dict[str, Any]],
+                             concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process many requests concurrently and return responses in input order.
+
+        Each item is a mapping with `module`, `intent`, `user_id` and `data`.
+        At most `concurrency` items (capped by BATCH_MAX_CONCURRENCY) run at
+        once, and all resulting interactions are stored in a single write.
+        """
+        limit = max(1, min(concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+        semaphore = asyncio.Semaphore(limit)
+
+        request_contexts = [
+            RequestContext(self.memory, item["module"], item["intent"], item["user_id"]) for item in requests
+        ]
+
+        async def _run(item: Dict[str, Any], request_context: RequestContext):
+            async with semaphore:
+                in_flight = CORE_IN_FLIGHT.labels(self._module_label(request_context.module))
+                in_flight.inc()
+                try:
+                    with request_context:
+                        return await self._aexecute(request_context, item.get("data") or {})
+                except Exception as e:
+                    self.logger.exception(f"Batch item failed for module {item.get('module')}")
+                    return {"status": "error", "message": f"Processing failed: {str(e)}", "result": {}}, None
+                finally:
+                    in_flight.dec()
+
+        outcomes = await asyncio.gather(*(_run(item, ctx) for item, ctx in zip(requests, request_contexts)))
+
+        interactions = [interaction for _, interaction in outcomes if interaction]
+        if interactions:
+            try:
+                await self.memory.astore_interactions(interactions)
+                stored = interactions
+            except Exception:
+                # Fall back to one write per item so one bad item does not lose the whole batch's history
+                self.logger.exception("Failed to store batch interactions; storing items one by one")
+                stored = []
+                for interaction in interactions:
+                    try:
+                        await self.memory.astore_interaction(*interaction)
+                        stored.append(interaction)
+                    except Exception:
+                        self.logger.exception("Failed to store interaction", extra={"user_id": interaction[0]})
+            for user_id, request_data, _ in stored:
+                self._speculate(user_id, request_data)
+
+        for item, (normalized, _), request_context in zip(requests, outcomes, request_contexts):
+            self._observe(request_context, normalized)
+            self._log_response(item.get("user_id"), normalized)
 
-        return normalized
\ No newline at end of file
+        return [normalized for normalized, _ in outcomes]
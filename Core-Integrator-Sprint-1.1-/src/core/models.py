@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, root_validator
-from typing import Dict, Any, Literal
+from typing import Dict, Any, List, Literal, Optional
+from config.config import BATCH_MAX_ITEMS
 
 
 class CoreRequest(BaseModel):
@@ -26,4 +27,15 @@ class CoreResponse(BaseModel):
         if 'result' not in values and ('word_count' in values or values):
             # If module returned a plain dict (like {'word_count': 3}), put it under result
             values['result'] = values.copy()
-        return values
\ No newline at end of file
+        return values
+
+
+class CoreBatchRequest(BaseModel):
+    """Request model for the batch gateway endpoint"""
+    requests: List[CoreRequest] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS, description="Requests to process")
+    concurrency: Optional[int] = Field(None, ge=1, description="Maximum requests processed at once (capped server-side)")
+
+
+class CoreBatchResponse(BaseModel):
+    """Response model for the batch gateway endpoint; results follow input order"""
+    results: List[CoreResponse] = Field(default_factory=list)
@@ -0,0 +1,114 @@
+"""Per-request state shared by the gateway, routers and agents.
+
+A `RequestContext` is created once per request by the gateway. User context
+is loaded from the memory adapter lazily, at most once: later lookups for the
+same or fewer entries are answered from the memoized list. Gateway stages
+are timed with `stage(name)`, a `span` in the HTTP request's recorder (behind
+``Server-Timing`` and the request timing log line).
+
+While the gateway processes a request, its context is also reachable through
+`current_request_context()`. The creator prewarm uses it to hand the agent its
+upstream call count and any generation it already made. These are kept out
+of the request `data`, which is stored and echoed back.
+
+Agents and modules declare which stages they need (`CONTEXT_NEEDS` on
+`BaseAgent`, a ``context_needs`` entry in `BaseModule.metadata()` or the
+module's ``config.json``); `resolve_context_needs` fills in the defaults.
+"""
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from ..utils.timing import span
+
+# Entries loaded by default; matches the adapters' get_context default
+DEFAULT_CONTEXT_LIMIT = 3
+
+# Declared needs of a module/agent that says nothing: today's full pipeline minus the creator prewarm.
+# "context": user context entries passed as `context` (0 or "none" skips the lookup)
+# "history": prewarm through CreatorRouter (Noopur history + related context in `data`)
+# "store": record the interaction in memory
+DEFAULT_CONTEXT_NEEDS: Dict[str, Any] = {"context": DEFAULT_CONTEXT_LIMIT, "history": False, "store": True}
+
+_current: ContextVar[Optional["RequestContext"]] = ContextVar("request_context", default=None)
+
+
+def resolve_context_needs(declared: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge a module's declaration over the defaults; raises ValueError for malformed values"""
+    needs = dict(DEFAULT_CONTEXT_NEEDS)
+    for key, value in (declared or {}).items():
+        if key not in needs:
+            raise ValueError(f"Unknown context need: {key}")
+        needs[key] = value
+    if needs["context"] in (None, "none", False):
+        needs["context"] = 0
+    if isinstance(needs["context"], bool) or not isinstance(needs["context"], int) or needs["context"] < 0:
+        raise ValueError(f"Invalid context depth: {needs['context']!r}")
+    needs["history"] = bool(needs["history"])
+    needs["store"] = bool(needs["store"])
+    return needs
+
+
+class RequestContext:
+    """Lazily loaded, memoized user context and stage timing for one request"""
+
+    def __init__(self, memory, module: str, intent: str, user_id: Optional[str]):
+        self.memory = memory
+        self.module = module
+        self.intent = intent
+        self.user_id = user_id
+        self.started_at = time.perf_counter()
+        self.context_loads = 0
+        # Set by the creator prewarm: Noopur round trips made, and the generation it already produced
+        self.upstream_calls = 0
+        self.prewarm_generation: Optional[Dict[str, Any]] = None
+        self._context: Optional[List[Dict[str, Any]]] = None
+        self._context_limit = 0
+        self._tokens: List[Any] = []
+
+    def __enter__(self) -> "RequestContext":
+        """Make this the current request context for the enclosed block"""
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _current.reset(self._tokens.pop())
+
+    def _memoized(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        if not self.user_id:
+            return []
+        if self._context is not None and (limit <= self._context_limit or len(self._context) < self._context_limit):
+            # Entries are newest first, so a smaller limit is a prefix; a short list means there is no more
+            return list(self._context[:limit])
+        return None
+
+    def _remember(self, items: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+        self.context_loads += 1
+        self._context, self._context_limit = list(items), limit
+        return list(items)
+
+    def context(self, limit: int = DEFAULT_CONTEXT_LIMIT) -> List[Dict[str, Any]]:
+        """The user's `limit` most recent interactions, loaded on first use"""
+        cached = self._memoized(limit)
+        if cached is not None:
+            return cached
+        with self.stage("context"):
+            return self._remember(self.memory.get_context(self.user_id, limit=limit), limit)
+
+    async def acontext(self, limit: int = DEFAULT_CONTEXT_LIMIT) -> List[Dict[str, Any]]:
+        """Async variant of `context` using the adapter's async interface"""
+        cached = self._memoized(limit)
+        if cached is not None:
+            return cached
+        with self.stage("context"):
+            return self._remember(await self.memory.aget_context(self.user_id, limit=limit), limit)
+
+    @staticmethod
+    def stage(name: str) -> span:
+        """Time the enclosed block as a span of the current request; repeated stages accumulate"""
+        return span(name)
+
+
+def current_request_context() -> Optional[RequestContext]:
+    """The context of the request being processed, or None outside the gateway"""
+    return _current.get()
@@ -0,0 +1,76 @@
+"""Opt-in speculative prewarming of a user's next creator request.
+
+After a creator interaction is stored, the follow-up request usually arrives
+within seconds and needs the same Noopur history and related context. The
+prewarmer fetches them in the background (`CreatorRouter.speculate`) so the
+next `prewarm_and_prepare` finds them ready.
+
+Speculation must never compete with foreground traffic: at most
+``SPECULATIVE_PREWARM_MAX_CONCURRENCY`` run at once process-wide (extra ones
+are dropped, not queued) and each user gets at most
+``SPECULATIVE_PREWARM_USER_BUDGET`` per ``SPECULATIVE_PREWARM_USER_WINDOW_S``.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict
+
+from ..utils.event_loop import get_background_loop
+from ..utils.logger import setup_logger
+
+# Upper bound on users tracked for the per-user budget
+_MAX_TRACKED_USERS = 10000
+
+
+class SpeculativePrewarmer:
+    """Schedules bounded background prefetches through a CreatorRouter"""
+
+    def __init__(self, router, max_concurrency: int = 2, user_budget: int = 5,
+                 user_window_s: float = 60.0, ttl_s: float = 30.0):
+        self.router = router
+        self.max_concurrency = max(max_concurrency, 1)
+        self.user_budget = max(user_budget, 1)
+        self.user_window_s = user_window_s
+        self.ttl_s = ttl_s
+        self.logger = setup_logger(__name__)
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._budgets: "OrderedDict[str, deque]" = OrderedDict()
+        self._stats = {"scheduled": 0, "completed": 0, "failed": 0, "skipped_busy": 0, "skipped_budget": 0}
+
+    def schedule(self, user_id: str, data: Dict[str, Any]) -> bool:
+        """Start a background prefetch for `user_id` if capacity and budget allow; never blocks"""
+        if not getattr(self.router, "noopur", None):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if self._inflight >= self.max_concurrency:
+                self._stats["skipped_busy"] += 1
+                return False
+            window = self._budgets.pop(user_id, None) or deque()
+            while window and now - window[0] >= self.user_window_s:
+                window.popleft()
+            self._budgets[user_id] = window
+            while len(self._budgets) > _MAX_TRACKED_USERS:
+                self._budgets.popitem(last=False)
+            if len(window) >= self.user_budget:
+                self._stats["skipped_budget"] += 1
+                return False
+            window.append(now)
+            self._inflight += 1
+            self._stats["scheduled"] += 1
+        future = get_background_loop().submit(self.router.speculate(user_id, dict(data), self.ttl_s))
+        future.add_done_callback(self._done)
+        return True
+
+    def _done(self, future) -> None:
+        failed = future.cancelled() or future.exception() is not None
+        with self._lock:
+            self._inflight -= 1
+            self._stats["failed" if failed else "completed"] += 1
+        if failed and not future.cancelled():
+            self.logger.warning(f"Speculative prewarm failed: {future.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"inflight": self._inflight, **self._stats}
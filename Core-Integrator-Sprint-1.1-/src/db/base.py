@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Tuple
+from ..utils.executor import run_sync
+
+
+class MemoryAdapter(ABC):
+    """Storage contract used by the gateway for interaction history and context.
+
+    Adapters implement the sync methods. The async variants default to running
+    the sync implementation on the bounded executor; adapters with native async
+    I/O override them.
+    """
+
+    @abstractmethod
+    def store_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
+        """Persist an interaction. May return the stored item in `get_context` shape, or None."""
+        pass
+
+    @abstractmethod
+    def get_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                         module: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest-first history, optionally one page at a time.
+
+        With `limit`, returns a `HistoryPage` whose `next_cursor` can be passed
+        back as `before_cursor` to fetch the following page.
+        """
+        pass
+
+    @abstractmethod
+    def get_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        pass
+
+    def store_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        """Store several (user_id, request_data, response_data) interactions.
+
+        Adapters that can group writes (e.g. into one transaction) override this.
+        Returns the per-interaction results of `store_interaction`.
+        """
+        return [self.store_interaction(user_id, request_data, response_data)
+                for user_id, request_data, response_data in interactions]
+
+    async def astore_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
+        return await run_sync(self.store_interaction, user_id, request_data, response_data)
+
+    async def astore_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        return await run_sync(self.store_interactions, interactions)
+
+    async def aget_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                                module: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await run_sync(self.get_user_history, user_id, limit, before_cursor, module)
+
+    async def aget_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        return await run_sync(self.get_context, user_id, limit)
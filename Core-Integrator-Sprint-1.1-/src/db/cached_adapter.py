@@ -0,0 +1,183 @@
+"""In-process hot context cache in front of any MemoryAdapter.
+
+Each cached user holds a ring buffer of their newest interactions (newest
+first). Users are evicted least-recently-used once `max_users` is reached, and
+entries expire after `ttl_s` so writes made by other workers become visible.
+Writes go to the backend first and are then pushed into the ring buffer; when
+the backend does not return the stored item the user's entry is invalidated.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import MemoryAdapter
+
+
+class _UserEntry:
+    __slots__ = ("items", "loaded_at", "loading", "dirty")
+
+    def __init__(self, depth: int):
+        self.items: deque = deque(maxlen=depth)
+        self.loaded_at = 0.0
+        self.loading = True
+        # Set when a write lands while the entry is still loading
+        self.dirty = False
+
+
+class CachedMemoryAdapter(MemoryAdapter):
+    """Caches `get_context` results per user; everything else passes through to `backend`."""
+
+    def __init__(self, backend: MemoryAdapter, depth: int = 5, max_users: int = 10000, ttl_s: float = 30.0):
+        self.backend = backend
+        self.depth = max(depth, 1)
+        self.max_users = max(max_users, 1)
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, _UserEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bypass": 0, "evictions": 0, "invalidations": 0}
+
+    def __getattr__(self, name: str):
+        # Expose backend extras (retention_stats, close, ...) unchanged
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    # Cache bookkeeping
+    def _lookup(self, user_id: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Return cached items or None; on a miss, reserve an entry for the loader."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and not entry.loading and time.monotonic() - entry.loaded_at < self.ttl_s:
+                self._entries.move_to_end(user_id)
+                self._stats["hits"] += 1
+                return list(entry.items)[:limit]
+            self._stats["misses"] += 1
+            if entry is None or not entry.loading:
+                entry = _UserEntry(self.depth)
+                self._entries[user_id] = entry
+                self._entries.move_to_end(user_id)
+                self._evict()
+            return None
+
+    def _fill(self, user_id: str, items: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or not entry.loading:
+                return
+            if entry.dirty:
+                # A write raced with the load; let the next read reload
+                del self._entries[user_id]
+                return
+            entry.items.extend(items[:self.depth])
+            entry.loaded_at = time.monotonic()
+            entry.loading = False
+
+    def _abandon(self, user_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.loading:
+                del self._entries[user_id]
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _write_through(self, user_id: str, item: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return
+            if entry.loading:
+                entry.dirty = True
+            elif item is None:
+                del self._entries[user_id]
+                self._stats["invalidations"] += 1
+            else:
+                entry.items.appendleft(item)
+
+    def _write_through_many(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]], items: Any) -> None:
+        if not isinstance(items, list) or len(items) != len(interactions):
+            items = [None] * len(interactions)
+        for (user_id, _, _), item in zip(interactions, items):
+            self._write_through(user_id, item if isinstance(item, dict) else None)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop one user's entry, or the whole cache when `user_id` is None."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+            self._stats["invalidations"] += 1
+
+    def cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["users"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats.update({"depth": self.depth, "max_users": self.max_users, "ttl_s": self.ttl_s})
+        return stats
+
+    # MemoryAdapter contract
+    def store_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
+        item = self.backend.store_interaction(user_id, request_data, response_data)
+        self._write_through(user_id, item if isinstance(item, dict) else None)
+        return item
+
+    def store_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        items = self.backend.store_interactions(interactions)
+        self._write_through_many(interactions, items)
+        return items
+
+    def get_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                         module: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.backend.get_user_history(user_id, limit, before_cursor, module)
+
+    def get_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        if limit > self.depth:
+            with self._lock:
+                self._stats["bypass"] += 1
+            return self.backend.get_context(user_id, limit)
+        cached = self._lookup(user_id, limit)
+        if cached is not None:
+            return cached
+        try:
+            items = self.backend.get_context(user_id, self.depth)
+        except Exception:
+            self._abandon(user_id)
+            raise
+        self._fill(user_id, items)
+        return list(items[:limit])
+
+    async def astore_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
+        item = await self.backend.astore_interaction(user_id, request_data, response_data)
+        self._write_through(user_id, item if isinstance(item, dict) else None)
+        return item
+
+    async def astore_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        items = await self.backend.astore_interactions(interactions)
+        self._write_through_many(interactions, items)
+        return items
+
+    async def aget_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                                module: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self.backend.aget_user_history(user_id, limit, before_cursor, module)
+
+    async def aget_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        if limit > self.depth:
+            with self._lock:
+                self._stats["bypass"] += 1
+            return await self.backend.aget_context(user_id, limit)
+        cached = self._lookup(user_id, limit)
+        if cached is not None:
+            return cached
+        try:
+            items = await self.backend.aget_context(user_id, self.depth)
+        except Exception:
+            self._abandon(user_id)
+            raise
+        self._fill(user_id, items)
+        return list(items[:limit])
@@ -0,0 +1,45 @@
+"""Opaque keyset cursors for paginated interaction history.
+
+A cursor encodes the (timestamp, id) sort key of the last item on a page. The
+next page continues strictly after that key in newest-first order, so a page
+costs the same no matter how deep into the history it is. `id` is the store's
+tie-breaker (SQLite row id, MongoDB ObjectId hex) or None when the item was
+not yet committed, in which case the page continues strictly before its
+timestamp.
+"""
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class HistoryPage(list):
+    """A page of history items; `next_cursor` is None on the last page."""
+
+    def __init__(self, items=(), next_cursor: Optional[str] = None):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(timestamp: str, item_id: Any = None) -> str:
+    raw = json.dumps([timestamp, item_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any]:
+    """Return (timestamp, id) from a cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, item_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid history cursor")
+    if not isinstance(timestamp, str) or not isinstance(item_id, (int, str, type(None))) or isinstance(item_id, bool):
+        raise ValueError("Invalid history cursor")
+    return timestamp, item_id
+
+
+def page_of(items: List[Any], keys: List[Tuple[str, Any]], limit: Optional[int]) -> HistoryPage:
+    """Cut `items` (fetched with one extra) to `limit` and attach the cursor of the last kept item."""
+    if limit is None or len(items) <= limit:
+        return HistoryPage(items)
+    timestamp, item_id = keys[limit - 1]
+    return HistoryPage(items[:limit], encode_cursor(timestamp, item_id))
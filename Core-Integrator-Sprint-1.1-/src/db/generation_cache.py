@@ -0,0 +1,178 @@
+"""Content-addressed cache of upstream generations.
+
+Identical generation requests (same normalized text/topic/style/... for a
+given kind) map to the same sha256 digest, so a repeated prompt returns the
+generation that already exists instead of going back to the video service or
+CreatorCore. Entries live in a SQLite table in the local database, so every
+worker process sees the same cache; they expire after a TTL and the least
+recently used entries are evicted beyond a size cap.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.config import (
+    GENERATION_CACHE_ENABLED, GENERATION_CACHE_DB_PATH, GENERATION_CACHE_TTL_S, GENERATION_CACHE_MAX_ENTRIES
+)
+
+# Evict / purge once every this many inserts rather than on each one
+_EVICT_EVERY = 100
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return str(value)
+
+
+def request_digest(kind: str, fields: Dict[str, Any]) -> str:
+    """Stable sha256 of a normalized request; identical across processes and restarts"""
+    canonical = json.dumps({"kind": kind, "fields": _normalize(fields)}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class GenerationCache:
+    """SQLite-backed TTL + LRU cache of generation results keyed by request digest"""
+
+    def __init__(self, db_path: str, ttl_s: float = 86400.0, max_entries: int = 10000):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_entries = max(max_entries, 1)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evicted": 0}
+        self._init_db()
+
+    def _init_db(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=30000")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS generation_cache (
+                    digest TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_generation_cache_last_used ON generation_cache(last_used_at)"
+            )
+
+    def get(self, kind: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached generation for this request, or None if absent or expired"""
+        digest = request_digest(kind, fields)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM generation_cache WHERE digest = ? AND created_at > ?",
+                (digest, now - self.ttl_s)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE generation_cache SET last_used_at = ? WHERE digest = ?", (now, digest))
+            self._stats["hits"] += 1
+        return json.loads(row[0])
+
+    def put(self, kind: str, fields: Dict[str, Any], value: Dict[str, Any]) -> str:
+        """Cache a generation result for this request; returns the request digest"""
+        digest = request_digest(kind, fields)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO generation_cache (digest, kind, value, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (digest, kind, json.dumps(value), now, now)
+            )
+            self._stats["stores"] += 1
+            self._inserts += 1
+            if self._inserts % _EVICT_EVERY == 0:
+                self._evict(now)
+        return digest
+
+    def discard(self, kind: str, fields: Dict[str, Any]) -> None:
+        """Forget the cached generation for this request (e.g. it turned out to have failed)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM generation_cache WHERE digest = ?", (request_digest(kind, fields),))
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the least recently used beyond max_entries (caller holds the lock)"""
+        expired = self._conn.execute(
+            "DELETE FROM generation_cache WHERE created_at <= ?", (now - self.ttl_s,)
+        ).rowcount
+        overflow = self._conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone()[0] - self.max_entries
+        evicted = 0
+        if overflow > 0:
+            evicted = self._conn.execute(
+                """
+                DELETE FROM generation_cache WHERE digest IN (
+                    SELECT digest FROM generation_cache ORDER BY last_used_at LIMIT ?
+                )
+                """,
+                (overflow,)
+            ).rowcount
+        self._stats["evicted"] += expired + evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone()[0]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[GenerationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> Optional[GenerationCache]:
+    """Return the shared generation cache (None when GENERATION_CACHE_ENABLED is off)."""
+    global _cache
+    if not GENERATION_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GenerationCache(
+                    GENERATION_CACHE_DB_PATH,
+                    ttl_s=GENERATION_CACHE_TTL_S,
+                    max_entries=GENERATION_CACHE_MAX_ENTRIES
+                )
+    return _cache
+
+
+def generation_cache_stats() -> Optional[Dict[str, Any]]:
+    return _cache.stats() if _cache is not None else None
+
+
+def close_generation_cache() -> None:
+    """Close the shared generation cache (used on application shutdown)."""
+    global _cache
+    with _cache_lock:
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.close()
@@ -1,24 +1,211 @@
 import sqlite3
 import json
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 import threading
+import time
+import atexit
+from contextlib import contextmanager
+from .write_behind import InteractionWriter
+from .retention import RetentionCompactor
+from .cursor import HistoryPage, decode_cursor, page_of
+from ..utils.metrics import SQLITE_READ_SECONDS, SQLITE_WRITE_SECONDS
+from config.config import (
+    MEMORY_WRITE_BEHIND, MEMORY_FLUSH_INTERVAL_MS, MEMORY_FLUSH_MAX_BATCH, MEMORY_WRITE_QUEUE_SIZE,
+    MEMORY_RETENTION_PER_MODULE, MEMORY_COMPACTION_INTERVAL_S, MEMORY_COMPACTION_ROW_THRESHOLD
+)
+
+# Number of newest interactions kept per (user_id, module)
+RETENTION_PER_MODULE = MEMORY_RETENTION_PER_MODULE
+
+# Rows older than the N newest per (user_id, module), in a single user's history
+_RETAINED_USER_ROWS = """
+    SELECT id, module, timestamp, request_data, response_data FROM (
+        SELECT id, module, timestamp, request_data, response_data,
+               ROW_NUMBER() OVER (PARTITION BY module ORDER BY timestamp DESC, id DESC) AS rn
+        FROM interactions
+        WHERE user_id = ?
+    )
+    WHERE rn <= ?
+"""
+
+# One page of a user's history, newest first. `newer` counts (up to N) the rows
+# ahead of each row in its module, so rows past the newest N are skipped without
+# numbering the whole history; the scan stops once the page is full.
+_HISTORY_PAGE = """
+    SELECT id, module, timestamp, request_data, response_data, newer FROM (
+        SELECT i.id, i.module, i.timestamp, i.request_data, i.response_data,
+               (SELECT COUNT(*) FROM (
+                    SELECT 1 FROM interactions n
+                    WHERE n.user_id = i.user_id AND n.module = i.module
+                      AND (n.timestamp > i.timestamp OR (n.timestamp = i.timestamp AND n.id > i.id))
+                    LIMIT ?
+               )) AS newer
+        FROM interactions i
+        WHERE i.user_id = ?{filters}
+    )
+    WHERE newer < ?
+    ORDER BY timestamp DESC, id DESC
+    LIMIT ?
+"""
+
+# One write-behind writer per database file, shared by every ContextMemory on that path
+_writers: Dict[str, InteractionWriter] = {}
+_writers_lock = threading.Lock()
+
+
+# One retention compactor per database file
+_compactors: Dict[str, RetentionCompactor] = {}
+
+
+def close_writers(timeout: float = 30.0) -> None:
+    """Flush and stop all write-behind writers (graceful shutdown)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close(timeout)
+
+
+def close_compactors(timeout: float = 10.0) -> None:
+    """Run a final retention pass and stop all compactors."""
+    with _writers_lock:
+        compactors = list(_compactors.values())
+        _compactors.clear()
+    for compactor in compactors:
+        compactor.close(timeout)
+
+
+# Writers first so their rows are included in the final compaction
+atexit.register(close_compactors)
+atexit.register(close_writers)
+
+
+def _extract_generation_id(response_data: Dict[str, Any]) -> Optional[str]:
+    """Return the generation_id carried by a response payload, if any"""
+    if not isinstance(response_data, dict):
+        return None
+    resp_result = response_data.get('result', {})
+    gen_id = resp_result.get('generation_id') if isinstance(resp_result, dict) else None
+    # Also check top-level response_data for legacy payloads
+    if not gen_id:
+        gen_id = response_data.get('generation_id')
+    return str(gen_id) if gen_id else None
+
 
 class ContextMemory:
     """SQLite-based context memory for storing user interactions"""
     
-    def __init__(self, db_path: str = "data/context.db"):
+    def __init__(self, db_path: str = "data/context.db", write_behind: Optional[bool] = None):
         self.db_path = db_path
         if db_path != ":memory:":
             Path(db_path).parent.mkdir(exist_ok=True)
         self._lock = threading.Lock()
+        # Long-lived connections: one per reader thread plus one writer, schema checked once below
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._write_conn: Optional[sqlite3.Connection] = None
+        # An in-memory database only exists inside a single connection, so every caller shares it
+        self._memory_conn = self._connect() if db_path == ":memory:" else None
         self._init_db()
+
+        # Retention runs in the background; in-memory databases get a private compactor
+        if db_path == ":memory:":
+            self._compactor = self._new_compactor()
+        else:
+            with _writers_lock:
+                self._compactor = _compactors.get(db_path)
+                if self._compactor is None:
+                    self._compactor = self._new_compactor()
+                    _compactors[db_path] = self._compactor
+
+        # Write-behind mode: queue writes and group-commit them on a background thread
+        if write_behind is None:
+            write_behind = MEMORY_WRITE_BEHIND
+        self._writer: Optional[InteractionWriter] = None
+        if write_behind and db_path != ":memory:":
+            with _writers_lock:
+                self._writer = _writers.get(db_path)
+                if self._writer is None:
+                    self._writer = InteractionWriter(
+                        self._write_records,
+                        flush_interval_ms=MEMORY_FLUSH_INTERVAL_MS,
+                        max_batch=MEMORY_FLUSH_MAX_BATCH,
+                        queue_size=MEMORY_WRITE_QUEUE_SIZE
+                    )
+                    _writers[db_path] = self._writer
     
+    def _new_compactor(self) -> RetentionCompactor:
+        return RetentionCompactor(
+            self._compact,
+            interval_s=MEMORY_COMPACTION_INTERVAL_S,
+            row_threshold=MEMORY_COMPACTION_ROW_THRESHOLD,
+            name="interactions"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the busy timeout every connection needs"""
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _thread_reader(self) -> sqlite3.Connection:
+        """Return this thread's persistent read connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def _reader(self):
+        """Yield a read connection. WAL lets file-backed readers run alongside the writer."""
+        started = time.perf_counter()
+        try:
+            if self._memory_conn is not None:
+                with self._lock:
+                    yield self._memory_conn
+                return
+            yield self._thread_reader()
+        finally:
+            SQLITE_READ_SECONDS.observe(time.perf_counter() - started)
+
+    def _writer_conn(self) -> sqlite3.Connection:
+        """Persistent write connection; callers must hold `self._lock`"""
+        if self._memory_conn is not None:
+            return self._memory_conn
+        if self._write_conn is None:
+            self._write_conn = self._connect()
+        return self._write_conn
+
+    def close(self):
+        """Close pooled connections (queued write-behind records are flushed by `close_writers`)"""
+        if self._memory_conn is not None:
+            self._compactor.close()
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        with self._lock:
+            for conn in (self._write_conn, self._memory_conn):
+                if conn is not None:
+                    conn.close()
+            self._write_conn = None
+            self._memory_conn = None
+        self._local = threading.local()
+
     def _init_db(self):
         """Initialize the database with required tables"""
         # Enable WAL mode and set a busy timeout to improve concurrency
-        with sqlite3.connect(self.db_path, timeout=30) as conn:
+        conn = self._memory_conn or self._connect()
+        with conn:
             conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("PRAGMA busy_timeout=30000")
             # Create table with module column
@@ -59,150 +246,319 @@ class ContextMemory:
                 CREATE INDEX IF NOT EXISTS idx_user_module_timestamp 
                 ON interactions(user_id, module, timestamp DESC)
             """)
+            # Newest-first scans across modules (history pages, context)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_user_timestamp
+                ON interactions(user_id, timestamp)
+            """)
+        if conn is not self._memory_conn:
+            conn.close()
     
-    def _ensure_table_exists(self, conn):
-        """Ensure table exists in current connection (for in-memory databases)"""
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS interactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                module TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                request_data TEXT NOT NULL,
-                response_data TEXT NOT NULL
-            )
-        """)
-        # Ensure generations table exists for in-memory DBs as well
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS generations (
-                generation_id TEXT PRIMARY KEY,
-                user_id TEXT,
-                interaction_id INTEGER,
-                created_at TEXT,
-                payload TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_user_module_timestamp 
-            ON interactions(user_id, module, timestamp DESC)
-        """)
-    
-    def store_interaction(self, user_id: str, request_data: Dict[str, Any], 
-                         response_data: Dict[str, Any]):
-        """Store a request-response interaction"""
-        timestamp = datetime.now().isoformat()
+    def _insert_interaction(self, cursor, user_id: str, request_data: Dict[str, Any],
+                            response_data: Dict[str, Any], timestamp: Optional[str] = None) -> int:
+        """Insert one interaction (plus generation mapping) inside an open transaction.
+
+        Retention is not applied here; `_compact` trims rows in the background.
+        """
+        timestamp = timestamp or datetime.now().isoformat()
         module = request_data.get("module", "unknown")
 
+        cursor.execute(
+            """
+            INSERT INTO interactions (user_id, module, timestamp, request_data, response_data)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (user_id, module, timestamp, json.dumps(request_data), json.dumps(response_data))
+        )
+        interaction_id = cursor.lastrowid
+
+        # If response includes generation_id, persist mapping for deterministic lifecycle
+        try:
+            gen_id = _extract_generation_id(response_data)
+            if gen_id:
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO generations (generation_id, user_id, interaction_id, created_at, payload)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (gen_id, user_id, interaction_id, timestamp, json.dumps({"request": request_data, "response": response_data}))
+                )
+        except Exception:
+            # Do not let generation mapping failures block main transaction
+            pass
+
+        return interaction_id
+
+    def _write_records(self, records: List[Dict[str, Any]]):
+        """Persist interaction records in one transaction (used directly and by the write-behind writer)"""
         # Use a lock to provide concurrency safety for writes from multiple threads/processes
+        started = time.perf_counter()
         with self._lock:
-            with sqlite3.connect(self.db_path, timeout=30) as conn:
-                self._ensure_table_exists(conn)
-                cursor = conn.cursor()
-                try:
-                    cursor.execute("BEGIN IMMEDIATE TRANSACTION")
-                    cursor.execute(
-                        """
-                        INSERT INTO interactions (user_id, module, timestamp, request_data, response_data)
-                        VALUES (?, ?, ?, ?, ?)
-                        """,
-                        (user_id, module, timestamp, json.dumps(request_data), json.dumps(response_data))
+            conn = self._writer_conn()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE TRANSACTION")
+                for record in records:
+                    # Row id is known before commit so readers can de-duplicate the overlay
+                    record["_rowid"] = self._insert_interaction(
+                        cursor, record["user_id"], record["request"], record["response"], record["timestamp"]
                     )
-                    interaction_id = cursor.lastrowid
-
-                    # If response includes generation_id, persist mapping for deterministic lifecycle
-                    try:
-                        resp_result = response_data.get('result', {}) if isinstance(response_data, dict) else {}
-                        gen_id = None
-                        if isinstance(resp_result, dict):
-                            gen_id = resp_result.get('generation_id')
-                        # Also check top-level response_data for legacy payloads
-                        if not gen_id and isinstance(response_data, dict):
-                            gen_id = response_data.get('generation_id')
-
-                        if gen_id:
-                            cursor.execute(
-                                """
-                                INSERT OR REPLACE INTO generations (generation_id, user_id, interaction_id, created_at, payload)
-                                VALUES (?, ?, ?, ?, ?)
-                                """,
-                                (str(gen_id), user_id, interaction_id, timestamp, json.dumps({"request": request_data, "response": response_data}))
-                            )
-                    except Exception:
-                        # Do not let generation mapping failures block main transaction
-                        pass
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        SQLITE_WRITE_SECONDS.observe(time.perf_counter() - started)
+        self._compactor.note_writes((record["user_id"], record["module"]) for record in records)
 
-                    # Deterministic retention: keep newest by timestamp, then id
-                    cursor.execute(
+    def _compact(self, pairs: Optional[Set[Tuple[str, str]]]) -> int:
+        """Trim interactions to the newest RETENTION_PER_MODULE per (user_id, module).
+
+        `pairs` limits the work to recently written pairs; None compacts the whole table.
+        """
+        deleted = 0
+        if pairs is None:
+            with self._lock:
+                conn = self._writer_conn()
+                with conn:
+                    deleted = conn.execute(
                         """
                         DELETE FROM interactions
                         WHERE id IN (
-                            SELECT id FROM interactions
-                            WHERE user_id = ? AND module = ?
-                            ORDER BY timestamp DESC, id DESC
-                            LIMIT -1 OFFSET 5
+                            SELECT id FROM (
+                                SELECT id, ROW_NUMBER() OVER (
+                                    PARTITION BY user_id, module ORDER BY timestamp DESC, id DESC
+                                ) AS rn
+                                FROM interactions
+                            )
+                            WHERE rn > ?
                         )
                         """,
-                        (user_id, module)
-                    )
+                        (RETENTION_PER_MODULE,)
+                    ).rowcount
+            return deleted
 
+        # Deterministic retention: keep newest by timestamp, then id. Chunked to keep lock holds short.
+        pairs = list(pairs)
+        for start in range(0, len(pairs), 200):
+            with self._lock:
+                conn = self._writer_conn()
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("BEGIN IMMEDIATE TRANSACTION")
+                    for user_id, module in pairs[start:start + 200]:
+                        cursor.execute(
+                            """
+                            DELETE FROM interactions
+                            WHERE id IN (
+                                SELECT id FROM interactions
+                                WHERE user_id = ? AND module = ?
+                                ORDER BY timestamp DESC, id DESC
+                                LIMIT -1 OFFSET ?
+                            )
+                            """,
+                            (user_id, module, RETENTION_PER_MODULE)
+                        )
+                        deleted += max(cursor.rowcount, 0)
                     conn.commit()
                 except Exception:
                     conn.rollback()
                     raise
-    
-    def get_user_history(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get full interaction history for a user"""
-        with sqlite3.connect(self.db_path, timeout=30) as conn:
-            self._ensure_table_exists(conn)
-            cursor = conn.execute(
-                """
-                SELECT module, timestamp, request_data, response_data
-                FROM interactions
-                WHERE user_id = ?
-                ORDER BY timestamp DESC, id DESC
-            """,
-                (user_id,)
+        return deleted
+
+    def compact(self) -> int:
+        """Run retention compaction now (normally done in the background)"""
+        return self._compactor.run_once()
+
+    def retention_stats(self) -> Dict[str, Any]:
+        """Background retention statistics"""
+        return self._compactor.stats()
+
+    @staticmethod
+    def _make_record(user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "user_id": user_id,
+            "module": request_data.get("module", "unknown"),
+            "timestamp": datetime.now().isoformat(),
+            "request": request_data,
+            "response": response_data,
+            "generation_id": _extract_generation_id(response_data),
+            "_rowid": None
+        }
+
+    def store_interaction(self, user_id: str, request_data: Dict[str, Any], 
+                         response_data: Dict[str, Any]):
+        """Store a request-response interaction and return it in `get_context` shape"""
+        return self.store_interactions([(user_id, request_data, response_data)])[0]
+
+    def store_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Store several (user_id, request_data, response_data) interactions in one transaction"""
+        if not interactions:
+            return []
+
+        records = [self._make_record(*interaction) for interaction in interactions]
+        if self._writer:
+            for record in records:
+                self._writer.submit(record)
+        else:
+            self._write_records(records)
+        return [self._record_to_item(record) for record in records]
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued write-behind records to be committed"""
+        return self._writer.flush(timeout) if self._writer else True
+
+    def writer_stats(self) -> Optional[Dict[str, Any]]:
+        """Write-behind queue statistics, or None when writes are synchronous"""
+        return self._writer.stats() if self._writer else None
+
+    @staticmethod
+    def _row_to_item(row) -> Dict[str, Any]:
+        return {
+            "module": row[0],
+            "timestamp": row[1],
+            "request": json.loads(row[2]),
+            "response": json.loads(row[3])
+        }
+
+    @staticmethod
+    def _record_to_item(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "module": record["module"],
+            "timestamp": record["timestamp"],
+            "request": record["request"],
+            "response": record["response"]
+        }
+
+    def _merge_pending(self, pending: List[Dict[str, Any]], rows: List[Tuple], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Combine committed rows (id first) with queued records not yet visible in the database"""
+        if not pending:
+            items = [self._row_to_item(row[1:]) for row in rows]
+            return items if limit is None else items[:limit]
+
+        committed_ids = {row[0] for row in rows}
+        combined = [(row[2], row[0], self._row_to_item(row[1:])) for row in rows]
+        for record in pending:
+            if record["_rowid"] not in committed_ids:
+                combined.append((record["timestamp"], float("inf"), self._record_to_item(record)))
+        combined.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+
+        # Respect per-module retention for records that are not compacted yet
+        per_module: Dict[str, int] = {}
+        items = []
+        for _, _, item in combined:
+            count = per_module.get(item["module"], 0)
+            if count >= RETENTION_PER_MODULE:
+                continue
+            per_module[item["module"]] = count + 1
+            items.append(item)
+            if limit is not None and len(items) >= limit:
+                break
+        return items
+
+    def get_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                         module: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get interaction history for a user, newest first, one keyset page at a time"""
+        filters, params = "", []
+        if module is not None:
+            filters += " AND i.module = ?"
+            params.append(module)
+        cursor_ts = None
+        if before_cursor:
+            cursor_ts, cursor_id = decode_cursor(before_cursor)
+            if cursor_id is None:
+                filters += " AND i.timestamp < ?"
+                params.append(cursor_ts)
+            elif isinstance(cursor_id, int):
+                filters += " AND (i.timestamp < ? OR (i.timestamp = ? AND i.id < ?))"
+                params.extend([cursor_ts, cursor_ts, cursor_id])
+            else:
+                raise ValueError("Invalid history cursor")
+
+        pending = self._writer.pending_for(user_id) if self._writer else []
+        if module is not None:
+            pending = [record for record in pending if record["module"] == module]
+
+        with self._reader() as conn:
+            # One snapshot for the overlay check and the page, so no row is counted twice
+            if pending:
+                conn.execute("BEGIN")
+            try:
+                rowids = [record["_rowid"] for record in pending if record["_rowid"] is not None]
+                committed = set()
+                if rowids:
+                    placeholders = ",".join("?" * len(rowids))
+                    committed = {row[0] for row in conn.execute(
+                        f"SELECT id FROM interactions WHERE id IN ({placeholders})", rowids
+                    )}
+                pending = [record for record in pending if record["_rowid"] not in committed]
+
+                # Each queued record can push at most one row past its module's retention
+                fetch = -1 if limit is None else limit + len(pending) + 1
+                rows = conn.execute(
+                    _HISTORY_PAGE.format(filters=filters),
+                    [RETENTION_PER_MODULE, user_id, *params, RETENTION_PER_MODULE, fetch]
+                ).fetchall()
+            finally:
+                if conn.in_transaction:
+                    conn.commit()
+
+        if not pending:
+            items = [self._row_to_item(row[1:5]) for row in rows]
+            keys = [(row[2], row[0]) for row in rows]
+            return page_of(items, keys, limit)
+        return self._merge_pending_page(pending, rows, cursor_ts, limit)
+
+    def _merge_pending_page(self, pending: List[Dict[str, Any]], rows: List[Tuple],
+                            cursor_ts: Optional[str], limit: Optional[int]) -> HistoryPage:
+        """Merge uncommitted records into a history page, keeping per-module retention exact"""
+        def pending_newer(module: str, timestamp: str, committed_row: bool) -> int:
+            # Queued records sort after every committed row with the same timestamp
+            return sum(
+                1 for record in pending
+                if record["module"] == module
+                and (record["timestamp"] > timestamp or (committed_row and record["timestamp"] == timestamp))
             )
 
-            return [
-                {
-                    "module": row[0],
-                    "timestamp": row[1],
-                    "request": json.loads(row[2]),
-                    "response": json.loads(row[3])
-                }
-                for row in cursor.fetchall()
-            ]
-    
+        entries = []
+        for row in rows:
+            if row[5] + pending_newer(row[1], row[2], True) < RETENTION_PER_MODULE:
+                entries.append((row[2], row[0], self._row_to_item(row[1:5])))
+        for record in pending:
+            if cursor_ts is not None and record["timestamp"] >= cursor_ts:
+                continue
+            if pending_newer(record["module"], record["timestamp"], False) < RETENTION_PER_MODULE:
+                entries.append((record["timestamp"], None, self._record_to_item(record)))
+        entries.sort(key=lambda entry: (entry[0], float("inf") if entry[1] is None else entry[1]), reverse=True)
+
+        return page_of([entry[2] for entry in entries], [(entry[0], entry[1]) for entry in entries], limit)
+
     def get_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
         """Get recent context (last N interactions) for a user"""
-        with sqlite3.connect(self.db_path, timeout=30) as conn:
-            self._ensure_table_exists(conn)
-            cursor = conn.execute(
-                """
-                SELECT module, timestamp, request_data, response_data
-                FROM interactions
-                WHERE user_id = ?
-                ORDER BY timestamp DESC, id DESC
-                LIMIT ?
-            """,
-                (user_id, limit)
-            )
-
-            return [
-                {
-                    "module": row[0],
-                    "timestamp": row[1],
-                    "request": json.loads(row[2]),
-                    "response": json.loads(row[3])
-                }
-                for row in cursor.fetchall()
-            ]
+        pending = self._writer.pending_for(user_id) if self._writer else []
+        with self._reader() as conn:
+            if limit <= RETENTION_PER_MODULE:
+                # The newest `limit` rows are always within each module's newest N
+                cursor = conn.execute(
+                    """
+                    SELECT id, module, timestamp, request_data, response_data
+                    FROM interactions
+                    WHERE user_id = ?
+                    ORDER BY timestamp DESC, id DESC
+                    LIMIT ?
+                """,
+                    (user_id, limit)
+                )
+            else:
+                cursor = conn.execute(
+                    _RETAINED_USER_ROWS + " ORDER BY timestamp DESC, id DESC LIMIT ?",
+                    (user_id, RETENTION_PER_MODULE, limit)
+                )
+            rows = cursor.fetchall()
+        return self._merge_pending(pending, rows, limit)
 
     def get_generation(self, generation_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve stored generation mapping and associated interaction payload."""
-        with sqlite3.connect(self.db_path, timeout=30) as conn:
-            self._ensure_table_exists(conn)
+        with self._reader() as conn:
             cursor = conn.execute(
                 """
                 SELECT generation_id, user_id, interaction_id, created_at, payload
@@ -213,7 +569,17 @@ class ContextMemory:
             )
             row = cursor.fetchone()
             if not row:
-                return None
+                # Not committed yet: answer from the write-behind overlay
+                record = self._writer.pending_generation(str(generation_id)) if self._writer else None
+                if record is None:
+                    return None
+                return {
+                    "generation_id": record["generation_id"],
+                    "user_id": record["user_id"],
+                    "interaction": self._record_to_item(record),
+                    "created_at": record["timestamp"],
+                    "payload": {"request": record["request"], "response": record["response"]}
+                }
             payload = json.loads(row[4]) if row[4] else None
             # Fetch the interaction record if available
             inter = None
@@ -228,12 +594,7 @@ class ContextMemory:
                 )
                 r2 = c2.fetchone()
                 if r2:
-                    inter = {
-                        "module": r2[0],
-                        "timestamp": r2[1],
-                        "request": json.loads(r2[2]),
-                        "response": json.loads(r2[3])
-                    }
+                    inter = self._row_to_item(r2)
 
             return {
                 "generation_id": row[0],
@@ -241,4 +602,4 @@ class ContextMemory:
                 "interaction": inter,
                 "created_at": row[3],
                 "payload": payload
-            }
\ No newline at end of file
+            }
@@ -1,9 +1,20 @@
-from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from .base import MemoryAdapter
 from .memory import ContextMemory
-from ..utils.noopur_client import NoopurClient
-from config.config import INTEGRATOR_USE_NOOPUR
+from .cursor import decode_cursor, page_of
+from .outbox import Outbox, SENT, RETRY, REJECT
+from ..utils.noopur_client import NoopurClient, get_noopur_client
+from ..utils.event_loop import get_background_loop
+from ..utils.executor import run_sync
+from config.config import (
+    INTEGRATOR_USE_NOOPUR, NOOPUR_OUTBOX_DB_PATH, NOOPUR_OUTBOX_BATCH_SIZE, NOOPUR_OUTBOX_POLL_INTERVAL_S,
+    NOOPUR_OUTBOX_BACKOFF_BASE_S, NOOPUR_OUTBOX_BACKOFF_MAX_S
+)
 import asyncio
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
 
 try:
     from .mongodb_adapter import MongoDBAdapter, PYMONGO_AVAILABLE
@@ -13,29 +24,19 @@ except ImportError:
     MONGODB_AVAILABLE = False
 
 
-class MemoryAdapter(ABC):
-    @abstractmethod
-    def store_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
-        pass
-
-    @abstractmethod
-    def get_user_history(self, user_id: str) -> List[Dict[str, Any]]:
-        pass
-
-    @abstractmethod
-    def get_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
-        pass
-
-
 class SQLiteAdapter(MemoryAdapter):
     def __init__(self, db_path: str = "data/context.db"):
         self._mem = ContextMemory(db_path)
 
     def store_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
-        self._mem.store_interaction(user_id, request_data, response_data)
+        return self._mem.store_interaction(user_id, request_data, response_data)
 
-    def get_user_history(self, user_id: str) -> List[Dict[str, Any]]:
-        return self._mem.get_user_history(user_id)
+    def store_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        return self._mem.store_interactions(interactions)
+
+    def get_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                         module: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._mem.get_user_history(user_id, limit, before_cursor, module)
 
     def get_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
         return self._mem.get_context(user_id, limit)
@@ -52,7 +53,8 @@ class RemoteNoopurAdapter(MemoryAdapter):
     """Adapter that reads context from Noopur backend for pre-warming.
 
     This adapter is read-heavy: it will fetch related_context via Noopur's /generate or /history endpoints.
-    store_interaction is implemented as a best-effort no-op (could be extended to forward logs).
+    store_interaction records forwardable events (creator generations, feedback) in a local outbox;
+    a background dispatcher delivers them to Noopur with retry and backoff.
     """
 
     def __init__(self, base_url: Optional[str] = None):
@@ -61,110 +63,158 @@ class RemoteNoopurAdapter(MemoryAdapter):
             if base_url:
                 self.client = NoopurClient(base_url)
             else:
-                self.client = NoopurClient()
+                self.client = get_noopur_client()
         else:
             self.client = None
 
+        self.outbox = None
+        if self.client:
+            self.outbox = Outbox(
+                NOOPUR_OUTBOX_DB_PATH,
+                self._deliver,
+                table="noopur_outbox",
+                batch_size=NOOPUR_OUTBOX_BATCH_SIZE,
+                poll_interval_s=NOOPUR_OUTBOX_POLL_INTERVAL_S,
+                backoff_base_s=NOOPUR_OUTBOX_BACKOFF_BASE_S,
+                backoff_max_s=NOOPUR_OUTBOX_BACKOFF_MAX_S,
+                name="noopur-outbox"
+            )
+
+    @staticmethod
+    def _forwardable_events(user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Map an interaction to the (endpoint, payload) events Noopur should receive"""
+        events = []
+        # If this is a creator generation (has 'data' with prompt/topic), forward as a create
+        if request_data.get("module") == "creator":
+            payload = {}
+            # try to map common fields
+            payload["prompt"] = request_data.get("data", {}).get("prompt") or request_data.get("data", {}).get("topic")
+            # include user_id for traceability if supported by Noopur
+            payload["user_id"] = user_id
+            # Only send minimal payload to avoid leaking internal fields
+            events.append(("/generate", payload))
+
+        # If this looks like feedback (response_data contains score or explicit feedback), forward to /feedback
+        if request_data.get("intent") in ("feedback",) or isinstance(response_data.get("result"), dict) and "score" in response_data.get("result", {}):
+            fb = {}
+            # map possible shapes
+            if "id" in response_data.get("result", {}):
+                fb["generation_id"] = response_data["result"]["id"]
+            if "score" in response_data.get("result", {}):
+                # convert score into a command-like string for Noopur API (+/-)
+                fb["command"] = str(response_data["result"]["score"])
+            if fb:
+                events.append(("/feedback", fb))
+        return events
+
+    def _deliver(self, events: List[Dict[str, Any]]) -> List[Tuple[str, Optional[str]]]:
+        """Outbox callback: send one batch concurrently over the pooled client"""
+        return get_background_loop().run(self._adeliver(events))
+
+    async def _adeliver(self, events: List[Dict[str, Any]]) -> List[Tuple[str, Optional[str]]]:
+        results = await asyncio.gather(
+            *(self.client.post_event(event["endpoint"], event["payload"]) for event in events),
+            return_exceptions=True
+        )
+        outcomes = []
+        for result in results:
+            if not isinstance(result, BaseException):
+                outcomes.append((SENT, None))
+            elif isinstance(result, httpx.HTTPStatusError) and 400 <= result.response.status_code < 500 \
+                    and result.response.status_code not in (408, 429):
+                # Noopur rejected the payload itself; retrying cannot succeed
+                outcomes.append((REJECT, f"HTTP {result.response.status_code}"))
+            else:
+                outcomes.append((RETRY, f"{type(result).__name__}: {result}"))
+        return outcomes
+
     def store_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
         # Forward certain interaction types to Noopur for telemetry/feedback
-        if not self.client:
+        return self.store_interactions([(user_id, request_data, response_data)])
+
+    def store_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        if not self.outbox:
             return None
 
-        async def _store():
-            try:
-                # If this is a creator generation (has 'data' with prompt/topic), forward as a create
-                if request_data.get("module") == "creator":
-                    payload = {}
-                    # try to map common fields
-                    payload["prompt"] = request_data.get("data", {}).get("prompt") or request_data.get("data", {}).get("topic")
-                    # include user_id for traceability if supported by Noopur
-                    payload["user_id"] = user_id
-                    # Only send minimal payload to avoid leaking internal fields
-                    try:
-                        await self.client.generate(payload)
-                    except Exception:
-                        # swallow remote errors
-                        pass
-
-                # If this looks like feedback (response_data contains score or explicit feedback), forward to /feedback
-                if request_data.get("intent") in ("feedback",) or isinstance(response_data.get("result"), dict) and "score" in response_data.get("result", {}):
-                    fb = {}
-                    # map possible shapes
-                    if "id" in response_data.get("result", {}):
-                        fb["generation_id"] = response_data["result"]["id"]
-                    if "score" in response_data.get("result", {}):
-                        # convert score into a command-like string for Noopur API (+/-)
-                        fb["command"] = str(response_data["result"]["score"])
-                    try:
-                        if fb:
-                            await self.client.feedback(fb)
-                    except Exception:
-                        pass
-
-            except Exception:
-                # ensure we never raise from the adapter forwarder
-                return None
-
-        # Run the async operation
         try:
-            asyncio.run(_store())
+            events = [event for interaction in interactions for event in self._forwardable_events(*interaction)]
+            self.outbox.enqueue(events)
         except Exception:
-            pass
+            # ensure we never raise from the adapter forwarder
+            logger.exception("Failed to queue interactions for Noopur")
 
         return None
 
-    def get_user_history(self, user_id: str) -> List[Dict[str, Any]]:
+    async def astore_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
+        return await self.astore_interactions([(user_id, request_data, response_data)])
+
+    async def astore_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        if not self.outbox:
+            return None
+        return await run_sync(self.store_interactions, interactions)
+
+    def outbox_stats(self) -> Optional[Dict[str, Any]]:
+        """Depth and lag of the Noopur forwarding outbox"""
+        return self.outbox.stats() if self.outbox else None
+
+    def close(self):
+        """Stop the outbox dispatcher; undelivered events are sent after the next start"""
+        if self.outbox:
+            self.outbox.close()
+
+    def get_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                         module: Optional[str] = None) -> List[Dict[str, Any]]:
         # Try fetching history from Noopur and map to local shape
         if not self.client:
             return []
-        
-        async def _get_history():
-            try:
-                items = await self.client.history()
-                # API returns a list of generations: {id, text, score, created_at}
-                mapped = [
-                    {
-                        "module": "creator",
-                        "timestamp": it.get("created_at") or it.get("timestamp"),
-                        "request": {"prompt": None},
-                        "response": {"generated_text": it.get("text"), "score": it.get("score"), "id": it.get("id")}
-                    }
-                    for it in items
-                ]
-                # Sort by timestamp desc, fallback to id desc
-                mapped.sort(key=lambda x: (x.get("timestamp") or "", x["response"].get("id") or 0), reverse=True)
-                return mapped
-            except Exception:
-                return []
 
+        if before_cursor:
+            decode_cursor(before_cursor)
         try:
-            return asyncio.run(_get_history())
+            return get_background_loop().run(self.aget_user_history(user_id, limit, before_cursor, module))
         except Exception:
             return []
 
+    async def aget_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                                module: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not self.client:
+            return []
+
+        try:
+            items = await self.client.history()
+            # API returns a list of generations: {id, text, score, created_at}
+            mapped = [
+                {
+                    "module": "creator",
+                    "timestamp": it.get("created_at") or it.get("timestamp"),
+                    "request": {"prompt": None},
+                    "response": {"generated_text": it.get("text"), "score": it.get("score"), "id": it.get("id")}
+                }
+                for it in items
+            ]
+            # Sort by timestamp desc, fallback to id desc
+            mapped.sort(key=lambda x: (x.get("timestamp") or "", x["response"].get("id") or 0), reverse=True)
+        except Exception:
+            return []
+
+        # Noopur has no server-side paging; page the fetched list by timestamp
+        if module is not None:
+            mapped = [item for item in mapped if item["module"] == module]
+        if before_cursor:
+            cursor_ts, _ = decode_cursor(before_cursor)
+            mapped = [item for item in mapped if (item["timestamp"] or "") < cursor_ts]
+        return page_of(mapped, [(item["timestamp"] or "", None) for item in mapped], limit)
+
     def get_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
         # Fetch recent generations from Noopur and return top-N as context
         if not self.client:
             return []
-        
-        async def _get_context():
-            try:
-                items = await self.client.history()
-                mapped = [
-                    {
-                        "module": "creator",
-                        "timestamp": it.get("created_at") or it.get("timestamp"),
-                        "request": {"prompt": None},
-                        "response": {"generated_text": it.get("text"), "score": it.get("score"), "id": it.get("id")}
-                    }
-                    for it in items
-                ]
-                mapped.sort(key=lambda x: (x.get("timestamp") or "", x["response"].get("id") or 0), reverse=True)
-                return mapped[:limit]
-            except Exception:
-                return []
 
         try:
-            return asyncio.run(_get_context())
+            return get_background_loop().run(self.aget_context(user_id, limit))
         except Exception:
             return []
+
+    async def aget_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
+        history = await self.aget_user_history(user_id, limit)
+        return list(history)
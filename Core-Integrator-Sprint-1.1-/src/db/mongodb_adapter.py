@@ -1,95 +1,196 @@
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Optional, Set, Tuple
 import json
+from .base import MemoryAdapter
+from .retention import RetentionCompactor
+from .cursor import decode_cursor, page_of
+from config.config import MEMORY_RETENTION_PER_MODULE, MEMORY_COMPACTION_INTERVAL_S, MEMORY_COMPACTION_ROW_THRESHOLD
 
 try:
     from pymongo import MongoClient
     from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+    from bson import ObjectId
     PYMONGO_AVAILABLE = True
 except ImportError:
     MongoClient = None
+    ObjectId = None
     ConnectionFailure = Exception
     ServerSelectionTimeoutError = Exception
     PYMONGO_AVAILABLE = False
 
-class MongoDBAdapter:
+class MongoDBAdapter(MemoryAdapter):
     """MongoDB adapter for storing user interactions in MongoDB Atlas"""
     
-    def __init__(self, connection_string: str = None, database_name: str = "core_integrator"):
-        if not PYMONGO_AVAILABLE:
-            raise RuntimeError("pymongo not installed; cannot use MongoDB adapter")
-        
-        if not connection_string:
-            raise ValueError("MongoDB connection string is required")
+    def __init__(self, connection_string: str = None, database_name: str = "core_integrator", client=None):
+        """Connect to `connection_string`, or use `client`: any MongoClient-compatible object (e.g. mongomock's)"""
+        if client is None:
+            if not PYMONGO_AVAILABLE:
+                raise RuntimeError("pymongo not installed; cannot use MongoDB adapter")
+
+            if not connection_string:
+                raise ValueError("MongoDB connection string is required")
+
+            client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
         
-        self.client = MongoClient(connection_string, serverSelectionTimeoutMS=5000)
+        self.client = client
         self.db = self.client[database_name]
         self.collection = self.db.interactions
         
         # Create index for efficient queries
         self.collection.create_index([("user_id", 1), ("module", 1), ("timestamp", -1)])
+        self.collection.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
         
         # Test connection
         try:
             self.client.admin.command('ping')
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
             raise ConnectionError(f"Failed to connect to MongoDB: {e}")
+
+        # Retention (latest N per user per module) runs in the background, not on every insert
+        self.retention = MEMORY_RETENTION_PER_MODULE
+        self._compactor = RetentionCompactor(
+            self._compact,
+            interval_s=MEMORY_COMPACTION_INTERVAL_S,
+            row_threshold=MEMORY_COMPACTION_ROW_THRESHOLD,
+            name="mongodb"
+        )
     
-    def store_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
-        """Store a request-response interaction"""
-        timestamp = datetime.now().isoformat()
-        module = request_data.get("module", "unknown")
-        
-        document = {
+    def _build_document(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             "user_id": user_id,
-            "module": module,
-            "timestamp": timestamp,
+            "module": request_data.get("module", "unknown"),
+            "timestamp": datetime.now().isoformat(),
             "request_data": request_data,
             "response_data": response_data
         }
-        
-        self.collection.insert_one(document)
-        
-        # Retention: keep only latest 5 interactions per user per module
+
+    def _apply_retention(self, user_id: str, module: str) -> int:
+        """Retention: keep only latest N interactions per user per module"""
         pipeline = [
             {"$match": {"user_id": user_id, "module": module}},
             {"$sort": {"timestamp": -1, "_id": -1}},
-            {"$skip": 5}
+            {"$skip": self.retention},
+            {"$project": {"_id": 1}}
         ]
         
         old_docs = list(self.collection.aggregate(pipeline))
         if old_docs:
             old_ids = [doc["_id"] for doc in old_docs]
-            self.collection.delete_many({"_id": {"$in": old_ids}})
-    
-    def get_user_history(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get full interaction history for a user"""
-        cursor = self.collection.find(
-            {"user_id": user_id}
-        ).sort([("timestamp", -1), ("_id", -1)])
-        
-        return [
-            {
-                "module": doc["module"],
-                "timestamp": doc["timestamp"],
-                "request": doc["request_data"],
-                "response": doc["response_data"]
-            }
-            for doc in cursor
-        ]
+            return self.collection.delete_many({"_id": {"$in": old_ids}}).deleted_count
+        return 0
+
+    def _compact(self, pairs: Optional[Set[Tuple[str, str]]]) -> int:
+        """Background retention pass over dirty (user_id, module) pairs, or all over-limit pairs when None"""
+        if pairs is None:
+            pipeline = [
+                {"$group": {"_id": {"user_id": "$user_id", "module": "$module"}, "count": {"$sum": 1}}},
+                {"$match": {"count": {"$gt": self.retention}}}
+            ]
+            pairs = {(doc["_id"]["user_id"], doc["_id"]["module"]) for doc in self.collection.aggregate(pipeline)}
+        return sum(self._apply_retention(user_id, module) for user_id, module in pairs)
+
+    def compact(self) -> int:
+        """Run retention compaction now (normally done in the background)"""
+        return self._compactor.run_once()
+
+    def retention_stats(self) -> Dict[str, Any]:
+        return self._compactor.stats()
+
+    def close(self):
+        """Stop background compaction and close the client"""
+        self._compactor.close()
+        self.client.close()
+
+    def store_interaction(self, user_id: str, request_data: Dict[str, Any], response_data: Dict[str, Any]):
+        """Store a request-response interaction"""
+        document = self._build_document(user_id, request_data, response_data)
+        self.collection.insert_one(document)
+        self._compactor.note_writes([(user_id, document["module"])])
+        return self._to_item(document)
+
+    def store_interactions(self, interactions: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]):
+        """Store several interactions with a single insert_many"""
+        if not interactions:
+            return []
+        documents = [self._build_document(*interaction) for interaction in interactions]
+        self.collection.insert_many(documents, ordered=True)
+        self._compactor.note_writes((doc["user_id"], doc["module"]) for doc in documents)
+        return [self._to_item(doc) for doc in documents]
+
+    @staticmethod
+    def _to_item(doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "module": doc["module"],
+            "timestamp": doc["timestamp"],
+            "request": doc["request_data"],
+            "response": doc["response_data"]
+        }
+
+    def _retained(self, docs: Iterable[Dict[str, Any]], limit: Optional[int] = None,
+                  newer: Optional[Callable[[str], int]] = None) -> List[Dict[str, Any]]:
+        """Newest-first documents within each module's newest N.
+
+        `newer(module)` seeds the per-module count with documents that sort
+        before the scan start (used when resuming from a cursor).
+        """
+        per_module: Dict[str, int] = {}
+        kept = []
+        for doc in docs:
+            module = doc["module"]
+            if module not in per_module:
+                per_module[module] = newer(module) if newer else 0
+            if per_module[module] >= self.retention:
+                continue
+            per_module[module] += 1
+            kept.append(doc)
+            if limit is not None and len(kept) >= limit:
+                break
+        return kept
+
+    @staticmethod
+    def _before(timestamp: str, doc_id: Any) -> Dict[str, Any]:
+        """Filter for documents sorting after (timestamp, _id) in newest-first order"""
+        if doc_id is None:
+            return {"timestamp": {"$lt": timestamp}}
+        return {"$or": [{"timestamp": {"$lt": timestamp}}, {"timestamp": timestamp, "_id": {"$lt": doc_id}}]}
+
+    def get_user_history(self, user_id: str, limit: Optional[int] = None, before_cursor: Optional[str] = None,
+                         module: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get interaction history for a user, newest first, one keyset page at a time"""
+        query: Dict[str, Any] = {"user_id": user_id}
+        if module is not None:
+            query["module"] = module
+        newer = None
+        if before_cursor:
+            timestamp, doc_id = decode_cursor(before_cursor)
+            if doc_id is not None:
+                if not isinstance(doc_id, str) or not ObjectId.is_valid(doc_id):
+                    raise ValueError("Invalid history cursor")
+                doc_id = ObjectId(doc_id)
+            on_earlier_pages = {"$nor": [self._before(timestamp, doc_id)]}
+            query.update(self._before(timestamp, doc_id))
+
+            def newer(doc_module: str) -> int:
+                # Documents of this module on earlier pages still count toward its retention
+                return self.collection.count_documents(
+                    {"user_id": user_id, "module": doc_module, **on_earlier_pages}, limit=self.retention
+                )
+
+        cursor = self.collection.find(query).sort([("timestamp", -1), ("_id", -1)])
+        docs = self._retained(cursor, None if limit is None else limit + 1, newer)
+        return page_of(
+            [self._to_item(doc) for doc in docs],
+            [(doc["timestamp"], str(doc["_id"])) for doc in docs],
+            limit
+        )
     
     def get_context(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
         """Get recent context (last N interactions) for a user"""
         cursor = self.collection.find(
             {"user_id": user_id}
-        ).sort([("timestamp", -1), ("_id", -1)]).limit(limit)
+        ).sort([("timestamp", -1), ("_id", -1)])
+        if limit <= self.retention:
+            # The newest `limit` documents are always within each module's newest N
+            cursor = cursor.limit(limit)
         
-        return [
-            {
-                "module": doc["module"],
-                "timestamp": doc["timestamp"],
-                "request": doc["request_data"],
-                "response": doc["response_data"]
-            }
-            for doc in cursor
-        ]
\ No newline at end of file
+        return [self._to_item(doc) for doc in self._retained(cursor, limit)]
@@ -0,0 +1,211 @@
+"""Durable outbox for events forwarded to external services.
+
+Events are inserted into a local SQLite table in the caller's request and
+delivered later by a background dispatcher, so request latency never includes
+the remote round trip and nothing is lost while the remote side is down.
+
+The dispatcher claims due rows under a short lease (so several processes can
+share one database without double-sending), hands them to `deliver` as one
+batch, deletes delivered rows and reschedules failures with capped
+exponential backoff.
+"""
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Delivery outcomes returned by `deliver`, one per event
+SENT = "sent"
+RETRY = "retry"
+REJECT = "reject"
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class Outbox:
+    """SQLite-backed outbox with a background batch dispatcher.
+
+    `deliver(events)` receives a list of dicts with ``id``, ``endpoint``,
+    ``payload`` and ``attempts`` and returns a list of (outcome, error) pairs in
+    the same order, where outcome is SENT, RETRY or REJECT (permanent failure,
+    the event is dropped and logged).
+    """
+
+    def __init__(self, db_path: str, deliver: Callable[[List[Dict[str, Any]]], List[Tuple[str, Optional[str]]]],
+                 table: str = "outbox", batch_size: int = 50, poll_interval_s: float = 1.0,
+                 backoff_base_s: float = 1.0, backoff_max_s: float = 300.0, lease_s: float = 60.0,
+                 name: str = "outbox"):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(exist_ok=True)
+        self.table = table
+        self._deliver = deliver
+        self.batch_size = max(batch_size, 1)
+        self.poll_interval_s = max(poll_interval_s, 0.05)
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.lease_s = lease_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._init_db()
+        self._stats: Dict[str, Any] = {"enqueued": 0, "sent": 0, "retried": 0, "rejected": 0,
+                                       "batches": 0, "last_error": None, "last_sent_at": None}
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{name}-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _init_db(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=30000")
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    endpoint TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT
+                )
+            """)
+            self._conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{self.table}_due
+                ON {self.table}(next_attempt_at)
+            """)
+
+    # Producer side
+    def enqueue(self, events: Iterable[Event]) -> int:
+        """Durably record (endpoint, payload) events for delivery; returns how many were added."""
+        now = time.time()
+        rows = [(endpoint, json.dumps(payload), now, now) for endpoint, payload in events]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO {self.table} (endpoint, payload, created_at, next_attempt_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._stats["enqueued"] += len(rows)
+        self._wake.set()
+        return len(rows)
+
+    # Dispatcher side
+    def _claim(self) -> List[Dict[str, Any]]:
+        """Lease up to `batch_size` due events so no other dispatcher picks them up"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE TRANSACTION")
+                rows = cursor.execute(
+                    f"""
+                    SELECT id, endpoint, payload, attempts FROM {self.table}
+                    WHERE next_attempt_at <= ?
+                    ORDER BY next_attempt_at, id
+                    LIMIT ?
+                    """,
+                    (now, self.batch_size)
+                ).fetchall()
+                if rows:
+                    cursor.executemany(
+                        f"UPDATE {self.table} SET next_attempt_at = ? WHERE id = ?",
+                        [(now + self.lease_s, row[0]) for row in rows]
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return [{"id": row[0], "endpoint": row[1], "payload": json.loads(row[2]), "attempts": row[3]} for row in rows]
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_base_s * (2 ** (attempts - 1)), self.backoff_max_s)
+        # Jitter spreads retries from many events (and processes) after an outage
+        return delay * random.uniform(0.5, 1.0)
+
+    def dispatch_once(self) -> int:
+        """Deliver one batch of due events; returns the number of events sent."""
+        events = self._claim()
+        if not events:
+            return 0
+        try:
+            outcomes = self._deliver(events)
+        except Exception as e:
+            outcomes = [(RETRY, str(e))] * len(events)
+
+        now = time.time()
+        done, retry = [], []
+        sent = rejected = 0
+        last_error = None
+        for event, (outcome, error) in zip(events, outcomes):
+            if outcome == SENT:
+                done.append((event["id"],))
+                sent += 1
+            elif outcome == REJECT:
+                logger.error(f"Dropping outbox event {event['id']} to {event['endpoint']}: {error}")
+                done.append((event["id"],))
+                rejected += 1
+            else:
+                attempts = event["attempts"] + 1
+                retry.append((now + self._backoff(attempts), attempts, error, event["id"]))
+                last_error = error
+
+        with self._lock, self._conn:
+            self._conn.executemany(f"DELETE FROM {self.table} WHERE id = ?", done)
+            self._conn.executemany(
+                f"UPDATE {self.table} SET next_attempt_at = ?, attempts = ?, last_error = ? WHERE id = ?",
+                retry
+            )
+            self._stats["batches"] += 1
+            self._stats["sent"] += sent
+            self._stats["rejected"] += rejected
+            self._stats["retried"] += len(retry)
+            if sent:
+                self._stats["last_sent_at"] = now
+            if last_error:
+                self._stats["last_error"] = last_error
+        if retry:
+            logger.warning(f"Outbox delivery failed for {len(retry)} events; retrying with backoff")
+        return sent
+
+    def _run(self) -> None:
+        while not self._closing.is_set():
+            self._wake.wait(self.poll_interval_s)
+            self._wake.clear()
+            try:
+                # Keep draining while full batches are being delivered
+                while self.dispatch_once() >= self.batch_size and not self._closing.is_set():
+                    pass
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the dispatcher. Undelivered events stay in the table for the next start."""
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Depth (undelivered events), lag (age of the oldest one) and delivery counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            if self._closing.is_set():
+                return stats
+            depth, oldest, retrying = self._conn.execute(
+                f"SELECT COUNT(*), MIN(created_at), SUM(attempts > 0) FROM {self.table}"
+            ).fetchone()
+        stats["depth"] = depth
+        stats["retrying"] = retrying or 0
+        stats["lag_s"] = round(time.time() - oldest, 3) if oldest is not None else 0.0
+        return stats
@@ -0,0 +1,100 @@
+"""Background retention compaction for interaction stores.
+
+Writes only record which (user_id, module) pairs became dirty; a background
+thread trims each dirty pair to its newest N interactions either every
+`interval_s` seconds or as soon as `row_threshold` writes have accumulated.
+Readers apply the same N-newest rule at query time, so results are identical
+whether or not compaction has caught up.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+
+
+class RetentionCompactor:
+    """Runs `compact(pairs)` off the request path.
+
+    `compact` receives a set of (user_id, module) pairs to trim, or None for a
+    full pass over the store, and returns the number of deleted rows.
+    """
+
+    def __init__(self, compact: Callable[[Optional[Set[Pair]]], int], interval_s: float = 30.0,
+                 row_threshold: int = 1000, full_pass_on_start: bool = True, name: str = "retention"):
+        self._compact = compact
+        self.interval_s = max(interval_s, 0.1)
+        self.row_threshold = max(row_threshold, 1)
+        self._dirty: Set[Pair] = set()
+        self._writes_since_compaction = 0
+        self._full_pass = full_pass_on_start
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._stats: Dict[str, Any] = {"runs": 0, "deleted": 0, "last_run_at": None, "last_duration_ms": None, "errors": 0}
+        if full_pass_on_start:
+            self._wake.set()
+        self._thread = threading.Thread(target=self._run, name=f"{name}-compactor", daemon=True)
+        self._thread.start()
+
+    def note_writes(self, pairs: Iterable[Pair]) -> None:
+        """Record written (user_id, module) pairs; cheap enough for the write hot path."""
+        with self._lock:
+            for pair in pairs:
+                self._dirty.add(pair)
+                self._writes_since_compaction += 1
+            if self._writes_since_compaction >= self.row_threshold:
+                self._wake.set()
+
+    def run_once(self) -> int:
+        """Compact pending work synchronously and return the number of deleted rows."""
+        with self._lock:
+            pairs, self._dirty = self._dirty, set()
+            full_pass, self._full_pass = self._full_pass, False
+            self._writes_since_compaction = 0
+        if not pairs and not full_pass:
+            return 0
+
+        start = time.time()
+        try:
+            deleted = self._compact(None if full_pass else pairs)
+        except Exception:
+            logger.exception("Retention compaction failed")
+            with self._lock:
+                # Keep the work for the next run
+                self._dirty |= pairs
+                self._full_pass = self._full_pass or full_pass
+                self._stats["errors"] += 1
+            return 0
+
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["deleted"] += deleted
+            self._stats["last_run_at"] = start
+            self._stats["last_duration_ms"] = round((time.time() - start) * 1000, 2)
+        return deleted
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Run a final compaction and stop the background thread."""
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["dirty_pairs"] = len(self._dirty)
+            stats["writes_since_compaction"] = self._writes_since_compaction
+        return stats
+
+    def _run(self) -> None:
+        while not self._closing.is_set():
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+            self.run_once()
+        self.run_once()
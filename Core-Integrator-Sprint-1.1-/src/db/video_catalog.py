@@ -0,0 +1,175 @@
+"""Persistent catalog of generated videos behind `list_videos`.
+
+One row per generation id, inserted by the generate path (directly or via
+video job state changes) and owned by the user who generated it; status
+lookups only refresh the status of rows that already exist. Listings are keyset-paginated on
+(created_at, id) newest first, so a page costs the same however large the
+catalog grows: per-user listings use the (user_id, created_at) index and
+topic/status listings the (topic, status, created_at) index.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.config import VIDEO_CATALOG_DB_PATH
+from .cursor import HistoryPage, decode_cursor, page_of
+
+_FIELDS = ("generation_id", "user_id", "topic", "style", "status", "video_url", "duration",
+           "created_at", "updated_at")
+
+
+class VideoCatalog:
+    """SQLite video catalog with filtered keyset pagination"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=30000")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_catalog (
+                    id INTEGER PRIMARY KEY,
+                    generation_id TEXT NOT NULL UNIQUE,
+                    user_id TEXT,
+                    topic TEXT,
+                    style TEXT,
+                    status TEXT NOT NULL,
+                    video_url TEXT,
+                    duration REAL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_video_catalog_user_created ON video_catalog(user_id, created_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_video_catalog_topic_status ON video_catalog(topic, status, created_at)"
+            )
+
+    def record(self, generation_id: str, status: str, user_id: Optional[str] = None,
+               topic: Optional[str] = None, style: Optional[str] = None, video_url: Optional[str] = None,
+               duration: Optional[float] = None, created_at: Optional[str] = None) -> None:
+        """Insert or update a video; fields passed as None keep their stored value and the owner never changes"""
+        now = datetime.now().isoformat(timespec="microseconds")
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO video_catalog
+                    (generation_id, user_id, topic, style, status, video_url, duration, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(generation_id) DO UPDATE SET
+                    topic = COALESCE(video_catalog.topic, excluded.topic),
+                    style = COALESCE(video_catalog.style, excluded.style),
+                    status = excluded.status,
+                    video_url = COALESCE(excluded.video_url, video_catalog.video_url),
+                    duration = COALESCE(excluded.duration, video_catalog.duration),
+                    updated_at = excluded.updated_at
+                """,
+                (generation_id, user_id, topic, style, status, video_url, duration, created_at or now, now)
+            )
+
+    def refresh(self, generation_id: str, status: str, video_url: Optional[str] = None,
+                duration: Optional[float] = None) -> bool:
+        """Update the status of an already catalogued video; returns False when there is no such row"""
+        now = datetime.now().isoformat(timespec="microseconds")
+        with self._lock, self._conn:
+            return self._conn.execute(
+                """
+                UPDATE video_catalog
+                SET status = ?, video_url = COALESCE(?, video_url), duration = COALESCE(?, duration), updated_at = ?
+                WHERE generation_id = ?
+                """,
+                (status, video_url, duration, now, generation_id)
+            ).rowcount > 0
+
+    def record_job(self, job: Dict[str, Any]) -> None:
+        """Catalog a video job from the job table (job id is the public generation_id)"""
+        request = job["request"]
+        video = job["result"] or {}
+        self.record(
+            job["job_id"], job["state"],
+            user_id=job["user_id"],
+            topic=request.get("topic"),
+            style=request.get("style"),
+            video_url=video.get("video_url"),
+            duration=video.get("duration") or request.get("duration"),
+            created_at=datetime.fromtimestamp(job["created_at"]).isoformat(timespec="microseconds")
+        )
+
+    def list(self, user_id: Optional[str] = None, topic: Optional[str] = None, style: Optional[str] = None,
+             status: Optional[str] = None, limit: int = 10, before_cursor: Optional[str] = None) -> HistoryPage:
+        """Newest-first page of videos matching the filters; raises ValueError for a bad cursor"""
+        filters, params = self._filters(user_id, topic, style, status)
+        if before_cursor:
+            created_at, row_id = decode_cursor(before_cursor)
+            if not isinstance(row_id, int):
+                raise ValueError("Invalid history cursor")
+            filters.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params += [created_at, created_at, row_id]
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT id, {', '.join(_FIELDS)} FROM video_catalog
+                {where}
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+                """,
+                (*params, limit + 1)
+            ).fetchall()
+        items = [dict(zip(_FIELDS, row[1:])) for row in rows]
+        return page_of(items, [(row[8], row[0]) for row in rows], limit)
+
+    def count(self, user_id: Optional[str] = None, topic: Optional[str] = None, style: Optional[str] = None,
+              status: Optional[str] = None) -> int:
+        """Number of videos matching the filters"""
+        filters, params = self._filters(user_id, topic, style, status)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM video_catalog {where}", params).fetchone()[0]
+
+    @staticmethod
+    def _filters(user_id, topic, style, status):
+        filters, params = [], []
+        for column, value in (("user_id", user_id), ("topic", topic), ("style", style), ("status", status)):
+            if value is not None:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        return filters, params
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_catalog: Optional[VideoCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_video_catalog() -> VideoCatalog:
+    """Return the shared video catalog, creating it on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = VideoCatalog(VIDEO_CATALOG_DB_PATH)
+    return _catalog
+
+
+def close_video_catalog() -> None:
+    """Close the shared video catalog (used on application shutdown)."""
+    global _catalog
+    with _catalog_lock:
+        catalog, _catalog = _catalog, None
+    if catalog is not None:
+        catalog.close()
@@ -0,0 +1,240 @@
+"""Local table of text-to-video jobs.
+
+Every video generation request becomes a job row that moves through
+queued -> submitted -> processing -> done | failed. Active jobs and recently
+finished ones are mirrored in memory, so status lookups by job id or by the
+video service's generation_id do not touch the database.
+
+Several processes may share the table. A worker only submits or polls a job
+while it holds the job's lease (``owner`` plus ``lease_until``), taken with a
+conditional UPDATE, so each job is driven by one process at a time; jobs
+whose owner stopped renewing are adopted by another process once the lease
+runs out. Updates are conditional on the lease too, and the in-memory copy of
+an active job is only trusted while this process holds its lease.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+QUEUED = "queued"
+SUBMITTED = "submitted"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+TERMINAL_STATES = (DONE, FAILED)
+
+_COLUMNS = ("job_id", "user_id", "state", "generation_id", "request", "result", "error",
+            "attempts", "created_at", "updated_at", "owner", "lease_until")
+
+
+class VideoJobStore:
+    """SQLite-backed job table with an in-memory index of active and recently finished jobs"""
+
+    def __init__(self, db_path: str, recent_terminal: int = 10000):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._active: Dict[str, Dict[str, Any]] = {}
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._recent_max = max(recent_terminal, 0)
+        # generation_id -> job_id for jobs held in memory
+        self._by_generation: Dict[str, str] = {}
+        self._init_db()
+
+    def _init_db(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=30000")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    state TEXT NOT NULL,
+                    generation_id TEXT,
+                    request TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT,
+                    lease_until REAL
+                )
+            """)
+            # Tables created before leases were added
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(video_jobs)").fetchall()]
+            if "owner" not in columns:
+                self._conn.execute("ALTER TABLE video_jobs ADD COLUMN owner TEXT")
+            if "lease_until" not in columns:
+                self._conn.execute("ALTER TABLE video_jobs ADD COLUMN lease_until REAL")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_video_jobs_state ON video_jobs(state)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_video_jobs_generation ON video_jobs(generation_id)")
+
+    @staticmethod
+    def _row_to_job(row) -> Dict[str, Any]:
+        job = dict(zip(_COLUMNS, row))
+        job["request"] = json.loads(job["request"]) if job["request"] else {}
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _remember(self, job: Dict[str, Any]) -> None:
+        """Keep the in-memory index in step with a job's latest state (caller holds the lock)"""
+        job_id = job["job_id"]
+        if job.get("generation_id"):
+            self._by_generation[job["generation_id"]] = job_id
+        if job["state"] in TERMINAL_STATES:
+            self._active.pop(job_id, None)
+            if self._recent_max:
+                self._recent[job_id] = job
+                self._recent.move_to_end(job_id)
+                while len(self._recent) > self._recent_max:
+                    _, old = self._recent.popitem(last=False)
+                    if old.get("generation_id"):
+                        self._by_generation.pop(old["generation_id"], None)
+        else:
+            self._active[job_id] = job
+
+    def create(self, job_id: str, user_id: Optional[str], request: Dict[str, Any],
+               owner: Optional[str] = None, lease_s: float = 0.0) -> Dict[str, Any]:
+        """Insert a queued job, leased to `owner` for `lease_s` when given"""
+        now = time.time()
+        lease_until = now + lease_s if owner else None
+        job = {"job_id": job_id, "user_id": user_id, "state": QUEUED, "generation_id": None,
+               "request": request, "result": None, "error": None, "attempts": 0,
+               "created_at": now, "updated_at": now, "owner": owner, "lease_until": lease_until}
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO video_jobs (job_id, user_id, state, request, attempts, created_at, updated_at,
+                                        owner, lease_until)
+                VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)
+                """,
+                (job_id, user_id, QUEUED, json.dumps(request), now, now, owner, lease_until)
+            )
+            self._remember(job)
+        return dict(job)
+
+    def update(self, job_id: str, owner: str, **fields) -> Optional[Dict[str, Any]]:
+        """Apply field changes to a job leased by `owner` and return its new state; None once the lease is lost"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.update(fields)
+        now = job["updated_at"] = time.time()
+        with self._lock, self._conn:
+            updated = self._conn.execute(
+                """
+                UPDATE video_jobs
+                SET state = ?, generation_id = ?, result = ?, error = ?, attempts = ?, updated_at = ?
+                WHERE job_id = ? AND owner = ? AND lease_until > ?
+                """,
+                (job["state"], job["generation_id"], json.dumps(job["result"]) if job["result"] is not None else None,
+                 job["error"], job["attempts"], now, job_id, owner, now)
+            ).rowcount
+            if not updated:
+                # Another process owns the job now; forget the stale copy
+                self._active.pop(job_id, None)
+                return None
+            self._remember(job)
+        return dict(job)
+
+    def get(self, job_or_generation_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a job by job id or by the video service's generation_id"""
+        with self._lock:
+            job_id = self._by_generation.get(job_or_generation_id, job_or_generation_id)
+            job = self._recent.get(job_id)
+            if job is None:
+                job = self._active.get(job_id)
+                # Only jobs leased to this process cannot have changed behind our back
+                if job is not None and not (job["lease_until"] and job["lease_until"] > time.time()):
+                    job = None
+            if job is not None:
+                return dict(job)
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM video_jobs WHERE job_id = ? OR generation_id = ? LIMIT 1",
+                (job_or_generation_id, job_or_generation_id)
+            ).fetchone()
+            job = self._row_to_job(row) if row else None
+            if job is not None and job["state"] in TERMINAL_STATES:
+                self._remember(job)
+        return dict(job) if job else None
+
+    def claim(self, job_id: str, owner: str, lease_s: float) -> Optional[Dict[str, Any]]:
+        """Take or renew the lease on an active job; returns the job as stored, or None if another owner holds it"""
+        now = time.time()
+        with self._lock, self._conn:
+            claimed = self._conn.execute(
+                """
+                UPDATE video_jobs SET owner = ?, lease_until = ?
+                WHERE job_id = ? AND state NOT IN (?, ?)
+                  AND (owner IS NULL OR owner = ? OR lease_until < ?)
+                """,
+                (owner, now + lease_s, job_id, *TERMINAL_STATES, owner, now)
+            ).rowcount
+            if not claimed:
+                return None
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM video_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            job = self._row_to_job(row)
+            self._remember(job)
+        return dict(job)
+
+    def claim_orphans(self, owner: str, lease_s: float) -> List[Dict[str, Any]]:
+        """Lease every active job owned by nobody, or by another process whose lease ran out; returns them"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE TRANSACTION")
+                rows = cursor.execute(
+                    f"""
+                    SELECT {', '.join(_COLUMNS)} FROM video_jobs
+                    WHERE state NOT IN (?, ?) AND (owner IS NULL OR (owner != ? AND lease_until < ?))
+                    ORDER BY created_at
+                    """,
+                    (*TERMINAL_STATES, owner, now)
+                ).fetchall()
+                if rows:
+                    cursor.executemany(
+                        "UPDATE video_jobs SET owner = ?, lease_until = ? WHERE job_id = ?",
+                        [(owner, now + lease_s, row[0]) for row in rows]
+                    )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            jobs = [self._row_to_job(row) for row in rows]
+            for job in jobs:
+                job["owner"], job["lease_until"] = owner, now + lease_s
+                self._remember(job)
+        return [dict(job) for job in jobs]
+
+    def release(self, owner: str, keep: Iterable[str] = ()) -> int:
+        """Drop `owner`'s leases on unfinished jobs, except `keep`, so another process can adopt them at once"""
+        keep = list(keep)
+        exclude = f" AND job_id NOT IN ({', '.join('?' * len(keep))})" if keep else ""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE video_jobs SET owner = NULL, lease_until = NULL WHERE owner = ? AND state NOT IN (?, ?)"
+                + exclude,
+                (owner, *TERMINAL_STATES, *keep)
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of in-memory active jobs per state"""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._active.values():
+                counts[job["state"]] = counts.get(job["state"], 0) + 1
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,172 @@
+"""Write-behind interaction log with group commit.
+
+Interactions are appended to a bounded in-process queue and a single writer
+thread drains them into the database in batches, one transaction per batch.
+Records that are queued but not yet committed stay visible through an overlay
+so readers in the same process keep read-your-writes semantics.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InteractionWriter:
+    """Single background writer that group-commits queued interaction records.
+
+    `write_batch` receives a list of record dicts and must persist them in one
+    transaction. While inserting it may set ``record["_rowid"]`` so readers can
+    de-duplicate records that became visible in the database.
+    """
+
+    def __init__(self, write_batch: Callable[[List[Dict[str, Any]]], None],
+                 flush_interval_ms: int = 50, max_batch: int = 256,
+                 queue_size: int = 10000, enqueue_timeout: float = 5.0,
+                 max_attempts: int = 3):
+        self._write_batch = write_batch
+        self.flush_interval = max(flush_interval_ms, 1) / 1000.0
+        self.max_batch = max(max_batch, 1)
+        self.enqueue_timeout = enqueue_timeout
+        self.max_attempts = max_attempts
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(queue_size, 1))
+
+        # Overlay of queued-but-uncommitted records, keyed by user_id
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+
+        self._closing = threading.Event()
+        self._stats = {"enqueued": 0, "committed": 0, "batches": 0, "dropped": 0, "inline_writes": 0}
+        self._thread = threading.Thread(target=self._run, name="interaction-writer", daemon=True)
+        self._thread.start()
+
+    # Producer side
+    def submit(self, record: Dict[str, Any]) -> None:
+        """Queue a record for writing. Falls back to a synchronous write if the queue stays full."""
+        if self._closing.is_set():
+            self._write_inline([record])
+            return
+
+        record.setdefault("_rowid", None)
+        with self._lock:
+            self._pending.setdefault(record["user_id"], []).append(record)
+            self._pending_count += 1
+            self._stats["enqueued"] += 1
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+        except queue.Full:
+            logger.warning("Interaction write queue full; writing inline")
+            self._release([record])
+            self._write_inline([record])
+
+    def pending_for(self, user_id: str) -> List[Dict[str, Any]]:
+        """Snapshot of records for `user_id` that may not be committed yet."""
+        with self._lock:
+            return list(self._pending.get(user_id, ()))
+
+    def pending_generation(self, generation_id: str) -> Optional[Dict[str, Any]]:
+        """Find a queued record whose response carries `generation_id`."""
+        with self._lock:
+            for records in self._pending.values():
+                for record in reversed(records):
+                    if record.get("generation_id") == generation_id:
+                        return record
+        return None
+
+    # Lifecycle
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued record is committed. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._drained:
+            while self._pending_count > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                if not self._thread.is_alive():
+                    return False
+                self._drained.wait(remaining if remaining is not None else 0.5)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Flush outstanding records and stop the writer thread."""
+        if self._closing.is_set():
+            return
+        self.flush(timeout)
+        self._closing.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending_count
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
+
+    # Writer side
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._closing.is_set():
+                    return
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        batch.append(self._queue.get_nowait())
+                    else:
+                        batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._commit(batch)
+
+    def _commit(self, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self._write_batch(batch)
+                with self._lock:
+                    self._stats["committed"] += len(batch)
+                    self._stats["batches"] += 1
+                break
+            except Exception:
+                for record in batch:
+                    record["_rowid"] = None
+                if attempt == self.max_attempts:
+                    logger.exception(f"Dropping {len(batch)} interactions after {attempt} failed write attempts")
+                    with self._lock:
+                        self._stats["dropped"] += len(batch)
+                    break
+                logger.warning(f"Interaction batch write failed (attempt {attempt}); retrying", exc_info=True)
+                time.sleep(0.1 * attempt)
+        self._release(batch)
+
+    def _write_inline(self, records: List[Dict[str, Any]]) -> None:
+        self._write_batch(records)
+        with self._lock:
+            self._stats["inline_writes"] += len(records)
+
+    def _release(self, records: List[Dict[str, Any]]) -> None:
+        """Drop committed (or abandoned) records from the overlay."""
+        with self._drained:
+            for record in records:
+                user_records = self._pending.get(record["user_id"])
+                if user_records is None:
+                    continue
+                index = next((i for i, r in enumerate(user_records) if r is record), None)
+                if index is None:
+                    continue
+                del user_records[index]
+                self._pending_count -= 1
+                if not user_records:
+                    del self._pending[record["user_id"]]
+            self._drained.notify_all()
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List
+from ..utils.executor import run_sync
 
 
 class BaseModule(ABC):
@@ -15,6 +16,14 @@ class BaseModule(ABC):
         """Process incoming data and return a plain result dict."""
         raise NotImplementedError()
 
+    async def aprocess(self, data: Dict[str, Any], context: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of `process`; runs the sync implementation on the bounded executor."""
+        return await run_sync(self.process, data, context)
+
     def metadata(self) -> Dict[str, Any]:
-        """Optional module metadata. Modules may override to provide name/version."""
+        """Optional module metadata. Modules may override to provide name/version.
+
+        A ``context_needs`` entry (e.g. ``{"context": 0}``) tells the gateway
+        which stages to skip; it may also be set in the module's config.json.
+        """
         return {}
@@ -5,12 +5,23 @@ Stabilized, versioned, and schema-aware client used as the canonical CreatorCore
 """
 from __future__ import annotations
 
+import asyncio
+import random
 import requests
+import requests.adapters
+import threading
 import time
 from typing import Dict, Any, Optional
 from enum import Enum
 import logging
 
+import httpx
+
+from config.config import CREATORCORE_BASE_URL, BRIDGE_MAX_CONNECTIONS, BRIDGE_MAX_KEEPALIVE_CONNECTIONS, BRIDGE_KEEPALIVE_EXPIRY_S
+from .circuit_breaker import get_breaker
+from .event_loop import get_background_loop, on_background_loop
+from .metrics import upstream_call
+
 VERSION = "1.0.0"
 
 
@@ -21,29 +32,131 @@ class ErrorType(Enum):
     UNEXPECTED = "unexpected"
 
 
-class BridgeClient:
+class _BridgeBase:
+    """Settings, breaker handling and response classification shared by the sync and async clients.
+
+    The transport-specific `_make_request` of each client only sends the
+    request and maps its library's exceptions onto these helpers, so both
+    clients log, classify and trip the breaker identically.
+    """
+
+    def __init__(self, base_url: str = CREATORCORE_BASE_URL, timeout: int = 5):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.client_version = VERSION
+        self.logger = logging.getLogger(__name__)
+        self.breaker = get_breaker("creatorcore")
+
+    @staticmethod
+    def _extra(method: str, endpoint: str, start_time: float, **fields) -> Dict[str, Any]:
+        return {"dependency": "creatorcore", "method": method, "endpoint": endpoint,
+                "latency_ms": round((time.time() - start_time) * 1000, 2), **fields}
+
+    def _circuit_open(self, method: str, endpoint: str) -> Optional[Dict[str, Any]]:
+        """Fallback to return at once while the breaker is open, else None"""
+        if self.breaker.allow():
+            return None
+        self.logger.warning(f"Dependency call skipped - circuit open: {method} {endpoint}",
+                          extra={"dependency": "creatorcore", "method": method, "endpoint": endpoint,
+                                 "error_type": ErrorType.NETWORK.value, "circuit_state": self.breaker.state})
+        return self._handle_error(ErrorType.NETWORK, "Circuit open: CreatorCore unavailable", endpoint)
+
+    def _answered(self, method: str, endpoint: str, start_time: float, response: Any) -> Dict[str, Any]:
+        """Result of a 2xx response (either library's response object); invalid JSON is classified as unexpected"""
+        # The dependency answered; payload problems below are not availability failures
+        self.breaker.record_success()
+        try:
+            result = response.json()
+        except ValueError as e:
+            self.logger.error(f"Dependency call failed - invalid JSON: {method} {endpoint}",
+                            extra=self._extra(method, endpoint, start_time, error=str(e)))
+            return self._handle_error(ErrorType.UNEXPECTED, f"Invalid JSON response: {str(e)}", endpoint)
+        self.logger.info(f"Dependency call successful: {method} {endpoint}",
+                       extra=self._extra(method, endpoint, start_time, status_code=response.status_code))
+        return result
+
+    def _http_error(self, method: str, endpoint: str, start_time: float,
+                    status: Optional[int], error: Exception) -> Dict[str, Any]:
+        """Fallback for a non-2xx answer; not retried"""
+        # Map client errors to schema issues, not found to logic errors
+        if status == 400:
+            error_type = ErrorType.SCHEMA
+        elif status in [404, 405]:
+            error_type = ErrorType.LOGIC
+        else:
+            error_type = ErrorType.UNEXPECTED
+        self.logger.error(f"Dependency call failed - HTTP error: {method} {endpoint}",
+                        extra=self._extra(method, endpoint, start_time, status_code=status, error_type=error_type.value))
+        # Server-side errors count against availability; client errors mean the service is up
+        if status is not None and status >= 500:
+            self.breaker.record_failure(f"HTTP {status}")
+        else:
+            self.breaker.record_success()
+        return self._handle_error(error_type, str(error), endpoint)
+
+    def _gave_up(self, method: str, endpoint: str, start_time: float, error: Exception,
+                 kind: str) -> Dict[str, Any]:
+        """Fallback once the last attempt failed with a timeout, connection error or unexpected error"""
+        if kind == "timeout":
+            error_type, message = ErrorType.NETWORK, f"Timeout after {self.timeout}s"
+            extra = self._extra(method, endpoint, start_time, error_type=error_type.value, timeout_seconds=self.timeout)
+        else:
+            error_type, message = (ErrorType.NETWORK if kind == "connection error" else ErrorType.UNEXPECTED), str(error)
+            extra = self._extra(method, endpoint, start_time, error_type=error_type.value, error=str(error))
+        self.logger.error(f"Dependency call failed - {kind}: {method} {endpoint}", extra=extra)
+        self.breaker.record_failure(str(error) if kind == "unexpected error" else kind)
+        return self._handle_error(error_type, message, endpoint)
+
+    def _retries_exhausted(self, method: str, endpoint: str, start_time: float, retries: int) -> Dict[str, Any]:
+        self.logger.error(f"Dependency call failed - max retries exceeded: {method} {endpoint}",
+                        extra=self._extra(method, endpoint, start_time, retries=retries))
+        self.breaker.record_failure("max retries exceeded")
+        return self._handle_error(ErrorType.NETWORK, "Max retries exceeded", endpoint)
+
+    def _handle_error(self, error_type: ErrorType, message: str, endpoint: str) -> Dict[str, Any]:
+        """Return a deterministic fallback response with classification."""
+        return {
+            "success": False,
+            "error_type": error_type.value,
+            "error_message": message,
+            "endpoint": endpoint,
+            "fallback_used": True
+        }
+
+
+class BridgeClient(_BridgeBase):
     """HTTP client for CreatorCore backend communication.
 
     This client is intentionally conservative and deterministic:
     - explicit versioning (``VERSION``)
     - retries with exponential backoff for transient network/timeout errors
     - deterministic fallback responses with error classification
+    - a shared circuit breaker that skips straight to the fallback while CreatorCore is down
     - a small contract validation layer for expected responses
+
+    Use `get_bridge_client()` for the process-wide instance, whose session
+    keeps up to ``BRIDGE_MAX_CONNECTIONS`` connections alive across threads.
     """
 
-    def __init__(self, base_url: str = "http://localhost:5002", timeout: int = 5):
-        self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
+    def __init__(self, base_url: str = CREATORCORE_BASE_URL, timeout: int = 5):
+        super().__init__(base_url, timeout)
         self.session = requests.Session()
-        self.client_version = VERSION
-        self.logger = logging.getLogger(__name__)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=BRIDGE_MAX_CONNECTIONS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
+    @upstream_call("creatorcore")
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, retries: int = 3) -> Dict[str, Any]:
         """Make HTTP request with retry logic and deterministic error classification."""
         url = f"{self.base_url}{endpoint}"
         start_time = time.time()
 
+        fallback = self._circuit_open(method, endpoint)
+        if fallback is not None:
+            return fallback
+
         for attempt in range(retries):
+            last = attempt == retries - 1
             try:
                 if method.upper() == 'GET':
                     response = self.session.get(url, timeout=self.timeout)
@@ -51,85 +164,22 @@ class BridgeClient:
                     response = self.session.post(url, json=data, timeout=self.timeout)
                 else:
                     raise ValueError(f"Unsupported method: {method}")
-
                 response.raise_for_status()
-
-                # Expect JSON; if decode fails, classify as unexpected
-                try:
-                    result = response.json()
-                    latency = round((time.time() - start_time) * 1000, 2)
-                    self.logger.info(f"Dependency call successful: {method} {endpoint}",
-                                   extra={"dependency": "creatorcore", "method": method, "endpoint": endpoint,
-                                          "latency_ms": latency, "status_code": response.status_code})
-                    return result
-                except ValueError as e:
-                    latency = round((time.time() - start_time) * 1000, 2)
-                    self.logger.error(f"Dependency call failed - invalid JSON: {method} {endpoint}",
-                                    extra={"dependency": "creatorcore", "method": method, "endpoint": endpoint,
-                                           "latency_ms": latency, "error": str(e)})
-                    return self._handle_error(ErrorType.UNEXPECTED, f"Invalid JSON response: {str(e)}", endpoint)
-
+                return self._answered(method, endpoint, start_time, response)
             except requests.exceptions.ConnectionError as e:
-                error_type = ErrorType.NETWORK
-                if attempt == retries - 1:
-                    latency = round((time.time() - start_time) * 1000, 2)
-                    self.logger.error(f"Dependency call failed - connection error: {method} {endpoint}",
-                                    extra={"dependency": "creatorcore", "method": method, "endpoint": endpoint,
-                                           "latency_ms": latency, "error_type": error_type.value, "error": str(e)})
-                    return self._handle_error(error_type, str(e), endpoint)
-                time.sleep(0.5 * (attempt + 1))  # Exponential backoff
-
+                if last:
+                    return self._gave_up(method, endpoint, start_time, e, "connection error")
             except requests.exceptions.Timeout as e:
-                error_type = ErrorType.NETWORK
-                if attempt == retries - 1:
-                    latency = round((time.time() - start_time) * 1000, 2)
-                    self.logger.error(f"Dependency call failed - timeout: {method} {endpoint}",
-                                    extra={"dependency": "creatorcore", "method": method, "endpoint": endpoint,
-                                           "latency_ms": latency, "error_type": error_type.value, "timeout_seconds": self.timeout})
-                    return self._handle_error(error_type, f"Timeout after {self.timeout}s", endpoint)
-                time.sleep(0.5 * (attempt + 1))
-
+                if last:
+                    return self._gave_up(method, endpoint, start_time, e, "timeout")
             except requests.exceptions.HTTPError as e:
-                # Map client errors to schema issues, not found to logic errors
-                status = getattr(e.response, 'status_code', None)
-                if status == 400:
-                    error_type = ErrorType.SCHEMA
-                elif status in [404, 405]:
-                    error_type = ErrorType.LOGIC
-                else:
-                    error_type = ErrorType.UNEXPECTED
-                latency = round((time.time() - start_time) * 1000, 2)
-                self.logger.error(f"Dependency call failed - HTTP error: {method} {endpoint}",
-                                extra={"dependency": "creatorcore", "method": method, "endpoint": endpoint,
-                                       "latency_ms": latency, "status_code": status, "error_type": error_type.value})
-                return self._handle_error(error_type, str(e), endpoint)
-
+                return self._http_error(method, endpoint, start_time, getattr(e.response, 'status_code', None), e)
             except Exception as e:
-                # Unexpected errors
-                error_type = ErrorType.UNEXPECTED
-                if attempt == retries - 1:
-                    latency = round((time.time() - start_time) * 1000, 2)
-                    self.logger.error(f"Dependency call failed - unexpected error: {method} {endpoint}",
-                                    extra={"dependency": "creatorcore", "method": method, "endpoint": endpoint,
-                                           "latency_ms": latency, "error_type": error_type.value, "error": str(e)})
-                    return self._handle_error(error_type, str(e), endpoint)
-                time.sleep(0.5 * (attempt + 1))
-
-        latency = round((time.time() - start_time) * 1000, 2)
-        self.logger.error(f"Dependency call failed - max retries exceeded: {method} {endpoint}",
-                        extra={"dependency": "creatorcore", "method": method, "endpoint": endpoint,
-                               "latency_ms": latency, "retries": retries})
-        return self._handle_error(ErrorType.NETWORK, "Max retries exceeded", endpoint)
+                if last:
+                    return self._gave_up(method, endpoint, start_time, e, "unexpected error")
+            time.sleep(0.5 * (attempt + 1))  # Exponential backoff
 
-    def _handle_error(self, error_type: ErrorType, message: str, endpoint: str) -> Dict[str, Any]:
-        """Return a deterministic fallback response with classification."""
-        return {
-            "success": False,
-            "error_type": error_type.value,
-            "error_message": message,
-            "endpoint": endpoint,
-            "fallback_used": True
-        }
+        return self._retries_exhausted(method, endpoint, start_time, retries)
 
     # Public API (contract)
     def log(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -166,3 +216,143 @@ class BridgeClient:
             return result.get('status') == 'healthy'
         except Exception:
             return False
+
+
+_default_client: Optional[BridgeClient] = None
+_default_client_lock = threading.Lock()
+_http_client: Optional[httpx.AsyncClient] = None
+_default_async_client: Optional["AsyncBridgeClient"] = None
+_default_async_client_lock = threading.Lock()
+
+
+async def _shared_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP client shared by every AsyncBridgeClient; only used on the background loop."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=BRIDGE_MAX_CONNECTIONS,
+            max_keepalive_connections=BRIDGE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=BRIDGE_KEEPALIVE_EXPIRY_S
+        ))
+    return _http_client
+
+
+class AsyncBridgeClient(_BridgeBase):
+    """Async counterpart of :class:`BridgeClient` with the same contract and error classification.
+
+    Requests go through one pooled ``httpx.AsyncClient`` shared by all instances
+    and run on the shared background event loop, so keep-alive connections are
+    reused across callers. Retries back off with ``asyncio.sleep`` plus jitter
+    instead of blocking a thread.
+    """
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        # Same 0.5s/1.0s schedule as BridgeClient, jittered so concurrent callers spread out
+        return 0.5 * (attempt + 1) * random.uniform(0.5, 1.5)
+
+    @on_background_loop
+    @upstream_call("creatorcore")
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, retries: int = 3) -> Dict[str, Any]:
+        """Make HTTP request with non-blocking retries and deterministic error classification."""
+        url = f"{self.base_url}{endpoint}"
+        start_time = time.time()
+
+        fallback = self._circuit_open(method, endpoint)
+        if fallback is not None:
+            return fallback
+
+        client = await _shared_http_client()
+        for attempt in range(retries):
+            last = attempt == retries - 1
+            try:
+                if method.upper() == 'GET':
+                    response = await client.get(url, timeout=self.timeout)
+                elif method.upper() == 'POST':
+                    response = await client.post(url, json=data, timeout=self.timeout)
+                else:
+                    raise ValueError(f"Unsupported method: {method}")
+                response.raise_for_status()
+                return self._answered(method, endpoint, start_time, response)
+            except httpx.TimeoutException as e:
+                if last:
+                    return self._gave_up(method, endpoint, start_time, e, "timeout")
+            except httpx.TransportError as e:
+                if last:
+                    return self._gave_up(method, endpoint, start_time, e, "connection error")
+            except httpx.HTTPStatusError as e:
+                return self._http_error(method, endpoint, start_time, e.response.status_code, e)
+            except Exception as e:
+                if last:
+                    return self._gave_up(method, endpoint, start_time, e, "unexpected error")
+            await asyncio.sleep(self._backoff(attempt))
+
+        return self._retries_exhausted(method, endpoint, start_time, retries)
+
+    # Public API (contract)
+    async def log(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send structured log to CreatorCore. Returns JSON or fallback."""
+        return await self._make_request('POST', '/core/log', data)
+
+    async def feedback(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send feedback payload to CreatorCore."""
+        return await self._make_request('POST', '/core/feedback', data)
+
+    async def get_context(self, limit: int = 3) -> Dict[str, Any]:
+        """Fetch context data from CreatorCore; returns either list or fallback."""
+        return await self._make_request('GET', f"/core/context?limit={limit}")
+
+    async def generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Request generation from CreatorCore (POST /generate) and return the generator response."""
+        return await self._make_request('POST', '/generate', payload)
+
+    async def history(self, topic: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch generation history (GET /history or /history/<topic>)."""
+        endpoint = f"/history/{topic}" if topic else "/history"
+        return await self._make_request('GET', endpoint)
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Ask CreatorCore for its /system/health; returns JSON status or fallback."""
+        return await self._make_request('GET', '/system/health')
+
+    async def is_healthy(self) -> bool:
+        """Boolean check derived from `health_check()` result."""
+        try:
+            result = await self.health_check()
+            return result.get('status') == 'healthy'
+        except Exception:
+            return False
+
+
+def get_bridge_client() -> BridgeClient:
+    """Return the process-wide BridgeClient for the default CreatorCore URL."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = BridgeClient()
+    return _default_client
+
+
+def get_async_bridge_client() -> AsyncBridgeClient:
+    """Return the process-wide AsyncBridgeClient for the default CreatorCore URL."""
+    global _default_async_client
+    if _default_async_client is None:
+        with _default_async_client_lock:
+            if _default_async_client is None:
+                _default_async_client = AsyncBridgeClient()
+    return _default_async_client
+
+
+@on_background_loop
+async def _close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def close_async_bridge_clients(timeout: Optional[float] = 5.0) -> None:
+    """Close the shared pooled connections (used on application shutdown)."""
+    if _http_client is not None:
+        get_background_loop().run(_close_http_client(), timeout)
@@ -0,0 +1,189 @@
+"""Per-dependency circuit breakers.
+
+A breaker watches the failure rate of calls to one external dependency over a
+rolling time window. Once the rate crosses the threshold it opens and callers
+skip the dependency entirely (returning their deterministic fallback) instead
+of paying for retries and timeouts. After a cool-down it half-opens and lets a
+probe call through: success closes it again, failure re-opens it.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from config.config import (
+    CIRCUIT_BREAKER_ENABLED, CIRCUIT_FAILURE_RATE, CIRCUIT_MIN_CALLS, CIRCUIT_WINDOW_S,
+    CIRCUIT_OPEN_S, CIRCUIT_HALF_OPEN_MAX_CALLS
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised by callers that prefer an exception over a fallback while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker with a rolling failure-rate window."""
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 5, window_s: float = 30.0,
+                 open_s: float = 15.0, half_open_max_calls: int = 1, enabled: bool = True):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = max(min_calls, 1)
+        self.window_s = max(window_s, 1.0)
+        self.open_s = open_s
+        self.half_open_max_calls = max(half_open_max_calls, 1)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # One [second, calls, failures] bucket per second of the window
+        self._buckets: deque = deque()
+        self._state = CLOSED
+        self._opened_at: Optional[float] = None
+        self._probes: deque = deque()
+        self._stats = {"short_circuited": 0, "opened": 0, "last_failure": None}
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window_s
+        while self._buckets and self._buckets[0][0] <= horizon:
+            self._buckets.popleft()
+
+    def _record(self, failed: bool, now: float) -> None:
+        second = int(now)
+        if self._buckets and self._buckets[-1][0] == second:
+            bucket = self._buckets[-1]
+        else:
+            bucket = [second, 0, 0]
+            self._buckets.append(bucket)
+        bucket[1] += 1
+        if failed:
+            bucket[2] += 1
+        self._trim(now)
+
+    def _counts(self):
+        calls = sum(bucket[1] for bucket in self._buckets)
+        failures = sum(bucket[2] for bucket in self._buckets)
+        return calls, failures
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probes.clear()
+        self._stats["opened"] += 1
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_s:
+            self._state = HALF_OPEN
+            self._probes.clear()
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the dependency now. Callers must then record its outcome."""
+        if not self.enabled:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                # Probes that never reported back stop blocking after one cool-down
+                while self._probes and now - self._probes[0] >= self.open_s:
+                    self._probes.popleft()
+                if len(self._probes) < self.half_open_max_calls:
+                    self._probes.append(now)
+                    return True
+            self._stats["short_circuited"] += 1
+            return False
+
+    def record_success(self) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._current_state(now) == HALF_OPEN:
+                # The dependency answered a probe: start over with a clean window
+                self._state = CLOSED
+                self._opened_at = None
+                self._probes.clear()
+                self._buckets.clear()
+            self._record(False, now)
+
+    def record_failure(self, error: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._stats["last_failure"] = error
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._open(now)
+                return
+            self._record(True, now)
+            if state == CLOSED:
+                calls, failures = self._counts()
+                if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                    self._open(now)
+
+    @property
+    def state(self) -> str:
+        if not self.enabled:
+            return "disabled"
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now) if self.enabled else "disabled"
+            self._trim(now)
+            calls, failures = self._counts()
+            retry_after = None
+            if state == OPEN:
+                retry_after = round(max(self.open_s - (now - self._opened_at), 0.0), 3)
+            return {
+                "state": state,
+                "calls": calls,
+                "failures": failures,
+                "failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "retry_after_s": retry_after,
+                **self._stats
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Shared breaker for a dependency, so every client of that dependency sees the same state."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_rate=CIRCUIT_FAILURE_RATE,
+                min_calls=CIRCUIT_MIN_CALLS,
+                window_s=CIRCUIT_WINDOW_S,
+                open_s=CIRCUIT_OPEN_S,
+                half_open_max_calls=CIRCUIT_HALF_OPEN_MAX_CALLS,
+                enabled=CIRCUIT_BREAKER_ENABLED
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    """Current state of every registered breaker"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
+
+
+def breaker_snapshots() -> Dict[str, Dict[str, Any]]:
+    """Detailed statistics of every registered breaker"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,125 @@
+"""Dedicated background event loop for long-lived async clients.
+
+An ``httpx.AsyncClient`` is bound to the event loop it was first used on, so
+calling it through ``asyncio.run`` (a new loop per call) never reuses a pooled
+connection. Clients that should live as long as the process run on this loop
+instead: async code on any other loop awaits ``call(coro)`` and sync code
+blocks on ``run(coro)``. The caller's contextvars are propagated to the loop.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import threading
+from typing import Any, Coroutine, Optional
+
+
+class BackgroundLoop:
+    """An event loop running forever on its own daemon thread, started on first use."""
+
+    def __init__(self, name: str = "background-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def serve():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=serve, name=self.name, daemon=True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule `coro` on the loop and return a thread-safe future for its result."""
+        loop = self._start()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def start():
+            if not future.set_running_or_notify_cancel():
+                coro.close()
+                return
+            # Created inside the copied context, so the task inherits the caller's contextvars
+            task = loop.create_task(coro)
+            task.add_done_callback(functools.partial(_copy_outcome, future))
+
+        loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+        return future
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run `coro` on the loop and block until it finishes (for sync callers)."""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError(f"{self.name}: run() would deadlock when called from the loop thread")
+        return self.submit(coro).result(timeout)
+
+    async def call(self, coro: Coroutine) -> Any:
+        """Await `coro` on the loop from async code running on any event loop."""
+        if self.in_loop_thread():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the loop and join its thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+
+def _copy_outcome(future: concurrent.futures.Future, task: "asyncio.Task") -> None:
+    if task.cancelled():
+        future.set_exception(concurrent.futures.CancelledError())
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+_background_loop: Optional[BackgroundLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Return the shared background loop, creating it on first use."""
+    global _background_loop
+    if _background_loop is None:
+        with _background_loop_lock:
+            if _background_loop is None:
+                _background_loop = BackgroundLoop("client-loop")
+    return _background_loop
+
+
+def on_background_loop(method):
+    """Decorator: run an async method on the shared background loop, whatever loop awaits it."""
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs) -> Any:
+        return await get_background_loop().call(method(*args, **kwargs))
+    return wrapper
+
+
+def shutdown_background_loop(timeout: Optional[float] = 5.0) -> None:
+    """Stop the shared background loop (used on application shutdown)."""
+    global _background_loop
+    with _background_loop_lock:
+        loop, _background_loop = _background_loop, None
+    if loop is not None:
+        loop.close(timeout)
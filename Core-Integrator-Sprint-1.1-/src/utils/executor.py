@@ -0,0 +1,49 @@
+"""Bounded executor used by async code paths to run blocking (sync) work.
+
+Sync agents, modules and memory adapters are executed here so that they never
+block the FastAPI event loop. The pool size is capped by
+``SYNC_EXECUTOR_MAX_WORKERS``.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from config.config import SYNC_EXECUTOR_MAX_WORKERS
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared bounded executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=SYNC_EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix="sync-worker"
+                )
+    return _executor
+
+
+async def run_sync(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on the shared executor and await its result.
+
+    The caller's contextvars are propagated into the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(ctx.run, func, *args, **kwargs))
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Shut down the shared executor (used on application shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
@@ -0,0 +1,101 @@
+"""Background dependency health monitor behind `/system/health`.
+
+Probing dependencies inside the health endpoint made every Kubernetes probe
+a fan-out of network calls (and could hang on a slow dependency). Instead,
+the monitor runs all probes concurrently on the shared background loop every
+``HEALTH_CHECK_INTERVAL_S``, each bounded by ``HEALTH_CHECK_TIMEOUT_S``, and
+keeps the latest result per dependency; the endpoint only reads that cache.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .event_loop import get_background_loop
+
+logger = logging.getLogger(__name__)
+
+# A probe returns "up", "down" or "disabled"; raising or timing out counts as "down"
+Probe = Callable[[], Awaitable[str]]
+
+
+class HealthMonitor:
+    """Runs dependency probes on an interval and caches their latest results"""
+
+    def __init__(self, probes: Dict[str, Probe], interval_s: float = 10.0, timeout_s: float = 3.0):
+        self.probes = dict(probes)
+        self.interval_s = max(interval_s, 0.1)
+        self.timeout_s = timeout_s
+        self._lock = threading.Lock()
+        # dependency -> {"status", "checked_at", "latency_ms", "error"?}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._first_pass: Optional[concurrent.futures.Future] = None
+        self._passes = 0
+
+    def start(self) -> concurrent.futures.Future:
+        """Start probing in the background; the returned future resolves after the first pass"""
+        with self._lock:
+            if self._first_pass is None:
+                self._first_pass = concurrent.futures.Future()
+                get_background_loop().submit(self._run(self._first_pass))
+            return self._first_pass
+
+    async def _run(self, first_pass: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._task = asyncio.current_task()
+        while True:
+            try:
+                await self.probe_all()
+            except Exception:
+                logger.exception("Health probe pass failed")
+            if not first_pass.done():
+                first_pass.set_result(None)
+            await asyncio.sleep(self.interval_s)
+
+    async def probe_all(self) -> None:
+        """Run every probe concurrently once and record the results"""
+        await asyncio.gather(*(self._probe(name, probe) for name, probe in self.probes.items()))
+        with self._lock:
+            self._passes += 1
+
+    async def _probe(self, name: str, probe: Probe) -> None:
+        start = time.perf_counter()
+        error = None
+        try:
+            status = await asyncio.wait_for(probe(), self.timeout_s)
+        except asyncio.TimeoutError:
+            status, error = "down", f"timed out after {self.timeout_s}s"
+        except Exception as e:
+            status, error = "down", str(e)
+        result = {
+            "status": status,
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        if error:
+            result["error"] = error
+        with self._lock:
+            self._results[name] = result
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Latest cached result per dependency; "unknown" until its first probe finishes"""
+        with self._lock:
+            return {
+                name: dict(self._results.get(name) or {"status": "unknown", "checked_at": None, "latency_ms": None})
+                for name in self.probes
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"passes": self._passes, "interval_s": self.interval_s, "running": self._task is not None}
+
+    def close(self) -> None:
+        """Stop probing (used on application shutdown, before the background loop stops)"""
+        with self._lock:
+            task, self._task = self._task, None
+        if task is not None:
+            task.get_loop().call_soon_threadsafe(task.cancel)
@@ -23,6 +23,8 @@ class JSONFormatter(logging.Formatter):
             log_entry['request_data'] = record.request_data
         if hasattr(record, 'response_data'):
             log_entry['response_data'] = record.response_data
+        if hasattr(record, 'timings'):
+            log_entry['timings'] = record.timings
             
         return json.dumps(log_entry)
 
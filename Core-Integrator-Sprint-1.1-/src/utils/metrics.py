@@ -0,0 +1,298 @@
+"""Prometheus-format metrics served at ``/metrics``.
+
+A small in-process registry (no client library dependency) with counters,
+gauges and histograms. Each labelled series is created once and then
+updated in place under its own lock, so recording never allocates and never
+contends on a registry-wide lock; hot paths bind their series up front with
+`labels()`. Histograms keep per-bucket counts and are made cumulative only
+when `/metrics` is rendered.
+
+Each metric keeps at most ``_MAX_SERIES`` label combinations; further ones
+are folded into a single series labelled ``other``.
+"""
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+
+from .timing import span
+
+# Upper bound on label combinations per metric
+_MAX_SERIES = 1000
+
+# Request-level latencies, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# SQLite reads and writes, in seconds
+STORAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Value:
+    """One counter or gauge series"""
+
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramValue:
+    """One histogram series: per-bucket counts (the last bucket is +Inf), sum and count"""
+
+    __slots__ = ("_lock", "_upper", "counts", "sum", "count")
+
+    def __init__(self, upper: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._upper = upper
+        self.counts = [0] * (len(upper) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._upper, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new(self):
+        raise NotImplementedError()
+
+    def labels(self, *values: Any):
+        """The series for these label values (created on first use)"""
+        key = tuple(str(value) for value in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                if key not in self._series and len(self._series) >= _MAX_SERIES:
+                    key = ("other",) * len(self.labelnames)
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = self._new()
+        return series
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in list(self._series.items()):
+            lines.extend(self._lines(key, series))
+        return lines
+
+    def _lines(self, key: Tuple[str, ...], series: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(series.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new(self):
+        return _Value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new(self):
+        return _Value()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new(self):
+        return _HistogramValue(self.buckets)
+
+    def _lines(self, key: Tuple[str, ...], series: _HistogramValue) -> List[str]:
+        counts, total, count = series.snapshot()
+        lines = []
+        cumulative = 0
+        for upper, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(upper)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CORE_REQUESTS = REGISTRY.register(Counter(
+    "core_requests_total", "Gateway requests by module, intent and response status",
+    ("module", "intent", "status")
+))
+CORE_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "core_request_duration_seconds", "Gateway request latency by module, intent and response status",
+    ("module", "intent", "status")
+))
+CORE_IN_FLIGHT = REGISTRY.register(Gauge(
+    "core_requests_in_flight", "Gateway requests currently being processed, by module", ("module",)
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge("http_requests_in_flight", "HTTP requests currently being served"))
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "upstream_requests_total", "Dependency calls by dependency and outcome", ("dependency", "outcome")
+))
+UPSTREAM_SECONDS = REGISTRY.register(Histogram(
+    "upstream_request_duration_seconds", "Dependency call latency by dependency and outcome",
+    ("dependency", "outcome")
+))
+SQLITE_SECONDS = REGISTRY.register(Histogram(
+    "sqlite_operation_duration_seconds", "Interaction store read and write latency", ("operation",),
+    buckets=STORAGE_BUCKETS
+))
+RATE_LIMIT_REJECTIONS = REGISTRY.register(Counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter, by scope", ("scope",)
+))
+
+# Series bound up front for the hottest call sites
+HTTP_IN_FLIGHT_SERIES = HTTP_IN_FLIGHT.labels()
+SQLITE_READ_SECONDS = SQLITE_SECONDS.labels("read")
+SQLITE_WRITE_SECONDS = SQLITE_SECONDS.labels("write")
+
+# Set by a client during a failed call whose fallback response does not say it failed
+_upstream_error: ContextVar[Optional[str]] = ContextVar("upstream_error", default=None)
+
+
+def mark_upstream_error(error_type: str) -> None:
+    """Record that the current dependency call failed (for clients that return a silent fallback)"""
+    _upstream_error.set(error_type)
+
+
+def _outcome(result: Any) -> str:
+    error = _upstream_error.get()
+    if error:
+        return error
+    if isinstance(result, dict) and result.get("success") is False:
+        return str(result.get("error_type") or "error")
+    return "success"
+
+
+def upstream_call(dependency: str) -> Callable:
+    """Decorator for dependency calls: a ``upstream.<dependency>`` span plus latency/outcome metrics.
+
+    Apply it innermost (below `on_background_loop`) so it runs in the same
+    task as the client's own error handling.
+    """
+    span_name = f"upstream.{dependency}"
+
+    def observe(started: float, outcome: str) -> None:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_REQUESTS.labels(dependency, outcome).inc()
+        UPSTREAM_SECONDS.labels(dependency, outcome).observe(elapsed)
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                token = _upstream_error.set(None)
+                started, outcome = time.perf_counter(), "exception"
+                try:
+                    with span(span_name):
+                        result = await func(*args, **kwargs)
+                    outcome = _outcome(result)
+                    return result
+                finally:
+                    observe(started, outcome)
+                    _upstream_error.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = _upstream_error.set(None)
+            started, outcome = time.perf_counter(), "exception"
+            try:
+                with span(span_name):
+                    result = func(*args, **kwargs)
+                outcome = _outcome(result)
+                return result
+            finally:
+                observe(started, outcome)
+                _upstream_error.reset(token)
+        return wrapper
+    return decorator
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Track HTTP requests in flight"""
+    HTTP_IN_FLIGHT_SERIES.inc()
+    try:
+        return await call_next(request)
+    finally:
+        HTTP_IN_FLIGHT_SERIES.dec()
+
@@ -1,7 +1,14 @@
 import httpx
 import asyncio
+import threading
 from typing import Optional, Dict, Any
-from config.config import NOOPUR_BASE_URL, NOOPUR_API_KEY, INTEGRATOR_USE_NOOPUR
+from config.config import (
+    NOOPUR_BASE_URL, NOOPUR_API_KEY, INTEGRATOR_USE_NOOPUR,
+    NOOPUR_MAX_CONNECTIONS, NOOPUR_MAX_KEEPALIVE_CONNECTIONS, NOOPUR_KEEPALIVE_EXPIRY_S
+)
+from .event_loop import get_background_loop, on_background_loop
+from .metrics import mark_upstream_error, upstream_call
+from .circuit_breaker import get_breaker, CircuitOpenError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +21,11 @@ class NoopurClient:
       - generate (POST /generate) returns related_context
       - feedback (POST /feedback)
       - history (GET /history or /history/<topic>)
+
+    All requests run on the shared background event loop, so the pooled
+    httpx client is reused no matter which loop (or thread) the caller is on.
+    While the shared "noopur" circuit breaker is open, calls return their
+    fallback immediately.
     """
 
     def __init__(self, base_url: str = NOOPUR_BASE_URL, api_key: Optional[str] = NOOPUR_API_KEY, timeout: int = 30):
@@ -21,6 +33,15 @@ class NoopurClient:
         self.api_key = api_key
         self.timeout = timeout
         self._client = None
+        self.breaker = get_breaker("noopur")
+
+    def _record_error(self, error: Exception) -> None:
+        """Count a failed call against the breaker unless Noopur answered with a client error"""
+        mark_upstream_error(type(error).__name__)
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code < 500:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure(type(error).__name__)
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create async HTTP client."""
@@ -31,33 +52,47 @@ class NoopurClient:
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
                 headers=headers,
-                timeout=self.timeout
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=NOOPUR_MAX_CONNECTIONS,
+                    max_keepalive_connections=NOOPUR_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=NOOPUR_KEEPALIVE_EXPIRY_S
+                )
             )
         return self._client
 
+    @on_background_loop
     async def close(self):
         """Close the HTTP client."""
         if self._client:
             await self._client.aclose()
             self._client = None
 
+    @on_background_loop
+    @upstream_call("noopur")
     async def generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Generate content with related context."""
         if not INTEGRATOR_USE_NOOPUR:
             return {"related_context": []}
 
+        if not self.breaker.allow():
+            mark_upstream_error("circuit_open")
+            return {"related_context": []}
+
         try:
             client = await self._get_client()
             response = await client.post("/generate", json=payload)
             response.raise_for_status()
             result = response.json()
+            self.breaker.record_success()
             logger.info("Noopur generate successful", extra={
                 "dependency": "noopur",
                 "endpoint": "/generate",
                 "latency_ms": response.elapsed.total_seconds() * 1000 if response.elapsed else None
             })
             return result
-        except httpx.TimeoutException:
+        except httpx.TimeoutException as e:
+            self._record_error(e)
             logger.error("Noopur generate timeout", extra={
                 "dependency": "noopur",
                 "endpoint": "/generate",
@@ -66,6 +101,7 @@ class NoopurClient:
             })
             return {"related_context": []}
         except httpx.HTTPStatusError as e:
+            self._record_error(e)
             logger.error("Noopur generate HTTP error", extra={
                 "dependency": "noopur",
                 "endpoint": "/generate",
@@ -74,6 +110,7 @@ class NoopurClient:
             })
             return {"related_context": []}
         except Exception as e:
+            self._record_error(e)
             logger.error("Noopur generate failed", extra={
                 "dependency": "noopur",
                 "endpoint": "/generate",
@@ -82,23 +119,31 @@ class NoopurClient:
             })
             return {"related_context": []}
 
+    @on_background_loop
+    @upstream_call("noopur")
     async def feedback(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Submit feedback to Noopur."""
         if not INTEGRATOR_USE_NOOPUR:
             return {"status": "disabled"}
 
+        if not self.breaker.allow():
+            mark_upstream_error("circuit_open")
+            return {"status": "error"}
+
         try:
             client = await self._get_client()
             response = await client.post("/feedback", json=payload)
             response.raise_for_status()
             result = response.json()
+            self.breaker.record_success()
             logger.info("Noopur feedback successful", extra={
                 "dependency": "noopur",
                 "endpoint": "/feedback",
                 "latency_ms": response.elapsed.total_seconds() * 1000 if response.elapsed else None
             })
             return result
-        except httpx.TimeoutException:
+        except httpx.TimeoutException as e:
+            self._record_error(e)
             logger.error("Noopur feedback timeout", extra={
                 "dependency": "noopur",
                 "endpoint": "/feedback",
@@ -106,6 +151,7 @@ class NoopurClient:
             })
             return {"status": "timeout"}
         except httpx.HTTPStatusError as e:
+            self._record_error(e)
             logger.error("Noopur feedback HTTP error", extra={
                 "dependency": "noopur",
                 "endpoint": "/feedback",
@@ -114,6 +160,7 @@ class NoopurClient:
             })
             return {"status": "error"}
         except Exception as e:
+            self._record_error(e)
             logger.error("Noopur feedback failed", extra={
                 "dependency": "noopur",
                 "endpoint": "/feedback",
@@ -122,24 +169,32 @@ class NoopurClient:
             })
             return {"status": "error"}
 
+    @on_background_loop
+    @upstream_call("noopur")
     async def history(self, topic: Optional[str] = None) -> Dict[str, Any]:
         """Fetch generation history from Noopur."""
         if not INTEGRATOR_USE_NOOPUR:
             return []
 
+        endpoint = f"/history/{topic}" if topic else "/history"
+        if not self.breaker.allow():
+            mark_upstream_error("circuit_open")
+            return []
+
         try:
             client = await self._get_client()
-            endpoint = f"/history/{topic}" if topic else "/history"
             response = await client.get(endpoint)
             response.raise_for_status()
             result = response.json()
+            self.breaker.record_success()
             logger.info("Noopur history successful", extra={
                 "dependency": "noopur",
                 "endpoint": endpoint,
                 "latency_ms": response.elapsed.total_seconds() * 1000 if response.elapsed else None
             })
             return result
-        except httpx.TimeoutException:
+        except httpx.TimeoutException as e:
+            self._record_error(e)
             logger.error("Noopur history timeout", extra={
                 "dependency": "noopur",
                 "endpoint": endpoint,
@@ -147,6 +202,7 @@ class NoopurClient:
             })
             return []
         except httpx.HTTPStatusError as e:
+            self._record_error(e)
             logger.error("Noopur history HTTP error", extra={
                 "dependency": "noopur",
                 "endpoint": endpoint,
@@ -155,6 +211,7 @@ class NoopurClient:
             })
             return []
         except Exception as e:
+            self._record_error(e)
             logger.error("Noopur history failed", extra={
                 "dependency": "noopur",
                 "endpoint": endpoint,
@@ -163,6 +220,24 @@ class NoopurClient:
             })
             return []
 
+    @on_background_loop
+    @upstream_call("noopur")
+    async def post_event(self, endpoint: str, payload: Dict[str, Any]) -> int:
+        """POST a queued outbox event. Unlike the helpers above, errors are raised so the event can be retried."""
+        if not self.breaker.allow():
+            mark_upstream_error("circuit_open")
+            raise CircuitOpenError("Noopur circuit open")
+        try:
+            client = await self._get_client()
+            response = await client.post(endpoint, json=payload)
+            response.raise_for_status()
+        except Exception as e:
+            self._record_error(e)
+            raise
+        self.breaker.record_success()
+        return response.status_code
+
+    @on_background_loop
     async def health_check(self) -> str:
         """Check Noopur service health. Returns 'up', 'down', or 'disabled'."""
         if not INTEGRATOR_USE_NOOPUR:
@@ -177,3 +252,26 @@ class NoopurClient:
                 return "down"
         except Exception:
             return "down"
+
+
+_shared_client: Optional[NoopurClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_noopur_client() -> NoopurClient:
+    """Return the process-wide pooled Noopur client, creating it on first use."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = NoopurClient()
+    return _shared_client
+
+
+def close_noopur_client(timeout: Optional[float] = 5.0) -> None:
+    """Close the shared client's connections (used on application shutdown)."""
+    global _shared_client
+    with _shared_client_lock:
+        client, _shared_client = _shared_client, None
+    if client is not None:
+        get_background_loop().run(client.close(), timeout)
@@ -0,0 +1,164 @@
+"""Related-context cache for CreatorRouter prewarming.
+
+Many users ask about the same topics, so the ``related_context`` of Noopur's
+``/generate`` response is cached per (topic, goal, type). The generation itself
+(``generated_text`` and ``generation_id``) belongs to the request that made it
+and goes back only to that caller; cache hits and coalesced waiters get the
+response without it.
+
+- fresh entries (younger than ``RELATED_CONTEXT_TTL_S``) are returned at once;
+- stale entries (up to ``RELATED_CONTEXT_STALE_S`` past the TTL) are still
+  returned at once while a background refresh replaces them;
+- popular keys (at least ``RELATED_CONTEXT_REFRESH_MIN_HITS`` hits since the
+  last load) are refreshed ahead of expiry, so they never go stale;
+- concurrent misses for the same key share one upstream call.
+
+Loads and refreshes run on the shared background loop, so the cache can be
+used from the FastAPI loop and from sync callers alike.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from config.config import (
+    RELATED_CONTEXT_CACHE_ENABLED, RELATED_CONTEXT_TTL_S, RELATED_CONTEXT_STALE_S,
+    RELATED_CONTEXT_MAX_KEYS, RELATED_CONTEXT_REFRESH_MIN_HITS
+)
+from .event_loop import get_background_loop
+
+logger = logging.getLogger(__name__)
+
+# Popular keys are refreshed once they are this far into their TTL
+_REFRESH_AHEAD = 0.8
+
+Loader = Callable[[], Awaitable[Dict[str, Any]]]
+
+# Fields of a Noopur response that belong to the caller that made it, never shared
+_PER_CALL_FIELDS = ("generated_text", "generation_id")
+
+
+def _shareable(resp: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in resp.items() if k not in _PER_CALL_FIELDS}
+
+
+def _cacheable(resp: Any) -> bool:
+    """Skip Noopur's degraded answers (no related context) so they are retried next time"""
+    return isinstance(resp, dict) and bool(resp.get("related_context"))
+
+
+class RelatedContextCache:
+    """In-process TTL cache with stale-while-revalidate and refresh-ahead for popular keys"""
+
+    def __init__(self, ttl_s: float = 300.0, stale_s: float = 600.0, max_keys: int = 1000,
+                 refresh_min_hits: int = 3):
+        self.ttl_s = ttl_s
+        self.stale_s = stale_s
+        self.max_keys = max(max_keys, 1)
+        self.refresh_min_hits = max(refresh_min_hits, 1)
+        self._lock = threading.Lock()
+        # key -> {"value", "loaded_at", "hits"}
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        # key -> future of the load in progress (misses and refreshes share it)
+        self._loading: Dict[Hashable, concurrent.futures.Future] = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                       "refreshes": 0, "refresh_failures": 0}
+
+    async def get(self, key: Hashable, loader: Loader) -> Tuple[Dict[str, Any], int]:
+        """Return (value, upstream_calls); upstream_calls is 1 only for the call that started the load.
+
+        Only that call gets the full response; everyone else gets it without
+        the generation fields.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry["loaded_at"] if entry else None
+            if entry is not None and age < self.ttl_s + self.stale_s:
+                self._entries.move_to_end(key)
+                entry["hits"] += 1
+                if age >= self.ttl_s:
+                    self._stats["stale_hits"] += 1
+                    self._load(key, loader, refresh=True)
+                else:
+                    self._stats["hits"] += 1
+                    if age >= self.ttl_s * _REFRESH_AHEAD and entry["hits"] >= self.refresh_min_hits:
+                        self._load(key, loader, refresh=True)
+                return entry["value"], 0
+            self._stats["misses"] += 1
+            started = key not in self._loading
+            if not started:
+                self._stats["coalesced"] += 1
+            future = self._load(key, loader)
+        value = await asyncio.wrap_future(future)
+        if not started and isinstance(value, dict):
+            value = _shareable(value)
+        return value, int(started)
+
+    def _load(self, key: Hashable, loader: Loader, refresh: bool = False) -> concurrent.futures.Future:
+        """Start loading `key` on the background loop unless a load is already running (caller holds the lock)"""
+        future = self._loading.get(key)
+        if future is not None:
+            return future
+        if refresh:
+            self._stats["refreshes"] += 1
+        future = get_background_loop().submit(self._fetch(key, loader, refresh))
+        self._loading[key] = future
+        return future
+
+    async def _fetch(self, key: Hashable, loader: Loader, refresh: bool) -> Dict[str, Any]:
+        try:
+            value = await loader()
+        except Exception:
+            with self._lock:
+                self._loading.pop(key, None)
+                if refresh:
+                    self._stats["refresh_failures"] += 1
+            if refresh:
+                logger.warning(f"Related-context refresh failed for {key!r}; keeping the cached value")
+            raise
+        with self._lock:
+            self._loading.pop(key, None)
+            if _cacheable(value):
+                self._entries[key] = {"value": _shareable(value), "loaded_at": time.monotonic(), "hits": 0}
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+            elif refresh:
+                self._stats["refresh_failures"] += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"keys": len(self._entries), "loading": len(self._loading), **self._stats}
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else None
+        return stats
+
+
+_cache: Optional[RelatedContextCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_related_context_cache() -> Optional[RelatedContextCache]:
+    """Return the shared related-context cache (None when RELATED_CONTEXT_CACHE_ENABLED is off)."""
+    global _cache
+    if not RELATED_CONTEXT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RelatedContextCache(
+                    ttl_s=RELATED_CONTEXT_TTL_S,
+                    stale_s=RELATED_CONTEXT_STALE_S,
+                    max_keys=RELATED_CONTEXT_MAX_KEYS,
+                    refresh_min_hits=RELATED_CONTEXT_REFRESH_MIN_HITS
+                )
+    return _cache
+
+
+def related_context_stats() -> Optional[Dict[str, Any]]:
+    return _cache.stats() if _cache is not None else None
@@ -12,6 +12,8 @@ from typing import Dict, Any, Optional
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 import logging
+from .timing import span
+from .metrics import RATE_LIMIT_REJECTIONS
 
 # Security logger
 security_logger = logging.getLogger("security")
@@ -52,6 +54,7 @@ class SecurityHardening:
         
         if recent_ip_requests > 60:
             security_logger.warning(f"Rate limit exceeded for IP: {client_ip}")
+            RATE_LIMIT_REJECTIONS.labels("ip").inc()
             return False
             
         # User-based rate limiting (30 requests per minute)
@@ -62,6 +65,7 @@ class SecurityHardening:
             
             if recent_user_requests > 30:
                 security_logger.warning(f"Rate limit exceeded for user: {user_id[:8]}...")
+                RATE_LIMIT_REJECTIONS.labels("user").inc()
                 return False
                 
         return True
@@ -80,6 +84,7 @@ class SecurityHardening:
             
             # Block after repeated enumeration attempts
             if self.enumeration_attempts[client_ip] > 3:
+                RATE_LIMIT_REJECTIONS.labels("enumeration").inc()
                 return False
                 
         return True
@@ -126,7 +131,9 @@ async def security_middleware(request: Request, call_next):
     """Security middleware for all requests"""
     try:
         # Apply security checks
-        if not security.check_rate_limits(request):
+        with span("security"):
+            allowed = security.check_rate_limits(request)
+        if not allowed:
             return JSONResponse(
                 status_code=429,
                 content={"error": "Rate limit exceeded"}
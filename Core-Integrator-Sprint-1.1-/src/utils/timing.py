@@ -0,0 +1,107 @@
+"""Per-request span recorder behind the ``Server-Timing`` header.
+
+`server_timing_middleware` starts a `SpanRecorder` for each HTTP request and
+stores it in a context variable, so any code running for that request (the
+gateway, agents, upstream clients on the executor or the background loop)
+can time itself with `span(name)` without passing the recorder around
+(dependency calls do so through `metrics.upstream_call`). Outside a request
+it is a no-op.
+
+A span costs two ``perf_counter`` calls and one list append, so recording is
+left on in production; set ``SERVER_TIMING_ENABLED=false`` to drop the header
+and the timing log line altogether.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from config.config import SERVER_TIMING_ENABLED
+from .logger import setup_logger
+
+_recorder: ContextVar[Optional["SpanRecorder"]] = ContextVar("span_recorder", default=None)
+
+timing_logger = setup_logger("request_timing")
+
+
+class SpanRecorder:
+    """Durations of the named spans of one request; repeated names are summed"""
+
+    __slots__ = ("started_at", "_spans")
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        # (name, milliseconds); list.append is atomic, spans may come from worker threads
+        self._spans: List[Tuple[str, float]] = []
+
+    def add(self, name: str, ms: float) -> None:
+        self._spans.append((name, ms))
+
+    def totals(self) -> Dict[str, float]:
+        """Milliseconds per span name, in order of first occurrence (concurrent spans add up)"""
+        totals: Dict[str, float] = {}
+        for name, ms in list(self._spans):
+            totals[name] = totals.get(name, 0.0) + ms
+        return totals
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value, e.g. ``context;dur=0.41, agent;dur=12.03, total;dur=13.90``"""
+        parts = [f"{name};dur={ms:.2f}" for name, ms in self.totals().items()]
+        parts.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(parts)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "stages_ms": {name: round(ms, 3) for name, ms in self.totals().items()},
+            "total_ms": round(self.total_ms(), 3)
+        }
+
+
+def current_recorder() -> Optional[SpanRecorder]:
+    return _recorder.get()
+
+
+class span:
+    """Time the enclosed block into the current request's recorder, if any.
+
+    A class rather than a generator-based context manager: this sits on every
+    stage of every request, so it avoids the generator overhead.
+    """
+
+    __slots__ = ("name", "recorder", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.recorder = _recorder.get()
+        if self.recorder is not None:
+            self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        if self.recorder is not None:
+            self.recorder.add(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+async def server_timing_middleware(request: Request, call_next):
+    """Record spans for the request, return them as ``Server-Timing`` and log them"""
+    if not SERVER_TIMING_ENABLED:
+        return await call_next(request)
+    recorder = SpanRecorder()
+    token = _recorder.set(recorder)
+    try:
+        response = await call_next(request)
+    finally:
+        _recorder.reset(token)
+    response.headers["Server-Timing"] = recorder.server_timing()
+    if timing_logger.isEnabledFor(logging.INFO):
+        timing_logger.info(
+            f"{request.method} {request.url.path} {response.status_code}",
+            extra={"timings": recorder.summary()}
+        )
+    return response
@@ -4,6 +4,9 @@ import logging
 import time
 import os
 
+from .circuit_breaker import get_breaker
+from .metrics import upstream_call
+
 
 class VideoBridgeClient:
     """Client for text-to-video service integration"""
@@ -16,7 +19,18 @@ class VideoBridgeClient:
         self.logger = logging.getLogger(__name__)
         self.timeout = int(os.getenv("VIDEO_SERVICE_TIMEOUT", "300"))
         self.max_retries = 3
+        # Shared per-dependency breaker: while open, calls return the fallback without waiting on timeouts
+        self.breaker = get_breaker("video_service")
+
+    def _record_error(self, error: Exception) -> None:
+        """Count an exception against the breaker unless the service clearly answered (4xx)"""
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if status is not None and status < 500:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure(str(error))
     
+    @upstream_call("video")
     def generate_video(self, text: str, **kwargs) -> Dict[str, Any]:
         """Generate video from text"""
         start_time = time.time()
@@ -41,6 +55,18 @@ class VideoBridgeClient:
                 "language": kwargs.get("language", "en")
             }
             
+            if not self.breaker.allow():
+                self.logger.warning("Video generation skipped - circuit open",
+                                  extra={"dependency": "video_service", "endpoint": "/generate-video",
+                                         "error_type": "network", "circuit_state": self.breaker.state})
+                return {
+                    "success": False,
+                    "error_type": "network",
+                    "error_message": "Video service unavailable (circuit open)",
+                    "endpoint": "/generate-video",
+                    "fallback_used": True
+                }
+            
             self.logger.info(f"Starting video generation",
                            extra={"dependency": "video_service", "endpoint": "/generate-video",
                                   "text_length": len(text), "topic": payload["topic"]})
@@ -54,6 +80,7 @@ class VideoBridgeClient:
             
             response.raise_for_status()
             result = response.json()
+            self.breaker.record_success()
             latency = round((time.time() - start_time) * 1000, 2)
             
             self.logger.info(f"Video generation successful",
@@ -67,6 +94,7 @@ class VideoBridgeClient:
             self.logger.error("Video generation failed - timeout",
                             extra={"dependency": "video_service", "endpoint": "/generate-video",
                                    "latency_ms": latency, "error_type": "network", "timeout_seconds": self.timeout})
+            self.breaker.record_failure("timeout")
             return {
                 "success": False,
                 "error_type": "network",
@@ -79,6 +107,7 @@ class VideoBridgeClient:
             self.logger.error("Video generation failed - connection error",
                             extra={"dependency": "video_service", "endpoint": "/generate-video",
                                    "latency_ms": latency, "error_type": "network"})
+            self.breaker.record_failure("connection error")
             return {
                 "success": False,
                 "error_type": "network",
@@ -91,6 +120,7 @@ class VideoBridgeClient:
             self.logger.error(f"Video generation failed - unexpected error: {str(e)}",
                             extra={"dependency": "video_service", "endpoint": "/generate-video",
                                    "latency_ms": latency, "error_type": "unexpected", "error": str(e)})
+            self._record_error(e)
             return {
                 "success": False,
                 "error_type": "unexpected",
@@ -99,6 +129,7 @@ class VideoBridgeClient:
                 "fallback_used": True
             }
     
+    @upstream_call("video")
     def get_video_status(self, generation_id: str) -> Dict[str, Any]:
         """Get video generation status"""
         start_time = time.time()
@@ -113,6 +144,13 @@ class VideoBridgeClient:
                     "error_message": "generation_id is required"
                 }
             
+            if not self.breaker.allow():
+                return {
+                    "success": False,
+                    "error_type": "network",
+                    "error_message": "Video service unavailable (circuit open)"
+                }
+            
             response = requests.get(
                 f"{self.base_url}/status/{generation_id}",
                 timeout=10,
@@ -121,6 +159,7 @@ class VideoBridgeClient:
             
             response.raise_for_status()
             result = response.json()
+            self.breaker.record_success()
             latency = round((time.time() - start_time) * 1000, 2)
             
             self.logger.info(f"Video status check successful",
@@ -134,6 +173,7 @@ class VideoBridgeClient:
             self.logger.error("Video status check failed - timeout",
                             extra={"dependency": "video_service", "endpoint": f"/status/{generation_id}",
                                    "latency_ms": latency, "error_type": "network", "generation_id": generation_id})
+            self.breaker.record_failure("timeout")
             return {
                 "success": False,
                 "error_type": "network",
@@ -144,6 +184,7 @@ class VideoBridgeClient:
             self.logger.error("Video status check failed - connection error",
                             extra={"dependency": "video_service", "endpoint": f"/status/{generation_id}",
                                    "latency_ms": latency, "error_type": "network", "generation_id": generation_id})
+            self.breaker.record_failure("connection error")
             return {
                 "success": False,
                 "error_type": "network",
@@ -154,12 +195,14 @@ class VideoBridgeClient:
             self.logger.error(f"Video status check failed - unexpected error: {str(e)}",
                             extra={"dependency": "video_service", "endpoint": f"/status/{generation_id}",
                                    "latency_ms": latency, "error_type": "unexpected", "generation_id": generation_id, "error": str(e)})
+            self._record_error(e)
             return {
                 "success": False,
                 "error_type": "network",
                 "error_message": str(e)
             }
     
+    @upstream_call("video")
     def submit_feedback(self, generation_id: str, rating: int, 
                        comment: Optional[str] = None) -> Dict[str, Any]:
         """Submit feedback for generated video"""
@@ -178,6 +221,13 @@ class VideoBridgeClient:
                     "error_message": "Rating must be between 1 and 5"
                 }
             
+            if not self.breaker.allow():
+                return {
+                    "success": False,
+                    "error_type": "network",
+                    "error_message": "Video service unavailable (circuit open)"
+                }
+            
             payload = {
                 "generation_id": generation_id,
                 "rating": rating,
@@ -192,10 +242,13 @@ class VideoBridgeClient:
             )
             
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            self.breaker.record_success()
+            return result
             
         except Exception as e:
             self.logger.error(f"Feedback submission failed: {e}")
+            self._record_error(e)
             return {
                 "success": False,
                 "error_type": "network",
@@ -0,0 +1,347 @@
+"""Background workers for text-to-video jobs.
+
+`VideoJobManager.submit` records a job and returns immediately. A small thread
+pool then submits it to the video service and polls `get_video_status` until
+the video is done or failed. Poll intervals start at
+``VIDEO_POLL_MIN_INTERVAL_S`` and grow towards ``VIDEO_POLL_MAX_INTERVAL_S``
+while the service reports no progress, so long renders cost few requests and
+short ones finish promptly.
+
+Processes sharing the job table split the work through leases: a worker claims
+a job (see `VideoJobStore.claim`) before each submit or poll step and skips it
+if another process holds it. Unfinished jobs whose owner went away, including
+this process's own after a restart, are adopted once their lease expires.
+"""
+import heapq
+import itertools
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from config.config import (
+    VIDEO_JOBS_DB_PATH, VIDEO_JOB_WORKERS, VIDEO_JOB_MAX_ATTEMPTS, VIDEO_JOB_TIMEOUT_S,
+    VIDEO_POLL_MIN_INTERVAL_S, VIDEO_POLL_MAX_INTERVAL_S, VIDEO_JOB_LEASE_S
+)
+from ..db.video_catalog import get_video_catalog
+from ..db.video_jobs import VideoJobStore, SUBMITTED, PROCESSING, DONE, FAILED
+from .video_bridge_client import VideoBridgeClient
+
+logger = logging.getLogger(__name__)
+
+_SUBMIT = "submit"
+_POLL = "poll"
+
+# Remote status values mapped onto job states
+_DONE_STATUSES = {"completed", "complete", "done", "success", "succeeded", "finished"}
+_FAILED_STATUSES = {"failed", "failure", "error", "cancelled", "canceled"}
+
+
+def remote_state(status: Optional[str]) -> str:
+    """Map a video service status onto a job state (done, failed or processing)"""
+    status = (status or "").lower()
+    if status in _DONE_STATUSES:
+        return DONE
+    if status in _FAILED_STATUSES:
+        return FAILED
+    return PROCESSING
+
+
+def _video_result(remote: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": remote.get("status"),
+        "video_url": remote.get("video_url"),
+        "video_path": remote.get("video_path"),
+        "duration": remote.get("duration"),
+        "progress": remote.get("progress"),
+        "metadata": remote.get("metadata", {})
+    }
+
+
+class VideoJobManager:
+    """Job table plus worker pool that drives video jobs to a terminal state"""
+
+    def __init__(self, store: VideoJobStore, client: Optional[VideoBridgeClient] = None,
+                 workers: int = 4, max_attempts: int = 3, timeout_s: float = 1800.0,
+                 poll_min_s: float = 1.0, poll_max_s: float = 30.0, lease_s: float = 600.0,
+                 listeners: Optional[List[Callable[[Dict[str, Any]], None]]] = None):
+        self.store = store
+        self.client = client or VideoBridgeClient()
+        self.max_attempts = max(max_attempts, 1)
+        self.timeout_s = timeout_s
+        self.poll_min_s = max(poll_min_s, 0.05)
+        self.poll_max_s = max(poll_max_s, self.poll_min_s)
+        # A lease must outlast the gap between two steps of a job, or another process takes it over
+        self.lease_s = max(lease_s, self.poll_max_s * 2)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="video-job")
+        self._lock = threading.Lock()
+        # (due, seq, job_id, action) entries; each job has at most one pending entry
+        self._schedule: List[Tuple[float, int, str, str]] = []
+        self._seq = itertools.count()
+        self._intervals: Dict[str, float] = {}
+        # Jobs with a step running on a worker; their leases are kept on close
+        self._running: Set[str] = set()
+        self._stats = {"submitted": 0, "polls": 0, "done": 0, "failed": 0, "retries": 0,
+                       "adopted": 0, "lost_claims": 0}
+        self._next_adopt = 0.0
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._listeners = list(listeners or [])
+        self._adopt()
+        self._thread = threading.Thread(target=self._run, name="video-job-scheduler", daemon=True)
+        self._thread.start()
+
+    # Request side
+    def submit(self, request: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Record a job and hand it to the workers; returns the queued job"""
+        job = self.store.create(f"vid_{uuid.uuid4().hex}", user_id, request, owner=self.owner, lease_s=self.lease_s)
+        self._notify(job)
+        self._pool.submit(self._safe, self._submit_job, job["job_id"])
+        return job
+
+    def get(self, job_or_generation_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, by job id or the video service's generation_id"""
+        return self.store.get(job_or_generation_id)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `listener(job)` whenever a job is created or its state or result changes"""
+        self._listeners.append(listener)
+
+    def _notify(self, job: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception:
+                logger.exception(f"Video job listener failed for {job['job_id']}")
+
+    # Worker side
+    def _adopt(self) -> None:
+        """Claim and schedule unfinished jobs with no live owner (left by a stopped or crashed process)"""
+        now = time.time()
+        self._next_adopt = now + self.lease_s / 2
+        jobs = self.store.claim_orphans(self.owner, self.lease_s)
+        for job in jobs:
+            action = _POLL if job["generation_id"] else _SUBMIT
+            self._schedule_job(job["job_id"], action, now)
+        if jobs:
+            with self._lock:
+                self._stats["adopted"] += len(jobs)
+            logger.info(f"Adopted {len(jobs)} unfinished video jobs")
+
+    def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Take or renew this process's lease on a job before working on it; None means leave it alone"""
+        job = self.store.claim(job_id, self.owner, self.lease_s)
+        if job is None:
+            self._intervals.pop(job_id, None)
+            current = self.store.get(job_id)
+            if current is not None and current["state"] not in (DONE, FAILED):
+                self._count("lost_claims")
+        return job
+
+    def _schedule_job(self, job_id: str, action: str, due: float) -> None:
+        with self._lock:
+            heapq.heappush(self._schedule, (due, next(self._seq), job_id, action))
+        self._wake.set()
+
+    def _safe(self, step, job_id: str) -> None:
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            step(job_id)
+        except Exception as e:
+            logger.exception(f"Video job {job_id} step failed")
+            self._fail(job_id, f"Internal error: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def _update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Write a job's new state under this process's lease; None (and the job dropped) if the lease was lost"""
+        job = self.store.update(job_id, self.owner, **fields)
+        if job is None:
+            self._intervals.pop(job_id, None)
+            self._count("lost_claims")
+            logger.warning(f"Video job {job_id} lease lost; leaving it to its new owner")
+            return None
+        if "state" in fields or "result" in fields:
+            self._notify(job)
+        return job
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _fail(self, job_id: str, error: str, **fields) -> None:
+        self._intervals.pop(job_id, None)
+        if self._update(job_id, state=FAILED, error=error, **fields) is not None:
+            self._count("failed")
+
+    def _expired(self, job: Dict[str, Any]) -> bool:
+        return time.time() - job["created_at"] > self.timeout_s
+
+    def _submit_job(self, job_id: str) -> None:
+        job = self._claim(job_id)
+        if job is None:
+            return
+        request = job["request"]
+        remote = self.client.generate_video(
+            text=request.get("text", ""),
+            topic=request.get("topic", "general"),
+            style=request.get("style", "default"),
+            duration=request.get("duration", 30),
+            language=request.get("language", "en")
+        )
+        attempts = job["attempts"] + 1
+        if remote.get("success") is False:
+            error = remote.get("error_message") or "Video service error"
+            if not remote.get("fallback_used") or attempts >= self.max_attempts or self._expired(job):
+                self._fail(job_id, error, attempts=attempts)
+                return
+            # Transient (network, timeout, open circuit): retry the submission with backoff
+            if self._update(job_id, attempts=attempts, error=error) is None:
+                return
+            self._count("retries")
+            delay = min(self.poll_min_s * (2 ** attempts), self.poll_max_s)
+            self._schedule_job(job_id, _SUBMIT, time.time() + delay)
+            return
+
+        self._count("submitted")
+        state = remote_state(remote.get("status"))
+        generation_id = remote.get("generation_id")
+        if state == PROCESSING:
+            state = SUBMITTED if generation_id else FAILED
+        fields = {"generation_id": generation_id, "attempts": attempts, "result": _video_result(remote)}
+        if state == FAILED:
+            self._fail(job_id, remote.get("error") or "Video service returned no generation_id", **fields)
+            return
+        if self._update(job_id, state=state, error=None, **fields) is None:
+            return
+        if state == SUBMITTED:
+            self._intervals[job_id] = self.poll_min_s
+            self._schedule_job(job_id, _POLL, time.time() + self.poll_min_s)
+        else:
+            self._count("done")
+
+    def _poll_job(self, job_id: str) -> None:
+        job = self._claim(job_id)
+        if job is None:
+            return
+        if self._expired(job):
+            self._fail(job_id, "Video generation timed out")
+            return
+        remote = self.client.get_video_status(job["generation_id"])
+        self._count("polls")
+        interval = self._intervals.get(job_id, self.poll_min_s)
+        if remote.get("success") is False:
+            # Keep polling through transient failures, just less often
+            if self._update(job_id, error=remote.get("error_message")) is None:
+                return
+            interval = min(interval * 2, self.poll_max_s)
+        else:
+            state = remote_state(remote.get("status"))
+            result = _video_result(remote)
+            if state == FAILED:
+                self._fail(job_id, remote.get("error") or remote.get("error_message") or "Video generation failed",
+                           result=result)
+                return
+            previous = job["result"] or {}
+            if self._update(job_id, state=state, result=result, error=None) is None:
+                return
+            if state == DONE:
+                self._intervals.pop(job_id, None)
+                self._count("done")
+                return
+            # Back off while nothing changes; poll at the same pace while progress is being made
+            progressed = result["progress"] is not None and result["progress"] != previous.get("progress")
+            if not progressed:
+                interval = min(interval * 1.5, self.poll_max_s)
+        self._intervals[job_id] = interval
+        self._schedule_job(job_id, _POLL, time.time() + interval)
+
+    def _run(self) -> None:
+        while not self._closing.is_set():
+            if time.time() >= self._next_adopt:
+                try:
+                    self._adopt()
+                except Exception:
+                    logger.exception("Adopting orphaned video jobs failed")
+                    self._next_adopt = time.time() + self.lease_s / 2
+            with self._lock:
+                now = time.time()
+                due = []
+                while self._schedule and self._schedule[0][0] <= now:
+                    due.append(heapq.heappop(self._schedule))
+                wait = min(self._schedule[0][0], self._next_adopt) - now if self._schedule else self._next_adopt - now
+            for _, _, job_id, action in due:
+                step = self._submit_job if action == _SUBMIT else self._poll_job
+                try:
+                    self._pool.submit(self._safe, step, job_id)
+                except RuntimeError:
+                    return  # pool shut down
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop scheduling, drop queued steps and release this process's leases so others adopt its jobs."""
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        try:
+            with self._lock:
+                running = list(self._running)
+            self.store.release(self.owner, keep=running)
+        except Exception:
+            logger.exception("Releasing video job leases failed")
+        self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Active jobs per state, scheduled steps and worker counters"""
+        with self._lock:
+            stats = {"scheduled": len(self._schedule), **self._stats}
+        return {"active": self.store.counts(), **stats}
+
+
+_manager: Optional[VideoJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_video_jobs() -> VideoJobManager:
+    """Return the shared video job manager, creating it on first use."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = VideoJobManager(
+                    VideoJobStore(VIDEO_JOBS_DB_PATH),
+                    workers=VIDEO_JOB_WORKERS,
+                    max_attempts=VIDEO_JOB_MAX_ATTEMPTS,
+                    timeout_s=VIDEO_JOB_TIMEOUT_S,
+                    poll_min_s=VIDEO_POLL_MIN_INTERVAL_S,
+                    poll_max_s=VIDEO_POLL_MAX_INTERVAL_S,
+                    lease_s=VIDEO_JOB_LEASE_S,
+                    # Keep the video catalog (list_videos) in step with job progress
+                    listeners=[get_video_catalog().record_job]
+                )
+    return _manager
+
+
+def video_job_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the shared manager, or None when no video job has been created yet"""
+    return _manager.stats() if _manager is not None else None
+
+
+def close_video_jobs(timeout: Optional[float] = 5.0) -> None:
+    """Stop the shared video job manager (used on application shutdown)."""
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        manager.close(timeout)
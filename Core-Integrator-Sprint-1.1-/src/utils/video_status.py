@@ -0,0 +1,205 @@
+"""Cached status index for video generation ids.
+
+Dashboards poll the same generation ids every few seconds. Instead of one
+video service request per poll, the index:
+
+- coalesces concurrent checks for the same id into a single request,
+- answers repeated checks for in-flight ids from the last refresh and
+  refreshes all of them in one background sweep every
+  ``VIDEO_STATUS_SWEEP_INTERVAL_S`` (ids nobody asked about for
+  ``VIDEO_STATUS_IDLE_S`` are dropped from the sweep),
+- keeps finished (done / failed) statuses for good, since they never change.
+
+Jobs created by this service are answered from the job table instead; the
+index serves ids that the job table does not know.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+from config.config import (
+    VIDEO_STATUS_SWEEP_INTERVAL_S, VIDEO_STATUS_IDLE_S, VIDEO_STATUS_CACHE_MAX, VIDEO_STATUS_CONCURRENCY
+)
+from ..db.video_jobs import PROCESSING
+from .video_bridge_client import VideoBridgeClient
+from .video_jobs import remote_state
+
+logger = logging.getLogger(__name__)
+
+
+class VideoStatusIndex:
+    """Coalescing, background-refreshed cache of video service statuses"""
+
+    def __init__(self, client: Optional[VideoBridgeClient] = None, sweep_interval_s: float = 2.0,
+                 idle_s: float = 60.0, max_finished: int = 100000, concurrency: int = 8):
+        self.client = client or VideoBridgeClient()
+        self.sweep_interval_s = max(sweep_interval_s, 0.05)
+        self.idle_s = idle_s
+        self.max_finished = max(max_finished, 0)
+        self._pool = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="video-status")
+        self._lock = threading.Lock()
+        self._finished: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # generation_id -> {"result", "fetched_at", "requested_at"} for ids still being rendered
+        self._inflight: Dict[str, Dict[str, Any]] = {}
+        # generation_id -> Future of the request currently fetching it
+        self._fetching: Dict[str, Future] = {}
+        self._stats = {"hits": 0, "fetches": 0, "coalesced": 0, "sweeps": 0}
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="video-status-sweep", daemon=True)
+        self._thread.start()
+
+    def _cached(self, generation_id: str, now: float) -> Optional[Dict[str, Any]]:
+        """Cached status if it is final or fresh enough (caller holds the lock)"""
+        result = self._finished.get(generation_id)
+        if result is not None:
+            return result
+        entry = self._inflight.get(generation_id)
+        if entry is None:
+            return None
+        entry["requested_at"] = now
+        # Between sweeps the last refresh is current; if the sweep fell behind, fetch again
+        if now - entry["fetched_at"] <= 2 * self.sweep_interval_s:
+            return entry["result"]
+        return None
+
+    def _fetch(self, generation_id: str) -> Future:
+        """Start (or join) the request for `generation_id` (caller holds the lock)"""
+        future = self._fetching.get(generation_id)
+        if future is not None:
+            self._stats["coalesced"] += 1
+            return future
+        future = self._pool.submit(self._load, generation_id)
+        self._fetching[generation_id] = future
+        return future
+
+    def _load(self, generation_id: str) -> Dict[str, Any]:
+        try:
+            result = self.client.get_video_status(generation_id)
+        except Exception as e:
+            logger.error(f"Video status fetch failed for {generation_id}: {e}")
+            result = {"success": False, "error_type": "unexpected", "error_message": str(e)}
+        now = time.time()
+        with self._lock:
+            self._fetching.pop(generation_id, None)
+            self._stats["fetches"] += 1
+            if result.get("success") is False:
+                # Failed lookups are not cached; the caller gets its fallback
+                return result
+            if remote_state(result.get("status")) == PROCESSING:
+                entry = self._inflight.setdefault(generation_id, {"requested_at": now})
+                entry.update(result=result, fetched_at=now)
+                self._wake.set()
+            else:
+                self._inflight.pop(generation_id, None)
+                if self.max_finished:
+                    self._finished[generation_id] = result
+                    self._finished.move_to_end(generation_id)
+                    while len(self._finished) > self.max_finished:
+                        self._finished.popitem(last=False)
+        return result
+
+    def get(self, generation_id: str) -> Dict[str, Any]:
+        """Status of one generation id, as returned by `VideoBridgeClient.get_video_status`"""
+        return self.get_many([generation_id])[generation_id]
+
+    def get_many(self, generation_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Statuses of several ids; uncached ones are fetched concurrently"""
+        now = time.time()
+        results: Dict[str, Dict[str, Any]] = {}
+        futures: Dict[str, Future] = {}
+        with self._lock:
+            for generation_id in generation_ids:
+                if generation_id in results or generation_id in futures:
+                    continue
+                cached = self._cached(generation_id, now)
+                if cached is not None:
+                    self._stats["hits"] += 1
+                    results[generation_id] = cached
+                else:
+                    futures[generation_id] = self._fetch(generation_id)
+        for generation_id, future in futures.items():
+            results[generation_id] = future.result()
+        return results
+
+    def sweep(self) -> int:
+        """Refresh every in-flight id that is still being asked about; returns how many were refreshed"""
+        now = time.time()
+        with self._lock:
+            for generation_id in [gid for gid, entry in self._inflight.items()
+                                  if now - entry["requested_at"] > self.idle_s]:
+                del self._inflight[generation_id]
+            due = [gid for gid, entry in self._inflight.items()
+                   if now - entry["fetched_at"] >= self.sweep_interval_s * 0.9]
+            futures = [self._fetch(generation_id) for generation_id in due]
+            self._stats["sweeps"] += 1
+        for future in futures:
+            future.result()
+        return len(due)
+
+    def _run(self) -> None:
+        while not self._closing.is_set():
+            with self._lock:
+                idle = not self._inflight
+            if idle:
+                # Nothing to refresh: sleep until an in-flight id shows up
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self._closing.wait(self.sweep_interval_s)
+            if self._closing.is_set():
+                return
+            try:
+                self.sweep()
+            except RuntimeError:
+                return  # pool shut down
+            except Exception:
+                logger.exception("Video status sweep failed")
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_flight": len(self._inflight), "finished": len(self._finished), **self._stats}
+
+
+_index: Optional[VideoStatusIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_video_status_index() -> VideoStatusIndex:
+    """Return the shared video status index, creating it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VideoStatusIndex(
+                    sweep_interval_s=VIDEO_STATUS_SWEEP_INTERVAL_S,
+                    idle_s=VIDEO_STATUS_IDLE_S,
+                    max_finished=VIDEO_STATUS_CACHE_MAX,
+                    concurrency=VIDEO_STATUS_CONCURRENCY
+                )
+    return _index
+
+
+def video_status_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the shared index, or None when it was never used"""
+    return _index.stats() if _index is not None else None
+
+
+def close_video_status_index(timeout: Optional[float] = 5.0) -> None:
+    """Stop the shared video status index (used on application shutdown)."""
+    global _index
+    with _index_lock:
+        index, _index = _index, None
+    if index is not None:
+        index.close(timeout)